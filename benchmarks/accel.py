@@ -0,0 +1,47 @@
+import argparse
+import time
+
+from raytracer.geometry.accel import ACCELERATORS, choose_accelerator
+
+from .scenes import SCENES
+
+
+def run(scene_names: list[str], accelerators: list[str | None], scale: float, tile_size: int) -> None:
+    print(f"{'scene':>16} {'accelerator':>12} {'build':>8} {'render':>8} {'rays/s':>12}")
+    for scene_name in scene_names:
+        for name in accelerators:
+            setup = SCENES[scene_name]()
+            scene = setup.scene
+            scene.accelerator = name
+            cam_options = setup.cam_options
+            cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+            cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+
+            start_ts = time.perf_counter()
+            scene.accel
+            build = time.perf_counter() - start_ts
+            scene.render(cam_options, depth=setup.depth, verbose=False, tile_size=tile_size)
+            elapsed = time.perf_counter() - start_ts - build
+
+            label = name or "linear"
+            if name == "auto":
+                label = f"auto:{choose_accelerator(scene.objects) or 'linear'}"
+            rays = scene.stats.rays
+            print(f"{scene_name:>16} {label:>12} {build:7.3f}s {elapsed:7.2f}s {rays / elapsed:12,.0f}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render time of every scene with every acceleration structure")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(SCENES),
+                        default=["box", "random_spheres", "triangle_soup", "particles"])
+    parser.add_argument("--accelerators", nargs="+", choices=["linear", *ACCELERATORS],
+                        default=["linear", *ACCELERATORS])
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--tile-size", type=int, default=16)
+    args = parser.parse_args()
+    accelerators = [None if name == "linear" else name for name in args.accelerators]
+    run(args.scenes, accelerators, args.scale, args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
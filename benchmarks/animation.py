@@ -0,0 +1,82 @@
+import argparse
+import math
+import tempfile
+import time
+from pathlib import Path
+
+from raytracer import Vector
+from raytracer.render import Animation, CameraKey, ObjectKey, render_animation
+
+from .scenes import SCENES
+
+
+def orbit(look_from: Vector, look_to: Vector, turns: float = 0.25, keys: int = 8) -> list[CameraKey]:
+    offset = look_from - look_to
+    radius = math.hypot(offset.x, offset.z)
+    start = math.atan2(offset.z, offset.x)
+    result = []
+    for idx in range(keys):
+        angle = start + 2 * math.pi * turns * idx / (keys - 1)
+        position = look_to + Vector(radius * math.cos(angle), offset.y, radius * math.sin(angle))
+        result.append(CameraKey(time=idx / (keys - 1), look_from=position, look_to=look_to))
+    return result
+
+
+def run(scene_name: str, frames: int, workers: int, scale: float, move: int | None, shadow_cache: bool) -> None:
+    setup = SCENES[scene_name]()
+    cam_options = setup.cam_options
+    cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+    cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+    objects = {}
+    if move is not None:
+        objects[move] = [ObjectKey(time=0, offset=Vector(0)), ObjectKey(time=1, offset=Vector(0, 0.5, 0))]
+    animation = Animation(camera=orbit(cam_options.look_from, cam_options.look_to), objects=objects)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start_ts = time.perf_counter()
+        for frame_time in animation.frame_times(frames):
+            fresh = SCENES[scene_name]()
+            for idx, offset in animation.offsets_at(frame_time).items():
+                fresh.scene.objects[idx] = fresh.scene.objects[idx].translated(offset)
+            if shadow_cache:
+                fresh.scene.build_shadow_cache()
+            fresh.scene.render(
+                animation.camera_at(frame_time, cam_options),
+                depth=setup.depth,
+                verbose=False,
+                parallel=workers > 1,
+                num_workers=workers,
+            ).save(Path(output_dir) / "naive.png")
+        naive = (time.perf_counter() - start_ts) / frames
+
+        start_ts = time.perf_counter()
+        if shadow_cache:
+            setup.scene.build_shadow_cache()
+        pattern = Path(output_dir) / "frame_{index:04d}.png"
+        rendered = list(render_animation(
+            setup.scene, animation, cam_options, pattern,
+            frame_count=frames, num_workers=workers, depth=setup.depth,
+        ))
+        reused = (time.perf_counter() - start_ts) / frames
+
+    rays = sum(frame.stats.rays for frame in rendered) / frames
+    size = f"{cam_options.screen_width}x{cam_options.screen_height}"
+    print(f"{scene_name} {size}, {frames} frames, workers={workers}")
+    print(f"{'repeated render':>20}: {naive:8.3f}s per frame")
+    print(f"{'render_animation':>20}: {reused:8.3f}s per frame  x{naive / reused:.2f}  {rays:,.0f} rays per frame")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-frame cost of animations against repeated render calls")
+    parser.add_argument("--scene", choices=SCENES, default="box")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--move", type=int, help="Index of an object to move during the animation")
+    parser.add_argument("--shadow-cache", action="store_true", help="Build the static shadow cache")
+    args = parser.parse_args()
+    run(args.scene, args.frames, args.workers, args.scale, args.move, args.shadow_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import attr
+import json
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from PIL import Image
+
+from raytracer.render import kernels
+from raytracer.render.scene import ENGINES
+from raytracer.scenes import BUILTIN_SCENES
+
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+# full resolution references shared with render/tests/test_images.py
+IMAGES_DIR = Path(__file__).parents[1] / "raytracer" / "render" / "tests" / "images"
+
+MODES = ("serial", "processes", "threads")
+# a pixel counts as different once its channels are off by this much in total, as in check_image
+PIXEL_THRESHOLD = 2
+# renders shorter than this are dominated by noise and start up, so their speed is not budgeted
+MIN_TIMED = 1.0
+
+
+@attr.s(slots=True, frozen=True)
+class Variant:
+    engine: str = attr.ib()
+    mode: str = attr.ib()
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}/{self.mode}"
+
+
+REFERENCE = Variant("python", "serial")
+
+
+@attr.s(slots=True, frozen=True, kw_only=True)
+class Budget:
+    # fraction of pixels allowed to differ from the golden image
+    max_differing: float = attr.ib(default=0.01)
+    # render time relative to the reference engine in the same mode
+    max_time_ratio: float | None = attr.ib(default=None)
+
+
+BUDGETS = {
+    "python": Budget(),
+    # batched intersection and shading must never be slower than the scalar recursion
+    "numpy": Budget(max_time_ratio=1.0),
+    # the kernels run as plain python when numba is not installed, then only the pixels are budgeted
+    "numba": Budget(max_time_ratio=0.25 if kernels.available() else None),
+}
+
+
+@attr.s(slots=True, frozen=True, kw_only=True)
+class DiffStats:
+    max_abs: int = attr.ib()
+    mean_abs: float = attr.ib()
+    differing: float = attr.ib()
+    psnr: float = attr.ib()
+
+    @classmethod
+    def between(cls, expected: np.ndarray, actual: np.ndarray) -> "DiffStats":
+        diff = np.abs(expected.astype(int) - actual.astype(int))
+        mse = np.mean(diff.astype(float) ** 2)
+        return cls(
+            max_abs=int(diff.max(initial=0)),
+            mean_abs=float(diff.mean()),
+            differing=float((diff.sum(axis=-1) >= PIXEL_THRESHOLD).mean()),
+            psnr=float("inf") if mse == 0 else float(10 * np.log10(255 ** 2 / mse)),
+        )
+
+
+def variants(engines: list[str] = ENGINES, modes: list[str] = MODES) -> list[Variant]:
+    return [Variant(engine, mode) for engine in engines for mode in modes]
+
+
+def golden_path(scene_name: str, width: int, height: int) -> Path:
+    path = GOLDEN_DIR / f"{scene_name}_{width}x{height}.png"
+    full = IMAGES_DIR / f"{scene_name}.png"
+    if not path.exists() and full.exists():
+        with Image.open(full) as image:
+            if image.size == (width, height):
+                return full
+    return path
+
+
+def render(scene_name: str,
+           variant: Variant,
+           scale: float,
+           workers: int,
+           repeat: int = 1,
+           ) -> tuple[np.ndarray, float]:
+    return min((_render_once(scene_name, variant, scale, workers) for _ in range(repeat)), key=lambda run: run[1])
+
+
+def _render_once(scene_name: str, variant: Variant, scale: float, workers: int) -> tuple[np.ndarray, float]:
+    setup = BUILTIN_SCENES[scene_name]()
+    cam_options = setup.cam_options
+    cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+    cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+
+    parallel = variant.mode != "serial"
+    start_ts = time.perf_counter()
+    image = setup.scene.render(
+        cam_options,
+        depth=setup.depth,
+        verbose=False,
+        engine=variant.engine,
+        parallel=parallel,
+        num_workers=workers if parallel else None,
+        backend=variant.mode if parallel else "processes",
+    )
+    return np.asarray(image.convert("RGB")), time.perf_counter() - start_ts
+
+
+def update_goldens(scene_names: list[str], scale: float) -> None:
+    GOLDEN_DIR.mkdir(exist_ok=True)
+    for scene_name in scene_names:
+        pixels, _ = render(scene_name, REFERENCE, scale, workers=1)
+        height, width = pixels.shape[:2]
+        # never touches the full size images of the render tests
+        path = GOLDEN_DIR / f"{scene_name}_{width}x{height}.png"
+        Image.fromarray(pixels).save(path)
+        print(f"wrote {path}")
+
+
+def check_scene(scene_name: str,
+                scene_variants: list[Variant],
+                scale: float,
+                workers: int,
+                speed: bool = True,
+                repeat: int = 1,
+                ) -> tuple[list[dict], list[str]]:
+    rendered = {variant: render(scene_name, variant, scale, workers, repeat) for variant in scene_variants}
+    height, width = next(iter(rendered.values()))[0].shape[:2]
+    path = golden_path(scene_name, width, height)
+    if not path.exists():
+        return [], [f"{scene_name}: no golden image at {path}, create it with --update-goldens"]
+    golden = np.asarray(Image.open(path).convert("RGB"))
+
+    rows, violations = [], []
+    for variant, (pixels, elapsed) in rendered.items():
+        label = f"{scene_name} {variant.name}"
+        if pixels.shape != golden.shape:
+            violations.append(
+                f"{label}: rendered {pixels.shape[1]}x{pixels.shape[0]}, "
+                f"golden is {golden.shape[1]}x{golden.shape[0]}"
+            )
+            continue
+
+        stats = DiffStats.between(golden, pixels)
+        # parallel modes must reproduce the serial render of the same engine exactly
+        serial = rendered.get(Variant(variant.engine, "serial"))
+        serial_max = None if serial is None else DiffStats.between(serial[0], pixels).max_abs
+        reference = rendered.get(Variant(REFERENCE.engine, variant.mode))
+        time_ratio = None if reference is None else elapsed / reference[1]
+        timed = reference is not None and reference[1] >= MIN_TIMED
+        rows.append({
+            "scene": scene_name,
+            "variant": variant.name,
+            "width": width,
+            "height": height,
+            "wall_time": elapsed,
+            "time_ratio": time_ratio,
+            "serial_max_abs": serial_max,
+            **attr.asdict(stats),
+        })
+
+        budget = BUDGETS.get(variant.engine, Budget())
+        if stats.differing > budget.max_differing:
+            violations.append(
+                f"{label}: {stats.differing:.2%} of pixels differ from the golden image, "
+                f"budget {budget.max_differing:.2%}"
+            )
+        if serial_max:
+            violations.append(f"{label}: differs from the serial render by up to {serial_max}")
+        if speed and timed and budget.max_time_ratio is not None and time_ratio > budget.max_time_ratio:
+            violations.append(
+                f"{label}: took {time_ratio:.2f}x the {REFERENCE.engine} engine, "
+                f"budget {budget.max_time_ratio:.2f}x"
+            )
+    return rows, violations
+
+
+def print_rows(rows: list[dict]) -> None:
+    for row in rows:
+        ratio = "" if row["time_ratio"] is None else f"x{row['time_ratio']:.2f}"
+        serial = "" if row["serial_max_abs"] is None else str(row["serial_max_abs"])
+        print(
+            f"{row['scene']:>20} {row['variant']:>18} {row['wall_time']:8.2f}s {ratio:>6}  "
+            f"max {row['max_abs']:3d}  mean {row['mean_abs']:6.3f}  differ {row['differing']:7.3%}  "
+            f"psnr {row['psnr']:6.1f}  serial {serial:>3}",
+            flush=True,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare every engine and backend against the golden images")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(BUILTIN_SCENES), default=list(BUILTIN_SCENES))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--scale", type=float, default=0.25, help="Resolution scale, 1 uses the full size goldens")
+    parser.add_argument("--workers", type=int, default=2, help="Workers of the parallel modes")
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the best time of this many renders")
+    parser.add_argument("--no-speed", action="store_true",
+                        help="Report timings without enforcing the speed budgets")
+    parser.add_argument("--update-goldens", action="store_true",
+                        help="Render new goldens with the reference engine")
+    parser.add_argument("-o", "--output", help="Write the statistics as JSON")
+    args = parser.parse_args()
+
+    if args.update_goldens:
+        update_goldens(args.scenes, args.scale)
+        return
+
+    results, violations = [], []
+    for scene_name in args.scenes:
+        rows, failed = check_scene(
+            scene_name,
+            variants(args.engines, args.modes),
+            args.scale,
+            args.workers,
+            speed=not args.no_speed,
+            repeat=args.repeat,
+        )
+        print_rows(rows)
+        results += rows
+        violations += failed
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if violations:
+        print("Violations:\n  " + "\n  ".join(violations))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import math
+import numpy as np
+import time
+
+from raytracer import CameraOptions, Material, PointLight, Scene, Sphere, Triangle, Vector
+from raytracer.render import Denoiser
+
+
+def build_scene(num_lights: int = 256, size: float = 16, **scene_options) -> tuple[Scene, CameraOptions]:
+    rng = np.random.default_rng(0)
+    scene = Scene(**scene_options)
+
+    floor_mtl = Material(
+        diffuse_color=Vector(0.6),
+        specular_color=Vector(0.2),
+        specular_exponent=20,
+    )
+    scene.add_object(Triangle([
+            Vector(-size, 0, size),
+            Vector(size, 0, size),
+            Vector(size, 0, -size),
+        ],
+        material=floor_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(size, 0, -size),
+            Vector(-size, 0, -size),
+            Vector(-size, 0, size),
+        ],
+        material=floor_mtl,
+    ))
+
+    for x in np.linspace(-size / 2, size / 2, 4):
+        for z in np.linspace(-size / 2, size / 2, 4):
+            scene.add_object(Sphere(
+                center=Vector(x, 0.5, z),
+                radius=0.5,
+                material=Material(diffuse_color=Vector(*rng.uniform(0.2, 0.8, 3)), specular_color=Vector(0.3)),
+            ))
+
+    for _ in range(num_lights):
+        x, z = rng.uniform(-size, size, 2)
+        scene.add_light(PointLight(
+            origin=Vector(x, rng.uniform(0.5, 2), z),
+            intensity=Vector(*rng.uniform(0.2, 1, 3)),
+            attenuation=4,
+        ))
+
+    cam_options = CameraOptions(
+        screen_width=160,
+        screen_height=120,
+        fov=math.pi / 3,
+        look_from=Vector(0, size, size),
+        look_to=Vector(0, 0, 0),
+    )
+    return scene, cam_options
+
+
+def run(num_lights: int, width: int, height: int, threshold: float, samples: int) -> None:
+    sampled = {"light_threshold": threshold, "light_samples": samples}
+    modes = {
+        "all lights": ({}, None),
+        f"culled (threshold={threshold})": ({"light_threshold": threshold}, None),
+        f"sampled ({samples} per hit)": (sampled, None),
+        f"sampled ({samples} per hit), denoised": (sampled, Denoiser()),
+    }
+
+    reference = None
+    for name, (options, denoiser) in modes.items():
+        scene, cam_options = build_scene(num_lights, **options)
+        cam_options.screen_width, cam_options.screen_height = width, height
+
+        start_ts = time.time()
+        img = np.asarray(scene.render(cam_options, depth=1, verbose=False, denoiser=denoiser), dtype=float)
+        elapsed = time.time() - start_ts
+
+        if reference is None:
+            reference = img
+        error = np.abs(img - reference).mean()
+        print(f"{name:>32}: {elapsed:8.2f}s  mean abs diff {error:6.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Many point lights benchmark")
+    parser.add_argument("--lights", type=int, default=256)
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--height", type=int, default=120)
+    parser.add_argument("--threshold", type=float, default=0.01)
+    parser.add_argument("--samples", type=int, default=4)
+    args = parser.parse_args()
+    run(args.lights, args.width, args.height, args.threshold, args.samples)
+
+
+if __name__ == "__main__":
+    main()
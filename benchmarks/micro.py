@@ -0,0 +1,157 @@
+import argparse
+import attr
+import functools
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from raytracer.geometry import Intersection, Ray, Sphere, Triangle, Vector, reflect, refract
+from raytracer.geometry.sphere import solve_quadratic
+
+
+TRACKED_TYPES = (Vector, Ray, Intersection)
+
+
+@attr.s(slots=True, kw_only=True)
+class Case:
+    name: str = attr.ib()
+    func: Callable[[], Any] = attr.ib()
+    expect_hit: bool | None = attr.ib(default=None)
+
+
+def make_cases() -> list[Case]:
+    sphere = Sphere(center=Vector(0, 0, -5), radius=1)
+    triangle = Triangle([Vector(-1, -1, -5), Vector(1, -1, -5), Vector(0, 1, -5)])
+    hit_ray = Ray(origin=Vector(0, 0, 0), direction=Vector(0, 0, -1))
+    miss_ray = Ray(origin=Vector(0, 0, 0), direction=Vector(0, 1, 0))
+    lhs, rhs = Vector(1, 2, 3), Vector(-4, 5, 0.5)
+    normal = Vector(0, 1, 0)
+    incident = Vector(0.707107, -0.707107, 0)
+    grazing = Vector(0.999, -0.0447101778, 0)
+
+    return [
+        Case(name="sphere.intersect/hit", func=functools.partial(sphere.intersect, hit_ray), expect_hit=True),
+        Case(name="sphere.intersect/miss", func=functools.partial(sphere.intersect, miss_ray), expect_hit=False),
+        Case(name="triangle.moller_trumbore/hit", func=functools.partial(triangle.moller_trumbore, hit_ray),
+             expect_hit=True),
+        Case(name="triangle.moller_trumbore/miss", func=functools.partial(triangle.moller_trumbore, miss_ray),
+             expect_hit=False),
+        Case(name="solve_quadratic/roots", func=functools.partial(solve_quadratic, 1, -3, 2), expect_hit=True),
+        Case(name="solve_quadratic/none", func=functools.partial(solve_quadratic, 1, 0, 2), expect_hit=False),
+        Case(name="reflect", func=functools.partial(reflect, incident, normal)),
+        Case(name="refract/transmit", func=functools.partial(refract, incident, normal, 0.9), expect_hit=True),
+        Case(name="refract/total_internal", func=functools.partial(refract, grazing, normal, 1.5),
+             expect_hit=False),
+        Case(name="vector.__add__", func=functools.partial(lhs.__add__, rhs)),
+        Case(name="vector.__sub__", func=functools.partial(lhs.__sub__, rhs)),
+        Case(name="vector.__mul__", func=functools.partial(lhs.__mul__, 2.5)),
+        Case(name="vector.dot", func=functools.partial(lhs.dot, rhs)),
+        Case(name="vector.cross", func=functools.partial(lhs.cross, rhs)),
+        Case(name="vector.normalize", func=lambda: Vector(3, 4, 12).normalize()),
+        Case(name="vector.length", func=lambda: lhs.length),
+        Case(name="ray.__init__", func=lambda: Ray(origin=lhs, direction=Vector(0, 0, -1))),
+    ]
+
+
+def time_per_op(func: Callable[[], Any], *, min_time: float = 0.2, repeat: int = 5) -> float:
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9 / repeat:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter_ns() - start)
+    return best / loops
+
+
+def count_objects(func: Callable[[], Any], loops: int = 100) -> dict[str, float]:
+    counts = dict.fromkeys((cls.__name__ for cls in TRACKED_TYPES), 0)
+    originals = {cls: cls.__init__ for cls in TRACKED_TYPES}
+
+    def counting(cls, init):
+        @functools.wraps(init)
+        def wrapper(self, *args, **kwargs):
+            if type(self) is cls:
+                counts[cls.__name__] += 1
+            init(self, *args, **kwargs)
+        return wrapper
+
+    try:
+        for cls, init in originals.items():
+            cls.__init__ = counting(cls, init)
+        for _ in range(loops):
+            func()
+    finally:
+        for cls, init in originals.items():
+            cls.__init__ = init
+    return {name: count / loops for name, count in counts.items()}
+
+
+def peak_bytes(func: Callable[[], Any]) -> int:
+    func()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def check(case: Case) -> None:
+    if case.expect_hit is None:
+        return
+    result = case.func()
+    if (result is not None) != case.expect_hit:
+        raise AssertionError(f"{case.name}: expected {'a hit' if case.expect_hit else 'a miss'}, got {result!r}")
+
+
+def measure(case: Case, *, min_time: float = 0.2) -> dict:
+    check(case)
+    objects = count_objects(case.func)
+    return {
+        "name": case.name,
+        "ns_per_op": time_per_op(case.func, min_time=min_time),
+        "objects_per_op": sum(objects.values()),
+        "objects": objects,
+        "peak_bytes_per_op": peak_bytes(case.func),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Geometry micro-benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent timing every case")
+    parser.add_argument("--json", help="Path to save results")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'case':<32} {'ns/op':>10} {'objects/op':>11} {'peak B/op':>10}")
+    for case in make_cases():
+        if args.filter not in case.name:
+            continue
+        result = measure(case, min_time=args.min_time)
+        results.append(result)
+        print(
+            f"{result['name']:<32} {result['ns_per_op']:10.0f} "
+            f"{result['objects_per_op']:11.1f} {result['peak_bytes_per_op']:10d}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import math
+import numpy as np
+
+from raytracer import CameraOptions, Material, PointLight, Scene, Sphere, Triangle, Vector
+from raytracer.geometry import SphereCloud
+from raytracer.scenes import BUILTIN_SCENES, SceneSetup
+
+
+def random_spheres(count: int = 100, seed: int = 0) -> SceneSetup:
+    rng = np.random.default_rng(seed)
+    materials = [
+        Material(diffuse_color=Vector(*rng.uniform(0.2, 0.9, 3)), specular_color=Vector(0.3), specular_exponent=50)
+        for _ in range(8)
+    ]
+
+    scene = Scene()
+    for center, radius, material_idx in zip(
+        rng.uniform(-4, 4, (count, 3)).tolist(),
+        rng.uniform(0.05, 0.2, count).tolist(),
+        rng.integers(len(materials), size=count).tolist(),
+    ):
+        scene.add_object(Sphere(center=Vector(*center), radius=radius, material=materials[material_idx]))
+
+    scene.add_light(PointLight(origin=Vector(0, 10, 10), intensity=Vector(1)))
+    scene.add_light(PointLight(origin=Vector(-10, 5, 0), intensity=Vector(0.3)))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        fov=math.pi / 3,
+        look_from=Vector(0, 0, 12),
+        look_to=Vector(0, 0, 0),
+    )
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=2)
+
+
+def triangle_soup(count: int = 100, seed: int = 0) -> SceneSetup:
+    rng = np.random.default_rng(seed)
+    material = Material(
+        diffuse_color=Vector(0.6, 0.5, 0.4),
+        specular_color=Vector(0.2),
+        specular_exponent=20,
+        albedo=Vector(0.9, 0.1, 0),
+    )
+
+    scene = Scene()
+    centers = rng.uniform(-3, 3, (count, 3))
+    offsets = rng.normal(scale=0.15, size=(count, 3, 3))
+    for vertices in (centers[:, None, :] + offsets).tolist():
+        scene.add_object(Triangle([Vector(*vertex) for vertex in vertices], material=material))
+
+    scene.add_light(PointLight(origin=Vector(5, 8, 8), intensity=Vector(1)))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        fov=math.pi / 3,
+        look_from=Vector(0, 0, 9),
+        look_to=Vector(0, 0, 0),
+    )
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=2)
+
+
+def particles(count: int = 2000, seed: int = 0) -> SceneSetup:
+    rng = np.random.default_rng(seed)
+    material = Material(diffuse_color=Vector(0.8, 0.7, 0.3), specular_color=Vector(0.2), specular_exponent=30)
+
+    # far too many objects for the linear scan
+    scene = Scene(accelerator="auto")
+    for center in rng.uniform(-3, 3, (count, 3)).tolist():
+        scene.add_object(Sphere(center=Vector(*center), radius=0.03, material=material))
+
+    scene.add_light(PointLight(origin=Vector(5, 8, 8), intensity=Vector(1)))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        fov=math.pi / 3,
+        look_from=Vector(0, 0, 9),
+        look_to=Vector(0, 0, 0),
+    )
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=2)
+
+
+def sphere_cloud(count: int = 200_000, seed: int = 0) -> SceneSetup:
+    rng = np.random.default_rng(seed)
+    materials = [
+        Material(diffuse_color=Vector(0.8, 0.7, 0.3), specular_color=Vector(0.2), specular_exponent=30),
+        Material(diffuse_color=Vector(0.3, 0.5, 0.8), specular_color=Vector(0.2), specular_exponent=30),
+    ]
+
+    # the same kind of particle field as above, stored as one object
+    scene = Scene()
+    scene.add_object(SphereCloud(
+        centers=rng.uniform(-3, 3, (count, 3)),
+        radii=rng.uniform(0.005, 0.01, count),
+        material_ids=rng.integers(0, len(materials), count),
+        materials=materials,
+    ))
+    scene.add_light(PointLight(origin=Vector(5, 8, 8), intensity=Vector(1)))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        fov=math.pi / 3,
+        look_from=Vector(0, 0, 9),
+        look_to=Vector(0, 0, 0),
+    )
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=2)
+
+
+SCENES = {
+    **BUILTIN_SCENES,
+    'random_spheres': random_spheres,
+    'triangle_soup': triangle_soup,
+    'particles': particles,
+    'sphere_cloud': sphere_cloud,
+}
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from raytracer.service import DEFAULT_PORT, RenderClient, RenderService
+
+from .scenes import SCENES
+
+
+async def _client_jobs(port: int, host: str, scene: bytes, jobs: int, tile_size: int) -> list[tuple[float, float]]:
+    client = await RenderClient.connect(host, port)
+    async with client:
+        async def one(priority: int) -> tuple[float, float]:
+            start_ts = time.perf_counter()
+            job_id = await client.submit(scene, priority=priority, tile_size=tile_size)
+            first_tile = None
+            async for event in client.events(job_id):
+                if event.type == "tile" and first_tile is None:
+                    first_tile = time.perf_counter() - start_ts
+                elif event.type == "error":
+                    raise RuntimeError(event.message)
+            return first_tile, time.perf_counter() - start_ts
+
+        return await asyncio.gather(*(one(priority=idx % 3) for idx in range(jobs)))
+
+
+def _percentiles(values: list[float]) -> str:
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+    return f"p50 {statistics.median(values) * 1000:8.1f}ms  p95 {p95 * 1000:8.1f}ms  max {values[-1] * 1000:8.1f}ms"
+
+
+async def run(scene_name: str,
+              clients: int,
+              jobs: int,
+              scale: float,
+              tile_size: int,
+              workers: int | None,
+              backend: str,
+              connect: str | None,
+              ) -> None:
+    setup = SCENES[scene_name]()
+    cam_options = setup.cam_options
+    cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+    cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+    scene = setup.to_data().to_bytes()
+
+    async def load(host: str, port: int) -> None:
+        start_ts = time.perf_counter()
+        results = await asyncio.gather(*(
+            _client_jobs(port, host, scene, jobs, tile_size) for _ in range(clients)
+        ))
+        elapsed = time.perf_counter() - start_ts
+
+        timings = [timing for result in results for timing in result]
+        print(f"{len(timings)} jobs of {cam_options.screen_width}x{cam_options.screen_height} "
+              f"from {clients} clients in {elapsed:.3f}s: {len(timings) / elapsed:.1f} jobs/s")
+        print(f"  first tile  {_percentiles([first for first, _ in timings])}")
+        print(f"  complete    {_percentiles([total for _, total in timings])}")
+
+    if connect is not None:
+        host, _, port = connect.rpartition(":")
+        await load(host or "127.0.0.1", int(port))
+        return
+
+    async with RenderService(num_workers=workers, backend=backend) as service:
+        server = await service.serve(port=0)
+        async with server:
+            await load("127.0.0.1", server.sockets[0].getsockname()[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the render service with many small concurrent jobs")
+    parser.add_argument("--scene", choices=SCENES, default="spheres")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=8, help="jobs submitted concurrently by each client")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--tile-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", choices=("processes", "threads"), default="processes")
+    parser.add_argument("--connect", metavar="HOST:PORT", default=None,
+                        help=f"load an already running service (e.g. 127.0.0.1:{DEFAULT_PORT}) "
+                             "instead of an in-process one")
+    args = parser.parse_args()
+    asyncio.run(run(
+        args.scene, args.clients, args.jobs, args.scale, args.tile_size, args.workers, args.backend, args.connect,
+    ))
+
+
+if __name__ == "__main__":
+    main()
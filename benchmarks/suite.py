@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .scenes import SCENES
+
+
+# machine specific, so it stays local and is ignored by git
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def run_case(scene_name: str, workers: int, scale: float) -> dict:
+    setup = SCENES[scene_name]()
+    cam_options = setup.cam_options
+    cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+    cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+
+    start_ts = time.perf_counter()
+    setup.scene.render(
+        cam_options,
+        depth=setup.depth,
+        verbose=False,
+        parallel=workers > 1,
+        num_workers=workers,
+    )
+    wall_time = time.perf_counter() - start_ts
+
+    stats = setup.scene.stats
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return {
+        "scene": scene_name,
+        "workers": workers,
+        "width": cam_options.screen_width,
+        "height": cam_options.screen_height,
+        "wall_time": wall_time,
+        "rays": stats.rays,
+        "rays_per_second": stats.rays / wall_time,
+        "peak_rss_mb": peak_rss / 1024,
+        "stats": stats.as_dict(),
+    }
+
+
+def run_isolated(scene_name: str, workers: int, scale: float) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--case", scene_name,
+         "--workers", str(workers), "--scale", str(scale)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_suite(scene_names: list[str], workers: list[int], scale: float, repeat: int) -> dict:
+    results = []
+    for scene_name in scene_names:
+        single = None
+        for num_workers in workers:
+            runs = [run_isolated(scene_name, num_workers, scale) for _ in range(repeat)]
+            best = min(runs, key=lambda run: run["wall_time"])
+            if single is None:
+                single = best["wall_time"]
+            best["speedup"] = single / best["wall_time"]
+            results.append(best)
+            print(
+                f"{scene_name:>20} workers={num_workers:<2} {best['wall_time']:8.2f}s "
+                f"{best['rays_per_second']:12,.0f} rays/s  {best['peak_rss_mb']:7.1f} MiB  "
+                f"x{best['speedup']:.2f}",
+                flush=True,
+            )
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    reference = {(run["scene"], run["workers"]): run for run in baseline["results"]}
+    regressions = []
+    for run in results["results"]:
+        base = reference.get((run["scene"], run["workers"]))
+        if base is None or (base["width"], base["height"]) != (run["width"], run["height"]):
+            continue
+        change = run["rays_per_second"] / base["rays_per_second"] - 1
+        marker = ""
+        if change < -tolerance:
+            marker = "  REGRESSION"
+            regressions.append(f"{run['scene']} (workers={run['workers']}): {change:+.1%} rays/s")
+        print(f"{run['scene']:>20} workers={run['workers']:<2} {change:+8.1%} rays/s vs baseline{marker}")
+    return regressions
+
+
+def parse_workers(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render throughput benchmark suite")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(SCENES), default=list(SCENES))
+    parser.add_argument("--workers", type=parse_workers, default=[1, 2], help="Comma separated worker counts")
+    parser.add_argument("--scale", type=float, default=0.25, help="Resolution scale of every scene")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new local baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        print(json.dumps(run_case(args.case, args.workers[0], args.scale)))
+        return
+
+    results = run_suite(args.scenes, args.workers, args.scale, args.repeat)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2))
+        return
+
+    if Path(args.baseline).exists():
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
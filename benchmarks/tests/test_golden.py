@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from raytracer.scenes import BUILTIN_SCENES
+
+from ..golden import DiffStats, check_scene, variants
+
+
+# goldens rendered at a tenth of the resolution keep this quick enough for every run
+SCALE = 0.1
+
+
+def test_diff_stats():
+    expected = np.zeros((4, 5, 3), dtype=np.uint8)
+    actual = expected.copy()
+    actual[0, 0] = (3, 0, 0)
+    actual[1, 1] = (1, 0, 0)
+
+    stats = DiffStats.between(expected, actual)
+    assert stats.max_abs == 3
+    assert stats.differing == 1 / 20
+    assert stats.mean_abs == pytest.approx(4 / 60)
+    assert DiffStats.between(expected, expected).psnr == float("inf")
+
+
+@pytest.mark.parametrize("scene_name", BUILTIN_SCENES)
+def test_variants_match_goldens(scene_name):
+    rows, violations = check_scene(scene_name, variants(), SCALE, workers=2, speed=False)
+    assert not violations
+    assert len(rows) == len(variants())
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("scene_name", BUILTIN_SCENES)
+def test_speed_budgets(scene_name):
+    _, violations = check_scene(scene_name, variants(modes=["serial"]), 0.25, workers=1, repeat=3)
+    assert not violations
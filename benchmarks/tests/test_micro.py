@@ -0,0 +1,19 @@
+import pytest
+
+from ..micro import check, make_cases, measure
+
+
+CASES = {case.name: case for case in make_cases()}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_case_outcome(name):
+    check(CASES[name])
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", CASES)
+def test_micro_benchmark(name):
+    result = measure(CASES[name], min_time=0.05)
+    print(f"{name}: {result['ns_per_op']:.0f} ns/op, {result['objects_per_op']:.1f} objects/op")
+    assert result["ns_per_op"] > 0
@@ -0,0 +1,53 @@
+import argparse
+import sys
+import sysconfig
+import time
+
+from .scenes import SCENES
+
+
+def run(scene_name: str, workers: list[int], scale: float, tile_size: int | None) -> None:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"python {sys.version.split()[0]}, free-threaded build: {free_threaded}, GIL enabled: {gil}")
+
+    serial = None
+    for count in workers:
+        for backend in ("processes", "threads"):
+            setup = SCENES[scene_name]()
+            cam_options = setup.cam_options
+            cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+            cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+
+            start_ts = time.perf_counter()
+            setup.scene.render(
+                cam_options,
+                depth=setup.depth,
+                verbose=False,
+                parallel=count > 1,
+                num_workers=count,
+                tile_size=tile_size,
+                backend=backend,
+            )
+            elapsed = time.perf_counter() - start_ts
+            if serial is None:
+                serial = elapsed
+            rays = setup.scene.stats.rays
+            label = "serial" if count == 1 and backend == "processes" else backend
+            print(
+                f"{label:>10} x{count:<3} {elapsed:8.3f}s  {rays / elapsed:12,.0f} rays/s  x{serial / elapsed:.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render throughput of process and thread workers")
+    parser.add_argument("--scene", choices=SCENES, default="box")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--tile-size", type=int, default=16)
+    args = parser.parse_args()
+    run(args.scene, args.workers, args.scale, args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from .scenes import SCENES
+
+
+def run(scene_names: list[str], engines: list[str], scale: float, tile_size: int) -> None:
+    print(f"{'scene':>16} {'engine':>8} {'render':>8} {'rays/s':>12} {'coherence':>10} {'speedup':>8}")
+    for scene_name in scene_names:
+        recursive = None
+        for engine in engines:
+            setup = SCENES[scene_name]()
+            cam_options = setup.cam_options
+            cam_options.screen_width = max(1, round(cam_options.screen_width * scale))
+            cam_options.screen_height = max(1, round(cam_options.screen_height * scale))
+
+            start_ts = time.perf_counter()
+            setup.scene.render(cam_options, depth=setup.depth, verbose=False, tile_size=tile_size, engine=engine)
+            elapsed = time.perf_counter() - start_ts
+
+            stats = setup.scene.stats
+            if engine == "python":
+                recursive = elapsed
+            speedup = f"x{recursive / elapsed:.2f}" if recursive else "-"
+            print(
+                f"{scene_name:>16} {engine:>8} {elapsed:7.2f}s {stats.rays / elapsed:12,.0f}"
+                f" {stats.coherence:10.3f} {speedup:>8}",
+                flush=True,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render time of the recursive tracer against the wavefront stage")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(SCENES), default=["mirrors"])
+    # the python engine recurses per pixel, numpy traces each bounce generation of a tile as one batch
+    parser.add_argument("--engines", nargs="+", choices=["python", "numpy"], default=["python", "numpy"])
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--tile-size", type=int, default=32)
+    args = parser.parse_args()
+    run(args.scenes, args.engines, args.scale, args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
+import importlib
+
 from .geometry import BaseObject, Material, Sphere, Triangle, Vector
-from .render import CameraOptions, PointLight, Scene
 
 __all__ = (
     'BaseObject',
@@ -12,3 +13,20 @@ __all__ = (
     'PointLight',
     'Scene',
 )
+
+# rendering pulls in numpy, so it is imported on first use to keep `import raytracer` geometry-only
+_LAZY = {
+    'CameraOptions': '.render',
+    'PointLight': '.render',
+    'Scene': '.render',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,129 @@
+import argparse
+import math
+import time
+from pathlib import Path
+from typing import Sequence
+
+from .render.denoise import Denoiser
+from .render.scene import BACKENDS, ENGINES
+from .scenes import BUILTIN_SCENES, SceneSetup
+
+
+def load_setup(source: str) -> SceneSetup:
+    if source in BUILTIN_SCENES and not Path(source).exists():
+        return BUILTIN_SCENES[source]()
+    return SceneSetup.load(source)
+
+
+def frame_name(source: str) -> str:
+    return source if source in BUILTIN_SCENES else Path(source).stem
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="raytracer", description="Render scene files or built-in scenes")
+    parser.add_argument("scenes", nargs="+", metavar="SCENE",
+                        help=f"Scene file or built-in scene name ({', '.join(BUILTIN_SCENES)} or all)")
+    parser.add_argument("-o", "--output", default="{name}.png",
+                        help="Output path pattern, may use {name} and {index} (default: %(default)s)")
+    parser.add_argument("--width", type=int, help="Image width, overrides the scene camera")
+    parser.add_argument("--height", type=int, help="Image height, overrides the scene camera")
+    parser.add_argument("--fov", type=float, help="Field of view in degrees, overrides the scene camera")
+    parser.add_argument("--depth", type=int, help="Maximum ray depth, overrides the scene setting")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of workers, 0 uses all but one core for processes and all cores for threads "
+                             "(default: %(default)s)")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKENDS[0],
+                        help="Run workers as processes or as threads sharing one scene (default: %(default)s)")
+    parser.add_argument("--tile-size", type=int, help="Square tile size, full rows by default")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINES[0],
+                        help="Shading engine (default: %(default)s)")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="Reuse frames and tiles rendered before from an on-disk cache")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Cache size limit in MiB (default: %(default)s)")
+    parser.add_argument("--region", type=int, nargs=4, metavar=("X0", "Y0", "X1", "Y1"),
+                        help="Only render this crop of the frame")
+    parser.add_argument("--denoise", action="store_true",
+                        help="Smooth sampling noise with an edge-aware filter guided by normals, depths "
+                             "and object ids")
+    parser.add_argument("--export", action="store_true",
+                        help="Save scene files to the output paths instead of rendering")
+    parser.add_argument("--stats", action="store_true", help="Print all ray counters for every frame")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Disable progress bars")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Sample the tracing loop and save collapsed stacks to PATH")
+    parser.add_argument("--profile-interval", type=float, default=0.005, help="Sampling interval in seconds")
+    parser.add_argument("--profile-top", type=int, default=20, help="Number of functions in the profile summary")
+    args = parser.parse_args(argv)
+
+    args.scenes = [name for source in args.scenes for name in (BUILTIN_SCENES if source == "all" else [source])]
+    if len(args.scenes) > 1 and args.output.format(name="", index=0) == args.output.format(name="x", index=1):
+        parser.error("--output must contain {name} or {index} when rendering several scenes")
+    return args
+
+
+def apply_overrides(setup: SceneSetup, args: argparse.Namespace) -> None:
+    if args.width is not None:
+        setup.cam_options.screen_width = args.width
+    if args.height is not None:
+        setup.cam_options.screen_height = args.height
+    if args.fov is not None:
+        setup.cam_options.fov = math.radians(args.fov)
+    if args.depth is not None:
+        setup.depth = args.depth
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    profiler = None
+    if args.profile:
+        from .render.profiling import SamplingProfiler
+        profiler = SamplingProfiler(args.profile_interval)
+
+    cache = None
+    if args.cache:
+        from .render import RenderCache
+        cache = RenderCache(root=args.cache, max_bytes=args.cache_size * 2 ** 20)
+
+    total_time = total_rays = 0
+    for index, source in enumerate(args.scenes):
+        setup = load_setup(source)
+        apply_overrides(setup, args)
+        output_path = args.output.format(name=frame_name(source), index=index)
+        if args.export:
+            setup.save(output_path)
+            continue
+
+        start_ts = time.perf_counter()
+        img = setup.scene.render(
+            setup.cam_options,
+            depth=setup.depth,
+            verbose=not args.quiet,
+            parallel=args.workers != 1,
+            num_workers=args.workers or None,
+            backend=args.backend,
+            tile_size=args.tile_size,
+            profiler=profiler,
+            engine=args.engine,
+            cache=cache,
+            region=None if args.region is None else tuple(args.region),
+            denoiser=Denoiser() if args.denoise else None,
+        )
+        elapsed = time.perf_counter() - start_ts
+        img.save(output_path)
+
+        stats = setup.scene.stats
+        total_time += elapsed
+        total_rays += stats.rays
+        print(f"{output_path}: {img.width}x{img.height} in {elapsed:.2f}s, "
+              f"{stats.rays:,} rays ({stats.rays / elapsed:,.0f} rays/s)")
+        if args.stats:
+            print("  " + ", ".join(f"{key}={value:,}" for key, value in stats.as_dict().items()))
+
+    if len(args.scenes) > 1 and not args.export:
+        print(f"total: {len(args.scenes)} frames in {total_time:.2f}s, "
+              f"{total_rays:,} rays ({total_rays / total_time:,.0f} rays/s)")
+
+    if profiler is not None:
+        profiler.write_collapsed(args.profile)
+        print(profiler.summary(args.profile_top))
@@ -1,14 +1,39 @@
+import importlib
+
+from .accel import BVH, KDTree, UniformGrid
 from .base import BaseObject, Intersection, Material
+from .box import Box
+from .instance import Instance
+from .matrix import Matrix
+from .mesh import Mesh
+from .plane import Plane, Rectangle
 from .ray import Ray, reflect, refract
 from .sphere import Sphere
 from .triangle import Triangle
 from .vector import Vector
 
 __all__ = (
+    'BVH',
+    'KDTree',
+    'UniformGrid',
+
     'BaseObject',
     'Intersection',
     'Material',
 
+    'Box',
+
+    'SphereCloud',
+
+    'Instance',
+
+    'Matrix',
+
+    'Mesh',
+
+    'Plane',
+    'Rectangle',
+
     'Ray',
     'reflect',
     'refract',
@@ -19,3 +44,18 @@ __all__ = (
 
     'Vector',
 )
+
+# the sphere cloud keeps its spheres in numpy arrays, so it is only imported when asked for
+_LAZY = {
+    'SphereCloud': '.cloud',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
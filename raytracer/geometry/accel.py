@@ -0,0 +1,472 @@
+import attr
+import math
+from typing import Sequence
+
+from .base import BaseObject, Intersection
+from .ray import Ray
+
+
+Point = tuple[float, float, float]
+Bounds = tuple[Point, Point]
+# an object with its box, centroid and position in the scene
+Entry = tuple[Bounds, Point, int, BaseObject]
+
+# stands in for 1 / 0 so that a ray parallel to a slab never produces nan
+_BIG = 1e300
+_PAD = 1e-7
+
+
+def object_box(obj: BaseObject) -> Bounds | None:
+    try:
+        lower, upper = obj.bounds()
+    except NotImplementedError:
+        return None
+    lower, upper = lower.to_tuple(), upper.to_tuple()
+    if not all(map(math.isfinite, lower + upper)):
+        return None
+    return tuple(coord - _PAD for coord in lower), tuple(coord + _PAD for coord in upper)
+
+
+def merge_boxes(boxes: Sequence[Bounds]) -> Bounds:
+    return (
+        tuple(min(box[0][axis] for box in boxes) for axis in range(3)),
+        tuple(max(box[1][axis] for box in boxes) for axis in range(3)),
+    )
+
+
+def inverse_direction(ray: Ray) -> Point:
+    return tuple(1 / coord if coord else _BIG for coord in ray.direction.to_tuple())
+
+
+def box_span(box: Bounds, origin: Point, inv: Point, limit: float) -> tuple[float, float] | None:
+    enter, leave = 0.0, limit
+    for lower, upper, start, scale in zip(*box, origin, inv):
+        near, far = (lower - start) * scale, (upper - start) * scale
+        if near > far:
+            near, far = far, near
+        enter, leave = max(near, enter), min(far, leave)
+        if enter > leave:
+            return None
+    return enter, leave
+
+
+def split_bounded(objects: Sequence[BaseObject]) -> tuple[list[Entry], list[tuple[int, BaseObject]]]:
+    entries, unbounded = [], []
+    for order, obj in enumerate(objects):
+        box = object_box(obj)
+        if box is None:
+            unbounded.append((order, obj))
+        else:
+            centroid = tuple((lo + hi) / 2 for lo, hi in zip(*box))
+            entries.append((box, centroid, order, obj))
+    return entries, unbounded
+
+
+class ClosestHit:
+    # ties go to the earlier object, like a linear scan over the objects
+    __slots__ = ("ray", "hit", "obj", "order", "limit")
+
+    def __init__(self, ray: Ray, limit: float):
+        self.ray = ray
+        self.hit = None
+        self.obj = None
+        self.order = -1
+        self.limit = limit
+
+    def consider(self, order: int, obj: BaseObject) -> None:
+        hit = obj.intersect(self.ray)
+        if hit is None or hit.distance > self.limit:
+            return
+        if self.hit is None or hit.distance < self.hit.distance or order < self.order:
+            self.hit, self.obj, self.order, self.limit = hit, obj, order, hit.distance
+
+
+def box_entry(box: Bounds, origin: Point, inv: Point, limit: float) -> float | None:
+    (lx, ly, lz), (ux, uy, uz) = box
+    ox, oy, oz = origin
+    ix, iy, iz = inv
+
+    near, far = (lx - ox) * ix, (ux - ox) * ix
+    if near > far:
+        near, far = far, near
+    enter, leave = max(near, 0.0), min(far, limit)
+    if enter > leave:
+        return None
+
+    near, far = (ly - oy) * iy, (uy - oy) * iy
+    if near > far:
+        near, far = far, near
+    enter, leave = max(near, enter), min(far, leave)
+    if enter > leave:
+        return None
+
+    near, far = (lz - oz) * iz, (uz - oz) * iz
+    if near > far:
+        near, far = far, near
+    enter, leave = max(near, enter), min(far, leave)
+    if enter > leave:
+        return None
+    return enter
+
+
+@attr.s(slots=True)
+class BVH:
+    objects: list[BaseObject] = attr.ib(converter=list)
+    leaf_size: int = attr.ib(default=4, kw_only=True)
+
+    # nodes are (box, right child, leaf items) in depth-first order, the left child follows its parent
+    _nodes: list[tuple[Bounds, int, tuple[tuple[int, BaseObject], ...]]] = attr.ib(
+        factory=list, init=False, repr=False,
+    )
+    _unbounded: list[tuple[int, BaseObject]] = attr.ib(factory=list, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        entries, self._unbounded = split_bounded(self.objects)
+        if entries:
+            self._build(entries)
+
+    @property
+    def depth(self) -> int:
+        def walk(idx: int) -> int:
+            _, right, _ = self._nodes[idx]
+            return 1 if right < 0 else 1 + max(walk(idx + 1), walk(right))
+        return walk(0) if self._nodes else 0
+
+    def bounds(self) -> Bounds | None:
+        return self._nodes[0][0] if self._nodes and not self._unbounded else None
+
+    def _build(self, entries: list) -> int:
+        idx = len(self._nodes)
+        box = merge_boxes([entry[0] for entry in entries])
+        if len(entries) <= self.leaf_size:
+            self._nodes.append((box, -1, tuple((entry[2], entry[3]) for entry in entries)))
+            return idx
+
+        centroids = [entry[1] for entry in entries]
+        axis = max(range(3), key=lambda axis: max(c[axis] for c in centroids) - min(c[axis] for c in centroids))
+        entries = sorted(entries, key=lambda entry: entry[1][axis])
+        middle = len(entries) // 2
+
+        self._nodes.append(None)
+        self._build(entries[:middle])
+        right = self._build(entries[middle:])
+        self._nodes[idx] = (box, right, ())
+        return idx
+
+    def intersect(self, ray: Ray, max_distance: float = math.inf) -> tuple[Intersection | None, BaseObject | None]:
+        closest = ClosestHit(ray, max_distance)
+        for order, obj in self._unbounded:
+            closest.consider(order, obj)
+
+        nodes = self._nodes
+        if not nodes:
+            return closest.hit, closest.obj
+        origin, inv = ray.origin.to_tuple(), inverse_direction(ray)
+        stack = [0]
+        while stack:
+            idx = stack.pop()
+            box, right, items = nodes[idx]
+            if box_entry(box, origin, inv, closest.limit) is None:
+                continue
+            if right < 0:
+                for order, obj in items:
+                    closest.consider(order, obj)
+            else:
+                stack.append(right)
+                stack.append(idx + 1)
+        return closest.hit, closest.obj
+
+    def occluder(self, ray: Ray, max_distance: float) -> BaseObject | None:
+        for _, obj in self._unbounded:
+            if obj.occludes(ray, max_distance):
+                return obj
+
+        nodes = self._nodes
+        if not nodes:
+            return None
+        origin, inv = ray.origin.to_tuple(), inverse_direction(ray)
+        stack = [0]
+        while stack:
+            idx = stack.pop()
+            box, right, items = nodes[idx]
+            if box_entry(box, origin, inv, max_distance) is None:
+                continue
+            if right < 0:
+                for _, obj in items:
+                    if obj.occludes(ray, max_distance):
+                        return obj
+            else:
+                stack.append(right)
+                stack.append(idx + 1)
+        return None
+
+
+@attr.s(slots=True)
+class UniformGrid:
+    objects: list[BaseObject] = attr.ib(converter=list)
+    density: float = attr.ib(default=2.0, kw_only=True)
+    max_resolution: int = attr.ib(default=128, kw_only=True)
+
+    resolution: tuple[int, int, int] = attr.ib(default=(0, 0, 0), init=False)
+    _box: Bounds | None = attr.ib(default=None, init=False, repr=False)
+    _cell_size: Point = attr.ib(default=(1.0, 1.0, 1.0), init=False, repr=False)
+    _cells: dict[tuple[int, int, int], list[tuple[int, BaseObject]]] = attr.ib(factory=dict, init=False, repr=False)
+    _unbounded: list[tuple[int, BaseObject]] = attr.ib(factory=list, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        entries, self._unbounded = split_bounded(self.objects)
+        if not entries:
+            return
+
+        self._box = lower, upper = merge_boxes([entry[0] for entry in entries])
+        extent = [hi - lo for lo, hi in zip(lower, upper)]
+        # flat scenes still get a volume, so the cell count follows the object count
+        floor = max(extent) * 1e-3 or 1.0
+        volume = math.prod(max(size, floor) for size in extent)
+        edge = (volume / (self.density * len(entries))) ** (1 / 3)
+        self.resolution = tuple(min(self.max_resolution, max(1, math.ceil(size / edge))) for size in extent)
+        self._cell_size = tuple(size / count if size else 1.0 for size, count in zip(extent, self.resolution))
+
+        for box, _, order, obj in entries:
+            first, last = self._cell_of(box[0]), self._cell_of(box[1])
+            for x in range(first[0], last[0] + 1):
+                for y in range(first[1], last[1] + 1):
+                    for z in range(first[2], last[2] + 1):
+                        self._cells.setdefault((x, y, z), []).append((order, obj))
+
+    def _cell_of(self, point: Point) -> tuple[int, int, int]:
+        return tuple(
+            min(count - 1, max(0, int((coord - lo) / size)))
+            for coord, lo, size, count in zip(point, self._box[0], self._cell_size, self.resolution)
+        )
+
+    def bounds(self) -> Bounds | None:
+        return self._box if not self._unbounded else None
+
+    def _walk(self, ray: Ray, limit: float):
+        # 3D-DDA: yields the cells pierced by the ray in order, each with the distance at which it is left
+        span = box_span(self._box, ray.origin.to_tuple(), inverse_direction(ray), limit)
+        if span is None:
+            return
+        enter, _ = span
+        origin, direction = ray.origin.to_tuple(), ray.direction.to_tuple()
+        cell = list(self._cell_of(tuple(o + enter * d for o, d in zip(origin, direction))))
+        step, next_t, delta = [0, 0, 0], [math.inf] * 3, [math.inf] * 3
+        for axis in range(3):
+            d = direction[axis]
+            if d == 0:
+                continue
+            size = self._cell_size[axis]
+            lo = self._box[0][axis] + cell[axis] * size
+            step[axis] = 1 if d > 0 else -1
+            boundary = lo + size if d > 0 else lo
+            next_t[axis] = (boundary - origin[axis]) / d
+            delta[axis] = size / abs(d)
+
+        resolution = self.resolution
+        while True:
+            axis = min(range(3), key=next_t.__getitem__)
+            leave = next_t[axis]
+            yield tuple(cell), leave
+            if leave > limit:
+                return
+            cell[axis] += step[axis]
+            if not 0 <= cell[axis] < resolution[axis]:
+                return
+            next_t[axis] += delta[axis]
+
+    def intersect(self, ray: Ray, max_distance: float = math.inf) -> tuple[Intersection | None, BaseObject | None]:
+        closest = ClosestHit(ray, max_distance)
+        for order, obj in self._unbounded:
+            closest.consider(order, obj)
+        if self._box is None:
+            return closest.hit, closest.obj
+
+        tested = set()
+        cells = self._cells
+        for cell, leave in self._walk(ray, closest.limit):
+            for order, obj in cells.get(cell, ()):
+                if order not in tested:
+                    tested.add(order)
+                    closest.consider(order, obj)
+            # a hit inside the current cell cannot be beaten by anything further along
+            if closest.hit is not None and closest.hit.distance <= leave:
+                break
+        return closest.hit, closest.obj
+
+    def occluder(self, ray: Ray, max_distance: float) -> BaseObject | None:
+        for _, obj in self._unbounded:
+            if obj.occludes(ray, max_distance):
+                return obj
+        if self._box is None:
+            return None
+
+        tested = set()
+        cells = self._cells
+        for cell, _ in self._walk(ray, max_distance):
+            for order, obj in cells.get(cell, ()):
+                if order not in tested:
+                    tested.add(order)
+                    if obj.occludes(ray, max_distance):
+                        return obj
+        return None
+
+
+@attr.s(slots=True)
+class KDTree:
+    objects: list[BaseObject] = attr.ib(converter=list)
+    leaf_size: int = attr.ib(default=4, kw_only=True)
+    max_depth: int | None = attr.ib(default=None, kw_only=True)
+
+    # inner nodes are (axis, split, left, right), leaves are (-1, 0, items, ())
+    _nodes: list[tuple] = attr.ib(factory=list, init=False, repr=False)
+    _box: Bounds | None = attr.ib(default=None, init=False, repr=False)
+    _unbounded: list[tuple[int, BaseObject]] = attr.ib(factory=list, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        entries, self._unbounded = split_bounded(self.objects)
+        if not entries:
+            return
+        if self.max_depth is None:
+            self.max_depth = round(8 + 1.3 * math.log2(len(entries)))
+        self._box = merge_boxes([entry[0] for entry in entries])
+        self._build(entries, self._box, 0)
+
+    @property
+    def depth(self) -> int:
+        def walk(idx: int) -> int:
+            axis, _, left, right = self._nodes[idx]
+            return 1 if axis < 0 else 1 + max(walk(left), walk(right))
+        return walk(0) if self._nodes else 0
+
+    def bounds(self) -> Bounds | None:
+        return self._box if not self._unbounded else None
+
+    def _build(self, entries: list, box: Bounds, depth: int) -> int:
+        idx = len(self._nodes)
+        self._nodes.append(None)
+        if len(entries) <= self.leaf_size or depth >= self.max_depth:
+            self._nodes[idx] = (-1, 0.0, tuple((entry[2], entry[3]) for entry in entries), ())
+            return idx
+
+        # unlike a BVH the split partitions space, objects straddling the plane go to both sides
+        lower, upper = box
+        axis = max(range(3), key=lambda axis: upper[axis] - lower[axis])
+        centroids = sorted(entry[1][axis] for entry in entries)
+        split = centroids[len(centroids) // 2]
+        if not lower[axis] < split < upper[axis]:
+            split = (lower[axis] + upper[axis]) / 2
+        left = [entry for entry in entries if entry[0][0][axis] <= split]
+        right = [entry for entry in entries if entry[0][1][axis] >= split]
+        if max(len(left), len(right)) == len(entries):
+            self._nodes[idx] = (-1, 0.0, tuple((entry[2], entry[3]) for entry in entries), ())
+            return idx
+
+        left_box = (lower, tuple(split if a == axis else upper[a] for a in range(3)))
+        right_box = (tuple(split if a == axis else lower[a] for a in range(3)), upper)
+        left_idx = self._build(left, left_box, depth + 1)
+        right_idx = self._build(right, right_box, depth + 1)
+        self._nodes[idx] = (axis, split, left_idx, right_idx)
+        return idx
+
+    def _leaves(self, ray: Ray, limit: float, closest: ClosestHit | None = None):
+        # front to back leaves pierced by the ray, pruned by the closest hit found so far
+        origin, inv = ray.origin.to_tuple(), inverse_direction(ray)
+        span = box_span(self._box, origin, inv, limit)
+        if span is None:
+            return
+        nodes = self._nodes
+        stack = [(0, *span)]
+        while stack:
+            idx, enter, leave = stack.pop()
+            if closest is not None and closest.hit is not None and enter > closest.hit.distance:
+                continue
+            axis, split, near, far = nodes[idx]
+            if axis < 0:
+                yield near
+                continue
+            t_split = (split - origin[axis]) * inv[axis]
+            if origin[axis] > split or (origin[axis] == split and inv[axis] > 0):
+                near, far = far, near
+            if t_split > leave or t_split <= 0:
+                stack.append((near, enter, leave))
+            elif t_split < enter:
+                stack.append((far, enter, leave))
+            else:
+                stack.append((far, t_split, leave))
+                stack.append((near, enter, t_split))
+
+    def intersect(self, ray: Ray, max_distance: float = math.inf) -> tuple[Intersection | None, BaseObject | None]:
+        closest = ClosestHit(ray, max_distance)
+        for order, obj in self._unbounded:
+            closest.consider(order, obj)
+        if self._box is None:
+            return closest.hit, closest.obj
+
+        tested = set()
+        for items in self._leaves(ray, closest.limit, closest):
+            for order, obj in items:
+                if order not in tested:
+                    tested.add(order)
+                    closest.consider(order, obj)
+        return closest.hit, closest.obj
+
+    def occluder(self, ray: Ray, max_distance: float) -> BaseObject | None:
+        for _, obj in self._unbounded:
+            if obj.occludes(ray, max_distance):
+                return obj
+        if self._box is None:
+            return None
+
+        tested = set()
+        for items in self._leaves(ray, max_distance):
+            for order, obj in items:
+                if order not in tested:
+                    tested.add(order)
+                    if obj.occludes(ray, max_distance):
+                        return obj
+        return None
+
+
+def choose_accelerator(objects: Sequence[BaseObject]) -> str | None:
+    entries, _ = split_bounded(objects)
+    if len(entries) < 16:
+        return None
+
+    sizes = sorted(math.dist(*entry[0]) for entry in entries)
+    # a few large objects next to small ones fill every grid cell and k-d leaf they cross
+    if sizes[-1] > 8 * sizes[len(sizes) // 2]:
+        return "bvh"
+
+    lower, upper = merge_boxes([entry[0] for entry in entries])
+    count = max(1, round(len(entries) ** (1 / 3)))
+    occupied = {
+        tuple(
+            min(count - 1, int((c - lo) / (hi - lo) * count)) if hi > lo else 0
+            for c, lo, hi in zip(entry[1], lower, upper)
+        )
+        for entry in entries
+    }
+    # evenly spread objects suit a grid, clustered ones (surfaces, clumps) a k-d tree
+    return "grid" if len(occupied) >= 0.25 * count ** 3 else "kdtree"
+
+
+def auto_accelerator(objects: Sequence[BaseObject]):
+    name = choose_accelerator(objects)
+    return None if name is None else ACCELERATORS[name](objects)
+
+
+ACCELERATORS = {
+    "auto": auto_accelerator,
+    "bvh": BVH,
+    "grid": UniformGrid,
+    "kdtree": KDTree,
+}
+
+
+def build_accelerator(name: str, objects: Sequence[BaseObject]):
+    try:
+        factory = ACCELERATORS[name]
+    except KeyError:
+        raise ValueError(f"unknown accelerator {name!r}, expected one of {sorted(ACCELERATORS)}") from None
+    return factory(objects)
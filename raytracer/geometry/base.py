@@ -23,15 +23,25 @@ class Intersection:
     position: Vector = attr.ib()
     normal: Vector = attr.ib()
     distance: float = attr.ib()
+    primitive: "BaseObject | None" = attr.ib(default=None, repr=False)
+    # weights of the three vertices when a triangle was hit
+    barycentric: Vector | None = attr.ib(default=None, repr=False)
+    # objects holding several materials report the scene material id of the surface they hit
+    material_id: int = attr.ib(default=-1, repr=False)
 
 
 @attr.s(slots=True, kw_only=True)
 class BaseObject:
     material: Material = attr.ib(default=None)
+    material_id: int = attr.ib(default=-1, init=False)
 
     def intersect(self, ray: Ray) -> Intersection | None:
         raise NotImplementedError()
 
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        intersection = self.intersect(ray)
+        return intersection is not None and intersection.distance < max_distance
+
     def get_normal(self, pos: Vector) -> Vector:
         raise NotImplementedError()
 
@@ -40,3 +50,9 @@ class BaseObject:
 
     def has_volume(self) -> bool:
         raise NotImplementedError()
+
+    def translated(self, offset: Vector) -> "BaseObject":
+        raise NotImplementedError()
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        raise NotImplementedError()
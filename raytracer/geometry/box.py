@@ -0,0 +1,76 @@
+import attr
+import math
+
+from .base import BaseObject, Intersection, Ray
+from .vector import Vector
+
+
+@attr.s(slots=True, kw_only=True)
+class Box(BaseObject):
+    lower: Vector = attr.ib()
+    upper: Vector = attr.ib()
+
+    def __attrs_post_init__(self):
+        if any(lo > hi for lo, hi in zip(self.lower.to_tuple(), self.upper.to_tuple())):
+            raise ValueError("box lower corner must not exceed the upper corner")
+
+    def _slabs(self, ray: Ray) -> tuple[float, int, float, int] | None:
+        enter, leave = -math.inf, math.inf
+        enter_axis = leave_axis = -1
+        origin, direction = ray.origin.to_tuple(), ray.direction.to_tuple()
+        for axis, (lo, hi) in enumerate(zip(self.lower.to_tuple(), self.upper.to_tuple())):
+            if direction[axis] == 0:
+                if not lo <= origin[axis] <= hi:
+                    return None
+                continue
+            inv = 1 / direction[axis]
+            near, far = (lo - origin[axis]) * inv, (hi - origin[axis]) * inv
+            if near > far:
+                near, far = far, near
+            if near > enter:
+                enter, enter_axis = near, axis
+            if far < leave:
+                leave, leave_axis = far, axis
+            if enter > leave:
+                return None
+        if leave < 0:
+            return None
+        return enter, enter_axis, leave, leave_axis
+
+    def intersect(self, ray: Ray) -> Intersection | None:
+        slabs = self._slabs(ray)
+        if slabs is None:
+            return None
+        enter, enter_axis, leave, leave_axis = slabs
+        # from outside the entry face faces the ray, from inside the exit face is flipped inwards like a sphere's
+        dist, axis = (enter, enter_axis) if enter >= 0 else (leave, leave_axis)
+        coords = [0.0, 0.0, 0.0]
+        coords[axis] = -math.copysign(1, ray.direction[axis])
+        return Intersection(ray.origin + dist * ray.direction, Vector(*coords), dist)
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        slabs = self._slabs(ray)
+        if slabs is None:
+            return False
+        enter, _, leave, _ = slabs
+        return (enter if enter >= 0 else leave) < max_distance
+
+    def get_normal(self, pos: Vector) -> Vector:
+        center = (self.lower + self.upper) / 2
+        half = (self.upper - self.lower) / 2
+        offset = pos - center
+        axis = max(range(3), key=lambda idx: abs(offset[idx]) / half[idx] if half[idx] else math.inf)
+        coords = [0.0, 0.0, 0.0]
+        coords[axis] = math.copysign(1, offset[axis])
+        return Vector(*coords)
+
+    def has_volume(self) -> bool:
+        return True
+
+    def translated(self, offset: Vector) -> "Box":
+        moved = Box(lower=self.lower + offset, upper=self.upper + offset, material=self.material)
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        return Vector(*self.lower.to_tuple()), Vector(*self.upper.to_tuple())
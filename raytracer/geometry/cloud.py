@@ -0,0 +1,206 @@
+import attr
+import math
+import numpy as np
+
+from .base import BaseObject, Intersection, Material
+from .ray import Ray
+from .vector import Vector
+
+
+def _points(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float32).reshape(-1, 3)
+
+
+def _scalars(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float32).reshape(-1)
+
+
+@attr.s(slots=True, kw_only=True, eq=False)
+class SphereCloud(BaseObject):
+    # float32 centers and radii plus a uint16 palette index keep a sphere at 18 bytes before the grid
+    centers: np.ndarray = attr.ib(converter=_points)
+    radii: np.ndarray = attr.ib(converter=_scalars)
+    material_ids: np.ndarray | None = attr.ib(default=None)
+    materials: list[Material] = attr.ib(factory=list)
+    density: float = attr.ib(default=1.0)
+
+    # scene material ids of the palette, filled in when the cloud is added to a scene
+    palette_ids: np.ndarray | None = attr.ib(default=None, init=False, repr=False)
+
+    _lower: np.ndarray = attr.ib(init=False, repr=False)
+    _upper: np.ndarray = attr.ib(init=False, repr=False)
+    _cell_size: np.ndarray = attr.ib(init=False, repr=False)
+    _resolution: np.ndarray = attr.ib(init=False, repr=False)
+    _cell_start: np.ndarray = attr.ib(init=False, repr=False)
+    _cell_items: np.ndarray = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        count = len(self.centers)
+        if len(self.radii) == 1 and count != 1:
+            self.radii = np.full(count, self.radii[0], dtype=np.float32)
+        if len(self.radii) != count:
+            raise ValueError(f"{count} centers but {len(self.radii)} radii")
+        if self.material_ids is None:
+            self.material_ids = np.zeros(count, dtype=np.uint16)
+        self.material_ids = np.asarray(self.material_ids, dtype=np.uint16).reshape(-1)
+        if len(self.material_ids) != count:
+            raise ValueError(f"{count} centers but {len(self.material_ids)} material ids")
+
+        if not self.materials and self.material is not None:
+            self.materials = [self.material]
+        if self.material is None and self.materials:
+            self.material = self.materials[0]
+        if count and self.material_ids.max() >= max(1, len(self.materials)):
+            raise ValueError("material ids reach past the material palette")
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (
+            self.centers, self.radii, self.material_ids, self._cell_start, self._cell_items,
+        ))
+
+    def _cells_of(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self._lower) / self._cell_size).astype(np.int64)
+        return np.clip(cells, 0, self._resolution - 1)
+
+    def _build(self) -> None:
+        centers, radii = self.centers.astype(float), self.radii.astype(float)
+        if not len(centers):
+            self._lower = self._upper = np.zeros(3)
+            self._cell_size, self._resolution = np.ones(3), np.ones(3, dtype=np.int64)
+            self._cell_start, self._cell_items = np.zeros(2, dtype=np.int32), np.zeros(0, dtype=np.int32)
+            return
+
+        lower = (centers - radii[:, None]).min(axis=0)
+        upper = (centers + radii[:, None]).max(axis=0)
+        extent = upper - lower
+        floor = extent.max() * 1e-3 or 1.0
+        edge = (np.prod(np.maximum(extent, floor)) / (self.density * len(centers))) ** (1 / 3)
+        # cells narrower than a typical sphere would list every sphere many times
+        edge = max(edge, 2 * float(np.median(radii)))
+        resolution = np.clip(np.ceil(extent / edge), 1, 512).astype(np.int64)
+        self._lower, self._upper = lower, upper
+        self._cell_size = np.where(extent > 0, extent / resolution, 1.0)
+        self._resolution = resolution
+
+        # every sphere is listed in each cell its bounding box overlaps
+        first = self._cells_of(centers - radii[:, None])
+        span = self._cells_of(centers + radii[:, None]) - first + 1
+        counts = span.prod(axis=1)
+        owners = np.repeat(np.arange(len(centers)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span = span[owners]
+        offset = np.stack(
+            [local // (span[:, 1] * span[:, 2]), local // span[:, 2] % span[:, 1], local % span[:, 2]], axis=1,
+        )
+        cells = first[owners] + offset
+        keys = (cells[:, 0] * resolution[1] + cells[:, 1]) * resolution[2] + cells[:, 2]
+
+        order = np.argsort(keys, kind="stable")
+        self._cell_items = owners[order].astype(np.int32)
+        self._cell_start = np.searchsorted(keys[order], np.arange(resolution.prod() + 1)).astype(np.int32)
+
+    def _candidates(self, origin: np.ndarray, direction: np.ndarray, limit: float) -> np.ndarray:
+        # cells pierced by the ray, found from its crossings of the grid planes instead of a python DDA loop
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1 / direction
+            near = (self._lower - origin) * inv
+            far = (self._upper - origin) * inv
+        parallel = direction == 0
+        near, far = np.minimum(near, far), np.maximum(near, far)
+        near, far = np.where(parallel, -np.inf, near), np.where(parallel, np.inf, far)
+        inside = (direction != 0) | ((origin >= self._lower) & (origin <= self._upper))
+        enter, leave = max(near.max(), 0.0), min(far.min(), limit)
+        if not inside.all() or enter > leave:
+            return np.zeros(0, dtype=np.int32)
+
+        crossings = [np.array([enter])]
+        for axis in range(3):
+            if direction[axis] == 0:
+                continue
+            planes = self._lower[axis] + self._cell_size[axis] * np.arange(1, self._resolution[axis])
+            times = (planes - origin[axis]) * inv[axis]
+            crossings.append(times[(times > enter) & (times < leave)])
+        times = np.sort(np.concatenate(crossings))
+        middles = (times + np.append(times[1:], leave)) / 2
+        cells = self._cells_of(origin + middles[:, None] * direction)
+        keys = (cells[:, 0] * self._resolution[1] + cells[:, 1]) * self._resolution[2] + cells[:, 2]
+
+        starts, stops = self._cell_start[keys], self._cell_start[keys + 1]
+        counts = stops - starts
+        if not counts.any():
+            return np.zeros(0, dtype=np.int32)
+        # every item index from starts[i] to stops[i], for all cells at once
+        positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions += np.repeat(starts, counts)
+        return np.unique(self._cell_items[positions])
+
+    def _hits(self, ray: Ray, limit: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        origin, direction = np.array(ray.origin.to_tuple()), np.array(ray.direction.to_tuple())
+        candidates = self._candidates(origin, direction, limit)
+        if not len(candidates):
+            return candidates, np.zeros(0), np.zeros(0)
+
+        # the same roots as Sphere.intersect, the near one unless the ray starts inside
+        offsets = origin - self.centers[candidates].astype(float)
+        radii = self.radii[candidates].astype(float)
+        a = direction @ direction
+        b = offsets @ direction
+        c = np.einsum("ij,ij->i", offsets, offsets) - radii * radii
+        discriminant = b * b - a * c
+        valid = discriminant >= 0
+        root = np.sqrt(np.where(valid, discriminant, 0))
+        distances = (-b - root) / a
+        distances = np.where(distances > 0, distances, (-b + root) / a)
+        valid &= (distances >= 0) & (distances <= limit)
+        return candidates[valid], distances[valid], c[valid]
+
+    def intersect(self, ray: Ray, max_distance: float = math.inf) -> Intersection | None:
+        candidates, distances, c = self._hits(ray, max_distance)
+        if not len(candidates):
+            return None
+        # ties go to the lower sphere index, like a list of spheres scanned in order
+        best = np.flatnonzero(distances == distances.min())
+        best = best[np.argmin(candidates[best])]
+        sphere, distance = int(candidates[best]), float(distances[best])
+
+        point = ray.origin + distance * ray.direction
+        normal = self.get_normal(point, sphere)
+        if c[best] < 0:
+            normal *= -1
+        intersection = Intersection(point, normal, distance)
+        if self.palette_ids is not None:
+            intersection.material_id = int(self.palette_ids[self.material_ids[sphere]])
+        return intersection
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        candidates, distances, _ = self._hits(ray, max_distance)
+        return bool((distances < max_distance).any())
+
+    def get_normal(self, point: Vector, sphere: int = 0) -> Vector:
+        normal = point - Vector(*self.centers[sphere].tolist())
+        normal /= float(self.radii[sphere])
+        return normal
+
+    def has_volume(self) -> bool:
+        return True
+
+    def translated(self, offset: Vector) -> "SphereCloud":
+        moved = SphereCloud(
+            centers=self.centers + np.array(offset.to_tuple(), dtype=np.float32),
+            radii=self.radii,
+            material_ids=self.material_ids,
+            materials=self.materials,
+            material=self.material,
+            density=self.density,
+        )
+        moved.material_id = self.material_id
+        moved.palette_ids = self.palette_ids
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        return Vector(*self._lower.tolist()), Vector(*self._upper.tolist())
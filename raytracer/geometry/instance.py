@@ -0,0 +1,60 @@
+import attr
+import itertools
+
+from .base import BaseObject, Intersection, Ray
+from .matrix import Matrix
+from .vector import Vector
+
+
+@attr.s(slots=True, kw_only=True)
+class Instance(BaseObject):
+    # the geometry is shared between instances, only the transform is stored per instance
+    geometry: BaseObject = attr.ib()
+    transform: Matrix = attr.ib(factory=Matrix.identity)
+
+    _inverse: Matrix = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.material is None:
+            self.material = self.geometry.material
+        self._inverse = self.transform.inverse()
+
+    def _local_ray(self, ray: Ray) -> tuple[Ray, float]:
+        direction = self._inverse.transform_vector(ray.direction)
+        scale = direction.length
+        return Ray(origin=self._inverse.transform_point(ray.origin), direction=direction), scale
+
+    def intersect(self, ray: Ray) -> Intersection | None:
+        local, scale = self._local_ray(ray)
+        intersection = self.geometry.intersect(local)
+        if intersection is None:
+            return None
+
+        normal = self._inverse.transpose_multiply(intersection.normal)
+        normal.normalize()
+        # the primitive and its barycentrics stay in the local frame of the geometry
+        intersection.position = self.transform.transform_point(intersection.position)
+        intersection.normal = normal
+        intersection.distance /= scale
+        return intersection
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        local, scale = self._local_ray(ray)
+        return self.geometry.occludes(local, max_distance * scale)
+
+    def has_volume(self) -> bool:
+        return self.geometry.has_volume()
+
+    def translated(self, offset: Vector) -> "Instance":
+        transform = self.transform @ Matrix.translation(offset)
+        moved = Instance(geometry=self.geometry, transform=transform, material=self.material)
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        lower, upper = self.geometry.bounds()
+        corners = [
+            self.transform.transform_point(Vector(*corner)).to_tuple()
+            for corner in itertools.product(*zip(lower.to_tuple(), upper.to_tuple()))
+        ]
+        return Vector(*map(min, *corners)), Vector(*map(max, *corners))
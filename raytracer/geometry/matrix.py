@@ -0,0 +1,115 @@
+import math
+from array import array
+
+from .vector import Vector
+
+
+Row = tuple[float, float, float]
+
+
+class Matrix:
+    # row-vector convention: a point maps to x * right + y * up + z * forward + from_
+    # a flat array of doubles keeps per-instance transforms small
+    __slots__ = ("_data", "_array")
+
+    def __init__(self, right: Vector, up: Vector, forward: Vector, from_: Vector):
+        self._data = array("d", (*right.to_tuple(), *up.to_tuple(), *forward.to_tuple(), *from_.to_tuple()))
+        self._array = None
+
+    @classmethod
+    def from_rows(cls, rows) -> "Matrix":
+        return cls(*(Vector(*row[:3]) for row in rows))
+
+    @classmethod
+    def identity(cls) -> "Matrix":
+        return cls(Vector(1, 0, 0), Vector(0, 1, 0), Vector(0, 0, 1), Vector(0))
+
+    @classmethod
+    def translation(cls, offset: Vector) -> "Matrix":
+        return cls(Vector(1, 0, 0), Vector(0, 1, 0), Vector(0, 0, 1), offset)
+
+    @classmethod
+    def scaling(cls, factor: Vector | float) -> "Matrix":
+        if not isinstance(factor, Vector):
+            factor = Vector(factor)
+        return cls(Vector(factor.x, 0, 0), Vector(0, factor.y, 0), Vector(0, 0, factor.z), Vector(0))
+
+    @classmethod
+    def rotation(cls, axis: Vector, angle: float) -> "Matrix":
+        x, y, z = (axis / axis.length).to_tuple()
+        cos, sin = math.cos(angle), math.sin(angle)
+        t = 1 - cos
+        return cls(
+            Vector(t * x * x + cos, t * x * y + sin * z, t * x * z - sin * y),
+            Vector(t * x * y - sin * z, t * y * y + cos, t * y * z + sin * x),
+            Vector(t * x * z + sin * y, t * y * z - sin * x, t * z * z + cos),
+            Vector(0),
+        )
+
+    @property
+    def rows(self) -> tuple[Row, Row, Row, Row]:
+        data = self._data
+        return tuple(tuple(data[idx:idx + 3]) for idx in range(0, 12, 3))
+
+    def __getitem__(self, idx):
+        if self._array is None:
+            import numpy as np
+            self._array = np.array([(*row, 0.0) for row in self.rows], dtype=float)
+            self._array[3, 3] = 1
+        return self._array[idx]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return all(
+            Vector(*lhs) == Vector(*rhs)
+            for lhs, rhs in zip(self.rows, other.rows)
+        )
+
+    def __repr__(self) -> str:
+        return f"Matrix({', '.join(repr(Vector(*row)) for row in self.rows)})"
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, data):
+        self._data = data
+        self._array = None
+
+    def __matmul__(self, other: "Matrix") -> "Matrix":
+        # applies self first, then other
+        rows = self.rows
+        return Matrix(*(other.transform_vector(Vector(*row)) for row in rows[:3]),
+                      other.transform_point(Vector(*rows[3])))
+
+    def transform_vector(self, vector: Vector) -> Vector:
+        a, b, c, d, e, f, g, h, i, _, _, _ = self._data
+        x, y, z = vector.x, vector.y, vector.z
+        return Vector(x * a + y * d + z * g, x * b + y * e + z * h, x * c + y * f + z * i)
+
+    def transform_point(self, point: Vector) -> Vector:
+        a, b, c, d, e, f, g, h, i, tx, ty, tz = self._data
+        x, y, z = point.x, point.y, point.z
+        return Vector(x * a + y * d + z * g + tx, x * b + y * e + z * h + ty, x * c + y * f + z * i + tz)
+
+    def transpose_multiply(self, vector: Vector) -> Vector:
+        # with the inverse matrix this maps object space normals to world space
+        a, b, c, d, e, f, g, h, i, _, _, _ = self._data
+        x, y, z = vector.x, vector.y, vector.z
+        return Vector(x * a + y * b + z * c, x * d + y * e + z * f, x * g + y * h + z * i)
+
+    def determinant(self) -> float:
+        a, b, c, d, e, f, g, h, i, _, _, _ = self._data
+        return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+    def inverse(self) -> "Matrix":
+        a, b, c, d, e, f, g, h, i, tx, ty, tz = self._data
+        det = self.determinant()
+        if det == 0:
+            raise ZeroDivisionError("matrix is singular")
+        inv = 1 / det
+        right = Vector(e * i - f * h, c * h - b * i, b * f - c * e) * inv
+        up = Vector(f * g - d * i, a * i - c * g, c * d - a * f) * inv
+        forward = Vector(d * h - e * g, b * g - a * h, a * e - b * d) * inv
+        linear = Matrix(right, up, forward, Vector(0))
+        return Matrix(right, up, forward, -linear.transform_vector(Vector(tx, ty, tz)))
@@ -0,0 +1,98 @@
+import attr
+from typing import Sequence
+
+from .accel import BVH
+from .base import BaseObject, Intersection, Ray
+from .triangle import Triangle
+from .vector import Vector
+
+
+Face = tuple[int, int, int]
+
+
+def vertex_normals(vertices: Sequence[Vector], faces: Sequence[Face]) -> list[Vector]:
+    # unnormalized face normals weight every face by its area
+    normals = [Vector() for _ in vertices]
+    for a, b, c in faces:
+        face_normal = (vertices[b] - vertices[a]).cross(vertices[c] - vertices[a])
+        for idx in (a, b, c):
+            normals[idx] += face_normal
+    for normal in normals:
+        if normal.length > 0:
+            normal.normalize()
+    return normals
+
+
+@attr.s(slots=True, kw_only=True)
+class Mesh(BaseObject):
+    vertices: list[Vector] = attr.ib(converter=list)
+    faces: list[Face] = attr.ib(converter=lambda faces: [tuple(map(int, face)) for face in faces])
+    closed: bool = attr.ib(default=False)
+    normals: list[Vector] | None = attr.ib(default=None, converter=attr.converters.optional(list))
+
+    _triangles: list[Triangle] = attr.ib(init=False, eq=False, repr=False)
+    _bvh: BVH = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.normals is not None and len(self.normals) != len(self.vertices):
+            raise ValueError(f"{len(self.vertices)} vertices but {len(self.normals)} normals")
+        self._triangles = [
+            Triangle(
+                [self.vertices[a], self.vertices[b], self.vertices[c]],
+                [self.normals[a], self.normals[b], self.normals[c]] if self.normals is not None else None,
+                material=self.material,
+            )
+            for a, b, c in self.faces
+        ]
+        self._bvh = BVH(self._triangles)
+
+    @classmethod
+    def from_triangles(cls, triangles: Sequence[Triangle], **kwargs) -> "Mesh":
+        index: dict[tuple[float, float, float], int] = {}
+        faces = [
+            tuple(index.setdefault(triangle[idx].to_tuple(), len(index)) for idx in range(3))
+            for triangle in triangles
+        ]
+        return cls(vertices=[Vector(*coords) for coords in index], faces=faces, **kwargs)
+
+    def smoothed(self) -> "Mesh":
+        smooth = Mesh(
+            vertices=self.vertices,
+            faces=self.faces,
+            closed=self.closed,
+            normals=vertex_normals(self.vertices, self.faces),
+            material=self.material,
+        )
+        smooth.material_id = self.material_id
+        return smooth
+
+    @property
+    def triangles(self) -> list[Triangle]:
+        return self._triangles
+
+    def intersect(self, ray: Ray) -> Intersection | None:
+        intersection, triangle = self._bvh.intersect(ray)
+        if intersection is not None:
+            intersection.primitive = triangle
+        return intersection
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        return self._bvh.occluder(ray, max_distance) is not None
+
+    def has_volume(self) -> bool:
+        return self.closed
+
+    def translated(self, offset: Vector) -> "Mesh":
+        moved = Mesh(
+            vertices=[vertex + offset for vertex in self.vertices],
+            faces=self.faces,
+            closed=self.closed,
+            normals=self.normals,
+            material=self.material,
+        )
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        coords = [vertex.to_tuple() for vertex in self.vertices]
+        return Vector(*map(min, *coords)), Vector(*map(max, *coords))
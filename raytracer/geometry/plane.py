@@ -0,0 +1,125 @@
+import attr
+import math
+
+from .base import BaseObject, Intersection, Ray
+from .vector import Vector
+
+
+EPS = 1e-8
+
+
+def _unit(vector: Vector) -> Vector:
+    return vector / vector.length
+
+
+def _facing(normal: Vector, ray: Ray) -> Vector:
+    return -normal if ray.direction.dot(normal) > 0 else Vector(normal.x, normal.y, normal.z)
+
+
+@attr.s(slots=True, kw_only=True)
+class Plane(BaseObject):
+    point: Vector = attr.ib()
+    normal: Vector = attr.ib(converter=_unit)
+
+    def _distance(self, ray: Ray) -> float | None:
+        denom = self.normal.dot(ray.direction)
+        if abs(denom) < EPS:
+            return None
+        dist = self.normal.dot(self.point - ray.origin) / denom
+        return dist if dist >= 0 else None
+
+    def intersect(self, ray: Ray) -> Intersection | None:
+        dist = self._distance(ray)
+        if dist is None:
+            return None
+        return Intersection(ray.origin + dist * ray.direction, _facing(self.normal, ray), dist)
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        dist = self._distance(ray)
+        return dist is not None and dist < max_distance
+
+    def get_normal(self, pos: Vector) -> Vector:
+        return Vector(self.normal.x, self.normal.y, self.normal.z)
+
+    def has_volume(self) -> bool:
+        return False
+
+    def translated(self, offset: Vector) -> "Plane":
+        moved = Plane(point=self.point + offset, normal=self.normal, material=self.material)
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        # only an axis-aligned plane is bounded, and only along its normal
+        coords = self.normal.to_tuple()
+        lower = [-math.inf] * 3
+        upper = [math.inf] * 3
+        for axis, coord in enumerate(coords):
+            if abs(coord) == 1:
+                lower[axis] = upper[axis] = self.point[axis]
+        return Vector(*lower), Vector(*upper)
+
+
+@attr.s(slots=True, kw_only=True)
+class Rectangle(BaseObject):
+    # a parallelogram spanned by two edges from a corner
+    origin: Vector = attr.ib()
+    edge_u: Vector = attr.ib()
+    edge_v: Vector = attr.ib()
+
+    _normal: Vector = attr.ib(init=False, eq=False, repr=False)
+    _dual_u: Vector = attr.ib(init=False, eq=False, repr=False)
+    _dual_v: Vector = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        normal = self.edge_u.cross(self.edge_v)
+        area2 = normal.dot(normal)
+        if area2 < EPS * EPS:
+            raise ValueError("rectangle edges must not be parallel")
+        self._normal = _unit(normal)
+        self._dual_u = self.edge_v.cross(normal) / area2
+        self._dual_v = normal.cross(self.edge_u) / area2
+
+    def _distance(self, ray: Ray) -> float | None:
+        denom = self._normal.dot(ray.direction)
+        if abs(denom) < EPS:
+            return None
+        offset = self.origin - ray.origin
+        dist = self._normal.dot(offset) / denom
+        if dist < 0:
+            return None
+        local = dist * ray.direction - offset
+        if not 0 <= local.dot(self._dual_u) <= 1 or not 0 <= local.dot(self._dual_v) <= 1:
+            return None
+        return dist
+
+    def intersect(self, ray: Ray) -> Intersection | None:
+        dist = self._distance(ray)
+        if dist is None:
+            return None
+        return Intersection(ray.origin + dist * ray.direction, _facing(self._normal, ray), dist)
+
+    def occludes(self, ray: Ray, max_distance: float) -> bool:
+        dist = self._distance(ray)
+        return dist is not None and dist < max_distance
+
+    def get_normal(self, pos: Vector) -> Vector:
+        return Vector(self._normal.x, self._normal.y, self._normal.z)
+
+    def has_volume(self) -> bool:
+        return False
+
+    def translated(self, offset: Vector) -> "Rectangle":
+        moved = Rectangle(
+            origin=self.origin + offset, edge_u=self.edge_u, edge_v=self.edge_v, material=self.material,
+        )
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        corners = [
+            corner.to_tuple()
+            for corner in (self.origin, self.origin + self.edge_u, self.origin + self.edge_v,
+                           self.origin + self.edge_u + self.edge_v)
+        ]
+        return Vector(*map(min, *corners)), Vector(*map(max, *corners))
@@ -61,3 +61,11 @@ class Sphere(BaseObject):
 
     def has_volume(self) -> bool:
         return True
+
+    def translated(self, offset: Vector) -> "Sphere":
+        moved = Sphere(center=self.center + offset, radius=self.radius, material=self.material)
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        return self.center - Vector(self.radius), self.center + Vector(self.radius)
@@ -0,0 +1,3 @@
+def closest(objects, ray):
+    hits = [(hit, obj) for obj in objects if (hit := obj.intersect(ray)) is not None]
+    return min(hits, key=lambda pair: pair[0].distance, default=(None, None))
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from .. import BVH, KDTree, Plane, Ray, Sphere, Triangle, UniformGrid, Vector
+from ..accel import choose_accelerator
+from .helpers import closest
+
+
+def random_objects(rng: random.Random, count: int = 80) -> list:
+    objects = [
+        Sphere(
+            center=Vector(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-15, -5)),
+            radius=rng.uniform(0.1, 1),
+        )
+        for _ in range(count)
+    ]
+    objects.insert(count // 2, Triangle([Vector(-20, -6, 0), Vector(20, -6, 0), Vector(0, -6, -40)]))
+    objects.append(Plane(point=Vector(0, 0, -30), normal=Vector(0, 0, 1)))
+    return objects
+
+
+@pytest.mark.parametrize("factory", [BVH, UniformGrid, KDTree])
+class TestAccelerators:
+    def test_matches_linear_scan(self, factory):
+        rng = random.Random(3)
+        objects = random_objects(rng)
+        accel = factory(objects)
+        centers = [obj.center for obj in objects if isinstance(obj, Sphere)]
+        for idx in range(400):
+            origin = Vector(rng.uniform(-6, 6), rng.uniform(-6, 6), rng.uniform(-16, 4))
+            if idx % 2:
+                # median splits pass through object centres, so start some rays right on a split plane
+                origin = Vector(rng.choice(centers).x, rng.choice(centers).y, origin.z)
+            ray = Ray(origin=origin, direction=Vector(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)))
+            hit, obj = accel.intersect(ray)
+            expected, expected_obj = closest(objects, ray)
+            assert obj is expected_obj
+            if hit is not None:
+                assert hit.distance == expected.distance
+                assert accel.occluder(ray, hit.distance + 1e-6) is not None
+                assert accel.occluder(ray, hit.distance * 0.99) is None
+
+    def test_axis_aligned_rays(self, factory):
+        objects = [Sphere(center=Vector(x, y, -5), radius=0.4) for x in range(-3, 4) for y in range(-3, 4)]
+        accel = factory(objects)
+        for x in range(-3, 4):
+            ray = Ray(origin=Vector(x, 0, 0), direction=Vector(0, 0, -1))
+            assert accel.intersect(ray)[1] is objects[(x + 3) * 7 + 3]
+            ray = Ray(origin=Vector(-10, x, -5), direction=Vector(1, 0, 0))
+            assert accel.intersect(ray)[1] is objects[(x + 3)]
+
+
+class TestChooseAccelerator:
+    def test_heuristic(self):
+        rng = random.Random(4)
+        assert choose_accelerator(random_objects(rng, count=8)) is None
+        assert choose_accelerator(random_objects(rng)) == "bvh"
+
+        particles = [
+            Sphere(center=Vector(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-5, 5)), radius=0.05)
+            for _ in range(500)
+        ]
+        assert choose_accelerator(particles) == "grid"
+
+        clumps = [
+            Sphere(center=Vector(rng.gauss(cx, 0.1), rng.gauss(0, 0.1), rng.gauss(0, 0.1)), radius=0.05)
+            for cx in (-20, 20) for _ in range(250)
+        ]
+        assert choose_accelerator(clumps) == "kdtree"
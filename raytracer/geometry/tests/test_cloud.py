@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from .. import Material, Ray, Sphere, SphereCloud, Vector
+from .helpers import closest
+
+
+def random_cloud(count: int, seed: int = 5, radius: float = 0.4) -> tuple[SphereCloud, list[Sphere]]:
+    rng = np.random.default_rng(seed)
+    materials = [Material(diffuse_color=Vector(1, 0, 0)), Material(diffuse_color=Vector(0, 0, 1))]
+    cloud = SphereCloud(
+        centers=rng.uniform(-5, 5, (count, 3)),
+        radii=rng.uniform(radius / 8, radius, count),
+        material_ids=rng.integers(0, 2, count),
+        materials=materials,
+    )
+    spheres = [
+        Sphere(center=Vector(*center.tolist()), radius=float(radius), material=materials[idx])
+        for center, radius, idx in zip(cloud.centers, cloud.radii, cloud.material_ids)
+    ]
+    return cloud, spheres
+
+
+class TestSphereCloud:
+    def test_matches_spheres(self):
+        cloud, spheres = random_cloud(400)
+        cloud.palette_ids = np.array([10, 11])
+        rng = np.random.default_rng(6)
+        for idx in range(300):
+            origin = rng.uniform(-7, 7, 3) if idx % 3 else cloud.centers[idx].astype(float)
+            ray = Ray(origin=Vector(*origin.tolist()), direction=Vector(*rng.normal(size=3).tolist()))
+            hit = cloud.intersect(ray)
+            expected, sphere = closest(spheres, ray)
+            assert (hit is None) == (expected is None)
+            if hit is not None:
+                assert hit.distance == pytest.approx(expected.distance)
+                assert hit.normal.dot(expected.normal) == pytest.approx(1)
+                assert hit.material_id == 10 + cloud.materials.index(sphere.material)
+                assert cloud.occludes(ray, hit.distance + 1e-6)
+                assert not cloud.occludes(ray, hit.distance * 0.99)
+
+    def test_axis_aligned_rays(self):
+        cloud = SphereCloud(centers=[(x, 0, -5) for x in range(-3, 4)], radii=0.4)
+        for x in range(-3, 4):
+            hit = cloud.intersect(Ray(origin=Vector(x, 0, 0), direction=Vector(0, 0, -1)))
+            assert hit.distance == pytest.approx(4.6)
+        hit = cloud.intersect(Ray(origin=Vector(-10, 0, -5), direction=Vector(1, 0, 0)))
+        assert hit.distance == pytest.approx(6.6)
+        assert cloud.intersect(Ray(origin=Vector(0.5, 0, 0), direction=Vector(0, 0, -1))) is None
+
+    def test_compact(self):
+        cloud, _ = random_cloud(20000, radius=0.05)
+        assert cloud.nbytes / len(cloud) < 40
+        lower, upper = cloud.bounds()
+        assert lower.x >= -5.4 and upper.x <= 5.4
@@ -0,0 +1,125 @@
+import math
+import random
+import tracemalloc
+
+from .. import BVH, Instance, Matrix, Mesh, Ray, Sphere, Triangle, Vector
+from .helpers import closest
+
+
+def make_mesh(size: int = 8) -> Mesh:
+    vertices = [Vector(i / size, j / size, 0.1 * math.sin(i + j)) for j in range(size + 1) for i in range(size + 1)]
+    faces = []
+    for j in range(size):
+        for i in range(size):
+            corner = j * (size + 1) + i
+            faces += [(corner, corner + 1, corner + size + 2), (corner, corner + size + 2, corner + size + 1)]
+    return Mesh(vertices=vertices, faces=faces)
+
+
+class TestMatrix:
+    def test_inverse(self):
+        matrix = Matrix.rotation(Vector(0, 1, 1), 0.7) @ Matrix.scaling(Vector(2, 1, 3))
+        matrix = matrix @ Matrix.translation(Vector(1, 2, -5))
+        assert matrix @ matrix.inverse() == Matrix.identity()
+        point = Vector(0.3, -1, 2)
+        assert matrix.inverse().transform_point(matrix.transform_point(point)) == point
+
+    def test_compose_order(self):
+        matrix = Matrix.scaling(2) @ Matrix.translation(Vector(1, 0, 0))
+        assert matrix.transform_point(Vector(1, 1, 1)) == Vector(3, 2, 2)
+        assert matrix.transform_vector(Vector(1, 1, 1)) == Vector(2, 2, 2)
+
+
+class TestInstance:
+    def test_matches_transformed_triangles(self):
+        mesh = make_mesh()
+        transform = Matrix.rotation(Vector(1, 1, 0), 0.4) @ Matrix.scaling(Vector(2, 1, 3))
+        transform = transform @ Matrix.translation(Vector(1, 2, -5))
+        instance = Instance(geometry=mesh, transform=transform)
+        flat = [
+            Triangle([transform.transform_point(triangle[idx]) for idx in range(3)]) for triangle in mesh.triangles
+        ]
+
+        rng = random.Random(1)
+        for _ in range(100):
+            origin = Vector(rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(3, 6))
+            target = transform.transform_point(Vector(rng.random(), rng.random(), 0))
+            hit = instance.intersect(Ray(origin=origin, direction=target - origin))
+            expected, _ = closest(flat, Ray(origin=origin, direction=target - origin))
+            assert (hit is None) == (expected is None)
+            if hit is not None:
+                assert math.isclose(hit.distance, expected.distance, rel_tol=1e-9)
+                assert hit.position == expected.position
+                assert hit.normal == expected.normal
+                assert hit.primitive in mesh.triangles
+
+    def test_bounds(self):
+        instance = Instance(geometry=Sphere(center=Vector(0), radius=1), transform=Matrix.scaling(Vector(1, 2, 3)))
+        assert instance.bounds() == (Vector(-1, -2, -3), Vector(1, 2, 3))
+        assert instance.translated(Vector(1, 0, 0)).bounds() == (Vector(0, -2, -3), Vector(2, 2, 3))
+
+    def test_instances_share_geometry(self):
+        tracemalloc.start()
+        try:
+            mesh = make_mesh(20)
+            one_mesh = tracemalloc.get_traced_memory()[0]
+            instances = [
+                Instance(geometry=mesh, transform=Matrix.translation(Vector(idx % 40, 0, -(idx // 40))))
+                for idx in range(1000)
+            ]
+            all_instances = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert len(instances) == 1000
+        assert all_instances - one_mesh < one_mesh
+
+
+class TestMesh:
+    def test_smoothed_normals_follow_surface(self):
+        # an octahedron is a very coarse sphere, its interpolated normals should still lean radially
+        vertices = [
+            Vector(1, 0, 0), Vector(-1, 0, 0), Vector(0, 1, 0), Vector(0, -1, 0), Vector(0, 0, 1), Vector(0, 0, -1),
+        ]
+        faces = [(0, 2, 4), (2, 1, 4), (1, 3, 4), (3, 0, 4), (2, 0, 5), (1, 2, 5), (3, 1, 5), (0, 3, 5)]
+        flat = Mesh(vertices=vertices, faces=faces, closed=True)
+        smooth = flat.smoothed()
+        assert smooth.normals[0] == Vector(1, 0, 0)
+
+        rng = random.Random(5)
+        flat_error = smooth_error = 0
+        for _ in range(100):
+            ray = Ray(origin=Vector(rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5), 5), direction=Vector(0, 0, -1))
+            flat_hit, smooth_hit = flat.intersect(ray), smooth.intersect(ray)
+            assert smooth_hit.position == flat_hit.position
+            radial = Vector(*flat_hit.position.to_tuple()).normalize()
+            flat_error += 1 - flat_hit.normal.dot(radial)
+            smooth_error += 1 - smooth_hit.normal.dot(radial)
+        assert smooth_error < flat_error / 2
+
+        moved = Instance(geometry=smooth, transform=Matrix.translation(Vector(3, 0, 0)))
+        hit = moved.intersect(Ray(origin=Vector(3.2, 0.1, 5), direction=Vector(0, 0, -1)))
+        assert hit.barycentric is not None
+        assert hit.normal == smooth.intersect(Ray(origin=Vector(0.2, 0.1, 5), direction=Vector(0, 0, -1))).normal
+
+
+class TestBVH:
+    def test_matches_linear_scan(self):
+        rng = random.Random(2)
+        spheres = [
+            Sphere(
+                center=Vector(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-15, -5)),
+                radius=rng.uniform(0.2, 1),
+            )
+            for _ in range(60)
+        ]
+        bvh = BVH(spheres)
+        assert bvh.depth < len(spheres)
+        for _ in range(200):
+            ray = Ray(origin=Vector(0), direction=Vector(rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5), -1))
+            hit, obj = bvh.intersect(ray)
+            expected, expected_obj = closest(spheres, ray)
+            assert obj is expected_obj
+            if hit is not None:
+                assert hit.distance == expected.distance
+                assert bvh.occluder(ray, hit.distance + 1) is not None
+            assert bvh.occluder(ray, 1e-3) is None
@@ -1,6 +1,6 @@
 import numpy as np
 
-from .. import Ray, Sphere, Triangle, Vector
+from .. import Box, Plane, Ray, Rectangle, Sphere, Triangle, Vector
 
 
 class TestSphere:
@@ -71,3 +71,81 @@ class TestTriangle:
         assert np.allclose(inside.x, 0.8)
         assert np.allclose(inside.y, 0.1)
         assert np.allclose(inside.z, 0.1)
+
+    def test_smooth_normals(self):
+        normals = [Vector(0, 0, 1), Vector(1, 0, 1).normalize(), Vector(0, 1, 1).normalize()]
+        triangle = Triangle([Vector(0, 0, 0), Vector(2, 0, 0), Vector(0, 2, 0)], normals)
+
+        hit = triangle.intersect(Ray(origin=Vector(0.4, 0.6, 1), direction=Vector(0, 0, -1)))
+        assert np.allclose(hit.barycentric.to_tuple(), triangle.get_barycentric_coords(hit.position).to_tuple())
+        assert np.allclose(hit.barycentric.to_tuple(), (0.5, 0.2, 0.3))
+        expected = Triangle.interpolate(normals, hit.barycentric).normalize()
+        assert np.allclose(hit.normal.to_tuple(), expected.to_tuple())
+
+        near_vertex = triangle.intersect(Ray(origin=Vector(1.999, 0, -1), direction=Vector(0, 0, 1)))
+        assert np.allclose(near_vertex.normal.to_tuple(), (-normals[1]).to_tuple(), atol=1e-3)
+
+
+class TestPlane:
+    def test_intersect(self):
+        plane = Plane(point=Vector(0, 1, 0), normal=Vector(0, 2, 0))
+        intersection = plane.intersect(Ray(origin=Vector(3, 5, 0), direction=Vector(0, -1, 0)))
+        assert intersection.position == Vector(3, 1, 0)
+        assert intersection.normal == Vector(0, 1, 0)
+        assert np.allclose(intersection.distance, 4)
+
+        assert plane.intersect(Ray(origin=Vector(3, 5, 0), direction=Vector(1, 0, 0))) is None
+        assert plane.intersect(Ray(origin=Vector(3, 5, 0), direction=Vector(0, 1, 0))) is None
+        assert plane.intersect(Ray(origin=Vector(0, 0, 0), direction=Vector(0, 1, 0))).normal == Vector(0, -1, 0)
+
+    def test_bounds(self):
+        lower, upper = Plane(point=Vector(0, 1, 0), normal=Vector(0, 1, 0)).bounds()
+        assert (lower.y, upper.y) == (1, 1)
+        assert np.isinf([lower.x, upper.z]).all()
+
+
+class TestRectangle:
+    def test_intersect(self):
+        rectangle = Rectangle(origin=Vector(0, 0, -1), edge_u=Vector(2, 0, 0), edge_v=Vector(1, 1, 0))
+        hit = rectangle.intersect(Ray(origin=Vector(2.5, 0.5, 1), direction=Vector(0, 0, -1)))
+        assert hit is not None
+        assert hit.normal == Vector(0, 0, 1)
+        assert np.allclose(hit.distance, 2)
+
+        assert rectangle.intersect(Ray(origin=Vector(0.2, 0.5, 1), direction=Vector(0, 0, -1))) is None
+        assert rectangle.occludes(Ray(origin=Vector(2.5, 0.5, 1), direction=Vector(0, 0, -1)), 2.5)
+        assert not rectangle.occludes(Ray(origin=Vector(2.5, 0.5, 1), direction=Vector(0, 0, -1)), 1.5)
+
+    def test_matches_triangles(self):
+        rectangle = Rectangle(origin=Vector(-1, 0, -1), edge_u=Vector(2, 0, 0), edge_v=Vector(0, 1, -1))
+        corners = [Vector(-1, 0, -1), Vector(1, 0, -1), Vector(1, 1, -2), Vector(-1, 1, -2)]
+        triangles = [Triangle(corners[:3]), Triangle([corners[0], corners[2], corners[3]])]
+        for x in np.linspace(-1.45, 1.45, 8):
+            for y in np.linspace(-0.45, 1.45, 8):
+                ray = Ray(origin=Vector(0, 0.5, 2), direction=Vector(x, y, -3.5) - Vector(0, 0.5, 0))
+                hit = rectangle.intersect(ray)
+                expected = [tri_hit for tri_hit in (tri.intersect(ray) for tri in triangles) if tri_hit is not None]
+                assert (hit is None) == (not expected)
+                if hit is not None:
+                    assert hit.position == expected[0].position
+                    assert hit.normal == expected[0].normal
+
+
+class TestBox:
+    def test_intersect(self):
+        box = Box(lower=Vector(-1, -1, -1), upper=Vector(1, 1, 1))
+        hit = box.intersect(Ray(origin=Vector(5, 0.5, 0), direction=Vector(-1, 0, 0)))
+        assert hit.position == Vector(1, 0.5, 0)
+        assert hit.normal == Vector(1, 0, 0)
+        assert np.allclose(hit.distance, 4)
+
+        assert box.intersect(Ray(origin=Vector(5, 1.5, 0), direction=Vector(-1, 0, 0))) is None
+        assert box.intersect(Ray(origin=Vector(5, 0, 0), direction=Vector(1, 0, 0))) is None
+
+    def test_inside(self):
+        box = Box(lower=Vector(-1, -1, -1), upper=Vector(1, 1, 1))
+        hit = box.intersect(Ray(origin=Vector(0, 0, 0), direction=Vector(0, 0, -1)))
+        assert hit.position == Vector(0, 0, -1)
+        assert hit.normal == Vector(0, 0, 1)
+        assert box.has_volume()
+        assert box.occludes(Ray(origin=Vector(0, 0, 0), direction=Vector(0, 1, 0)), 2)
@@ -17,12 +17,17 @@ def get_triangle_area(v1: Vector, v2: Vector, v3: Vector) -> float:
 @attr.s(slots=True, init=False)
 class Triangle(BaseObject):
     _vertices: tuple[Vector] = attr.ib(converter=tuple)
+    # per-vertex normals interpolated across the face for smooth shading
+    _normals: tuple[Vector] | None = attr.ib(default=None)
 
-    def __init__(self, vertices: Sequence[Vector], **kwargs: Any):
+    def __init__(self, vertices: Sequence[Vector], normals: Sequence[Vector] | None = None, **kwargs: Any):
         if len(vertices) != 3:
             raise RuntimeError('Triangle has exactly three vertices most of the time.')
+        if normals is not None and len(normals) != 3:
+            raise RuntimeError('Triangle needs one normal per vertex.')
         super().__init__(**kwargs)
         self._vertices = tuple(vertices)
+        self._normals = tuple(normals) if normals is not None else None
 
     @property
     def area(self) -> float:
@@ -31,6 +36,10 @@ class Triangle(BaseObject):
     def __getitem__(self, idx: int) -> Vector:
         return self._vertices[idx]
 
+    @property
+    def normals(self) -> tuple[Vector] | None:
+        return self._normals
+
     def moller_trumbore(self, ray: Ray) -> Intersection | None:
         origin = ray.origin
         direction = ray.direction
@@ -57,12 +66,17 @@ class Triangle(BaseObject):
         if dist < 0:
             return None
 
+        # the two ratios are already the barycentric weights of the second and third vertex
+        weights = Vector(1 - first_ratio - second_ratio, first_ratio, second_ratio)
         pos = origin + dist * direction
         norm = left_side.cross(right_side)
-        if direction.dot(norm) > 0:
+        facing = direction.dot(norm) > 0
+        if self._normals is not None:
+            norm = self.interpolate(self._normals, weights)
+        if facing:
             norm *= -1
         norm.normalize()
-        return Intersection(pos, norm, dist)
+        return Intersection(pos, norm, dist, barycentric=weights)
 
     def slae_intersect(self, ray: Ray) -> Intersection | None:
         ...
@@ -71,12 +85,29 @@ class Triangle(BaseObject):
         return self.moller_trumbore(ray)
 
     def get_barycentric_coords(self, point: Vector) -> Vector:
-        area = self.area
-        return Vector(
-            get_triangle_area(self._vertices[1], self._vertices[2], point) / area,
-            get_triangle_area(self._vertices[2], self._vertices[0], point) / area,
-            get_triangle_area(self._vertices[0], self._vertices[1], point) / area,
-        )
+        # intersections already carry their weights, this is for arbitrary points in the plane
+        left_side = self._vertices[1] - self._vertices[0]
+        right_side = self._vertices[2] - self._vertices[0]
+        offset = point - self._vertices[0]
+        d00, d01, d11 = left_side.dot(left_side), left_side.dot(right_side), right_side.dot(right_side)
+        d20, d21 = offset.dot(left_side), offset.dot(right_side)
+        denom = d00 * d11 - d01 * d01
+        second = (d11 * d20 - d01 * d21) / denom
+        third = (d00 * d21 - d01 * d20) / denom
+        return Vector(1 - second - third, second, third)
+
+    @staticmethod
+    def interpolate(values: Sequence[Vector], weights: Vector) -> Vector:
+        return weights.x * values[0] + weights.y * values[1] + weights.z * values[2]
 
     def has_volume(self) -> bool:
-        return False
\ No newline at end of file
+        return False
+
+    def translated(self, offset: Vector) -> "Triangle":
+        moved = Triangle([vertex + offset for vertex in self._vertices], self._normals, material=self.material)
+        moved.material_id = self.material_id
+        return moved
+
+    def bounds(self) -> tuple[Vector, Vector]:
+        coords = [vertex.to_tuple() for vertex in self._vertices]
+        return Vector(*map(min, *coords)), Vector(*map(max, *coords))
\ No newline at end of file
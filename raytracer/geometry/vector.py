@@ -1,5 +1,4 @@
 import math
-import numpy as np
 import operator
 from typing import Callable
 
@@ -105,7 +104,12 @@ class Vector:
         return (self.x, self.y, self.z)
 
     def to_array(self):
+        import numpy as np
         return np.array(self.to_tuple(), dtype=float)
 
     def __eq__(self, other: "Vector") -> bool:
-        return np.allclose(self.to_tuple(), other.to_tuple())
+        # same tolerances as np.allclose, without importing numpy for geometry-only users
+        return all(
+            lhs == rhs or abs(lhs - rhs) <= 1e-8 + 1e-5 * abs(rhs)
+            for lhs, rhs in zip(self.to_tuple(), other.to_tuple())
+        )
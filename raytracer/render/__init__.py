@@ -1,7 +1,57 @@
-from .scene import CameraOptions, PointLight, Scene
+import importlib
+
+from .animation import Animation, CameraKey, ObjectKey, render_animation
+from .cache import RenderCache
+from .context import TraceContext
+from .denoise import Denoiser
+from .gbuffer import GBuffer
+from .lights import LightGrid, PointLight
+from .scene import CameraOptions, Scene
+from .serialization import SceneData, SceneFormatError
+from .shadows import ShadowCache, ShadowMap
+from .stats import RenderStats
 
 __all__ = (
-    'CameraOptions',
+    'Animation',
+    'CameraKey',
+    'ObjectKey',
+    'render_animation',
+
+    'RenderCache',
+
+    'TraceContext',
+
+    'Denoiser',
+
+    'GBuffer',
+
+    'LightGrid',
     'PointLight',
+
+    'SamplingProfiler',
+
+    'CameraOptions',
     'Scene',
+
+    'SceneData',
+    'SceneFormatError',
+
+    'ShadowCache',
+    'ShadowMap',
+
+    'RenderStats',
 )
+
+_LAZY = {
+    'SamplingProfiler': '.profiling',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,135 @@
+import attr
+import bisect
+import time
+from pathlib import Path
+from typing import Iterator, Sequence, TypeVar
+
+from ..geometry import Vector
+from .scene import CameraOptions, Scene
+from .stats import RenderStats
+
+
+Key = TypeVar("Key")
+
+
+@attr.s(slots=True, kw_only=True)
+class CameraKey:
+    time: float = attr.ib(converter=float)
+    look_from: Vector = attr.ib()
+    look_to: Vector = attr.ib()
+    fov: float | None = attr.ib(default=None)
+
+
+@attr.s(slots=True, kw_only=True)
+class ObjectKey:
+    time: float = attr.ib(converter=float)
+    offset: Vector = attr.ib()
+
+
+def _by_time(keys: Sequence[Key]) -> list[Key]:
+    return sorted(keys, key=lambda key: key.time)
+
+
+def _segment(keys: Sequence[Key], time: float) -> tuple[Key, Key, float]:
+    idx = bisect.bisect_right([key.time for key in keys], time)
+    if idx == 0:
+        return keys[0], keys[0], 0.0
+    if idx == len(keys):
+        return keys[-1], keys[-1], 0.0
+    lhs, rhs = keys[idx - 1], keys[idx]
+    return lhs, rhs, (time - lhs.time) / (rhs.time - lhs.time)
+
+
+def _lerp(lhs, rhs, t: float):
+    return lhs + t * (rhs - lhs)
+
+
+@attr.s(slots=True, kw_only=True)
+class Animation:
+    camera: list[CameraKey] = attr.ib(factory=list, converter=_by_time)
+    objects: dict[int, list[ObjectKey]] = attr.ib(factory=dict)
+
+    def __attrs_post_init__(self):
+        self.objects = {idx: _by_time(keys) for idx, keys in self.objects.items() if keys}
+
+    @property
+    def duration(self) -> float:
+        times = [key.time for key in self.camera]
+        times += [key.time for keys in self.objects.values() for key in keys]
+        return max(times, default=0.0)
+
+    def frame_times(self, frame_count: int) -> list[float]:
+        if frame_count == 1:
+            return [0.0]
+        return [self.duration * idx / (frame_count - 1) for idx in range(frame_count)]
+
+    def camera_at(self, time: float, cam_options: CameraOptions) -> CameraOptions:
+        if not self.camera:
+            return cam_options
+        lhs, rhs, t = _segment(self.camera, time)
+        lhs_fov = cam_options.fov if lhs.fov is None else lhs.fov
+        rhs_fov = cam_options.fov if rhs.fov is None else rhs.fov
+        return attr.evolve(
+            cam_options,
+            look_from=_lerp(lhs.look_from, rhs.look_from, t),
+            look_to=_lerp(lhs.look_to, rhs.look_to, t),
+            fov=_lerp(lhs_fov, rhs_fov, t),
+        )
+
+    def offsets_at(self, time: float) -> dict[int, Vector]:
+        offsets = {}
+        for idx, keys in self.objects.items():
+            lhs, rhs, t = _segment(keys, time)
+            offsets[idx] = _lerp(lhs.offset, rhs.offset, t)
+        return offsets
+
+
+@attr.s(slots=True, kw_only=True)
+class Frame:
+    index: int = attr.ib()
+    time: float = attr.ib()
+    path: Path = attr.ib()
+    elapsed: float = attr.ib()
+    stats: RenderStats = attr.ib()
+
+
+def render_animation(scene: Scene,
+                     animation: Animation,
+                     cam_options: CameraOptions,
+                     output_pattern: str | Path,
+                     *,
+                     frame_count: int,
+                     num_workers: int = 1,
+                     verbose: bool = False,
+                     **render_options,
+                     ) -> Iterator[Frame]:
+    base_objects = list(scene.objects)
+    base_shadow_cache = scene.shadow_cache
+    pool = scene.open_pool(num_workers) if num_workers != 1 else None
+    try:
+        for index, frame_time in enumerate(animation.frame_times(frame_count)):
+            moved = {
+                idx: base_objects[idx].translated(offset)
+                for idx, offset in animation.offsets_at(frame_time).items()
+                if offset != Vector(0)
+            }
+            scene.objects[:] = base_objects
+            scene.replace_objects(moved)
+            if not moved:
+                # camera-only frames keep the static shadow cache
+                scene.shadow_cache = base_shadow_cache
+
+            start_ts = time.perf_counter()
+            camera = animation.camera_at(frame_time, cam_options)
+            img = scene.render(camera, pool=pool, verbose=verbose, **render_options)
+            elapsed = time.perf_counter() - start_ts
+
+            path = Path(str(output_pattern).format(index=index))
+            img.save(path)
+            yield Frame(index=index, time=frame_time, path=path, elapsed=elapsed, stats=scene.stats)
+    finally:
+        if pool is not None:
+            pool.close()
+        scene.objects[:] = base_objects
+        scene.replace_objects({})
+        scene.shadow_cache = base_shadow_cache
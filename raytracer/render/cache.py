@@ -0,0 +1,94 @@
+import attr
+import hashlib
+import os
+import tempfile
+import numpy as np
+from pathlib import Path
+
+
+# bump when a renderer change makes previously cached pixels stale
+CACHE_VERSION = 1
+
+
+def content_key(*parts: bytes | str) -> str:
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        # length prefixes keep ("ab", "c") and ("a", "bc") apart
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+@attr.s(slots=True, kw_only=True)
+class RenderCache:
+    root: Path = attr.ib(converter=Path)
+    max_bytes: int = attr.ib(default=256 * 2 ** 20)
+
+    hits: int = attr.ib(default=0, init=False)
+    misses: int = attr.ib(default=0, init=False)
+    _size: int | None = attr.ib(default=None, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def get(self, key: str) -> np.ndarray | None:
+        path = self._path(key)
+        try:
+            array = np.load(path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, EOFError):
+            self.misses += 1
+            return None
+        # the modification time doubles as the last access time for eviction
+        os.utime(path)
+        self.hits += 1
+        return array
+
+    def put(self, key: str, array: np.ndarray) -> None:
+        path = self._path(key)
+        # write next to the target and rename, so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.save(file, np.ascontiguousarray(array), allow_pickle=False)
+        replaced = path.exists()
+        os.replace(tmp, path)
+        if replaced:
+            self._size = None
+        elif self._size is not None:
+            self._size += path.stat().st_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self, max_bytes: int | None = None) -> None:
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        self.evict(0)
@@ -0,0 +1,18 @@
+import attr
+import numpy as np
+
+from ..geometry import BaseObject
+from .incremental import DependencyRecorder
+from .stats import RenderStats
+
+
+@attr.s(slots=True, kw_only=True)
+class TraceContext:
+    # everything a trace mutates, so tiles traced concurrently never share state through the scene
+    stats: RenderStats = attr.ib(factory=RenderStats)
+    rng: np.random.Generator = attr.ib(factory=np.random.default_rng)
+    recorder: DependencyRecorder | None = attr.ib(default=None)
+    last_occluder: BaseObject | None = attr.ib(default=None)
+
+    def reseed(self, seed) -> None:
+        self.rng = np.random.default_rng(seed)
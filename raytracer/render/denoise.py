@@ -0,0 +1,77 @@
+import attr
+import numpy as np
+
+from .gbuffer import NO_HIT, GBuffer
+
+
+# B3 spline taps of the a-trous wavelet, spread 2 ** level pixels apart at each level
+TAPS = np.array([1 / 16, 1 / 4, 3 / 8, 1 / 4, 1 / 16])
+
+
+@attr.s(slots=True, kw_only=True)
+class Denoiser:
+    levels: int = attr.ib(default=3)
+    # colour differences relative to the mean hit radiance, halved at every level
+    color_sigma: float = attr.ib(default=2.0)
+    normal_power: float = attr.ib(default=64.0)
+    # depth differences in pixel footprints per pixel of distance, loose enough for slanted surfaces
+    depth_sigma: float = attr.ib(default=4.0)
+
+    def apply(self, pixels: np.ndarray, buffer: GBuffer) -> np.ndarray:
+        # edge-avoiding a-trous filter over the hit pixels, background pixels are returned untouched
+        mask = buffer.hits
+        if not mask.any():
+            return pixels
+
+        settings = buffer.settings
+        depths = np.linalg.norm(buffer.positions - settings.origin.to_array(), axis=-1)
+        # world space size of a pixel at distance one
+        footprint = 2 * settings.scale / settings.height
+        scale = max(float(pixels[mask].mean()), 1e-12)
+
+        colors = np.where(mask[..., None], pixels, 0.0)
+        for level in range(self.levels):
+            step = 2 ** level
+            color_sigma = self.color_sigma * scale / step
+            colors = self._level(colors, buffer, depths, step, color_sigma, self.depth_sigma * footprint * step)
+
+        result = pixels.copy()
+        result[mask] = colors[mask]
+        return result
+
+    def _level(self,
+               colors: np.ndarray,
+               buffer: GBuffer,
+               depths: np.ndarray,
+               step: int,
+               color_sigma: float,
+               depth_sigma: float,
+               ) -> np.ndarray:
+        height, width = depths.shape
+        pad = 2 * step
+
+        def padded(array: np.ndarray, fill) -> np.ndarray:
+            widths = ((pad, pad), (pad, pad)) + ((0, 0),) * (array.ndim - 2)
+            return np.pad(array, widths, constant_values=fill)
+
+        # neighbours outside the frame count as background and get no weight
+        all_colors, all_normals = padded(colors, 0.0), padded(buffer.normals, 0.0)
+        all_depths, all_ids = padded(depths, 0.0), padded(buffer.object_ids, NO_HIT)
+
+        total = np.zeros_like(colors)
+        weights = np.zeros(depths.shape)
+        for dy, tap_y in enumerate(TAPS):
+            for dx, tap_x in enumerate(TAPS):
+                window = (slice(dy * step, dy * step + height), slice(dx * step, dx * step + width))
+                other = all_colors[window]
+                color_term = np.sum((other - colors) ** 2, axis=-1) / color_sigma ** 2
+                depth_term = np.abs(all_depths[window] - depths) / np.maximum(depth_sigma * depths, 1e-12)
+                cosine = np.clip(np.sum(all_normals[window] * buffer.normals, axis=-1), 0, 1)
+                weight = tap_y * tap_x * np.exp(-color_term - depth_term) * cosine ** self.normal_power
+                # object ids double as hard edges, so no colour bleeds across silhouettes
+                weight *= (all_ids[window] == buffer.object_ids) & (buffer.object_ids != NO_HIT)
+                total += weight[..., None] * other
+                weights += weight
+
+        # the centre tap always matches itself, only background pixels end up without weight
+        return np.where(weights[..., None] > 0, total / np.maximum(weights, 1e-300)[..., None], colors)
@@ -0,0 +1,91 @@
+import attr
+import copy
+import numpy as np
+from typing import TYPE_CHECKING, Sequence
+
+from ..geometry import BaseObject, Intersection, Ray, Vector
+from .lights import PointLight
+
+if TYPE_CHECKING:
+    from .scene import RenderSettings, Tile
+
+
+NO_HIT = -1
+
+
+@attr.s(slots=True, kw_only=True)
+class GBuffer:
+    positions: np.ndarray = attr.ib()
+    normals: np.ndarray = attr.ib()
+    view_dirs: np.ndarray = attr.ib()
+    object_ids: np.ndarray = attr.ib()
+    material_ids: np.ndarray = attr.ib()
+
+    settings: "RenderSettings | None" = attr.ib(default=None)
+    background_color: Vector | None = attr.ib(default=None)
+    lights: list[PointLight] = attr.ib(factory=list)
+
+    @classmethod
+    def empty(cls, width: int, height: int, **kwargs) -> "GBuffer":
+        return cls(
+            positions=np.zeros((height, width, 3)),
+            normals=np.zeros((height, width, 3)),
+            view_dirs=np.zeros((height, width, 3)),
+            object_ids=np.full((height, width), NO_HIT, dtype=np.int32),
+            material_ids=np.full((height, width), NO_HIT, dtype=np.int32),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_hits(cls,
+                  width: int,
+                  height: int,
+                  rows: Sequence[int],
+                  cols: Sequence[int],
+                  positions: np.ndarray,
+                  normals: np.ndarray,
+                  view_dirs: np.ndarray,
+                  object_ids: Sequence[int],
+                  material_ids: np.ndarray,
+                  ) -> "GBuffer":
+        buffer = cls.empty(width, height)
+        buffer.positions[rows, cols] = positions
+        buffer.normals[rows, cols] = normals
+        buffer.view_dirs[rows, cols] = view_dirs
+        buffer.object_ids[rows, cols] = object_ids
+        buffer.material_ids[rows, cols] = material_ids
+        return buffer
+
+    @property
+    def hits(self) -> np.ndarray:
+        return self.object_ids != NO_HIT
+
+    def paste(self, tile: "Tile", other: "GBuffer") -> None:
+        x0, y0, x1, y1 = tile
+        for field in ("positions", "normals", "view_dirs", "object_ids", "material_ids"):
+            getattr(self, field)[y0:y1, x0:x1] = getattr(other, field)
+
+    def snapshot_lights(self, lights: Sequence[PointLight]) -> None:
+        self.lights = copy.deepcopy(list(lights))
+
+    def primary_hits(self,
+                     objects: Sequence[BaseObject],
+                     indices: np.ndarray,
+                     ) -> list[tuple[Ray, Intersection, BaseObject]]:
+        origin = self.settings.origin
+        mask = self.hits
+        positions, normals = self.positions[mask][indices], self.normals[mask][indices]
+        directions = -self.view_dirs[mask][indices]
+        distances = np.linalg.norm(positions - origin.to_array(), axis=-1)
+        # per-hit materials, e.g. of sphere clouds, instead of falling back to the object's material
+        return [
+            (
+                Ray(origin=origin, direction=Vector(*direction)),
+                Intersection(Vector(*position), Vector(*normal), distance, material_id=material_id),
+                objects[object_id],
+            )
+            for position, normal, direction, distance, object_id, material_id in zip(
+                positions.tolist(), normals.tolist(), directions.tolist(), distances.tolist(),
+                self.object_ids[mask][indices].tolist(), self.material_ids[mask][indices].tolist(),
+            )
+        ]
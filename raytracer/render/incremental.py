@@ -0,0 +1,203 @@
+import attr
+import copy
+import math
+import numpy as np
+from typing import TYPE_CHECKING, Sequence
+
+from ..geometry import BaseObject, Intersection, Ray, Vector
+from .lights import PointLight
+
+if TYPE_CHECKING:
+    from .scene import RenderSettings, Scene
+
+
+def _pairs(values: list[tuple[int, int]]) -> np.ndarray:
+    return np.array(values, dtype=np.int64).reshape(-1, 2)
+
+
+@attr.s(slots=True, kw_only=True)
+class PixelDependencies:
+    hits: np.ndarray = attr.ib(factory=lambda: _pairs([]))
+    occluders: np.ndarray = attr.ib(factory=lambda: _pairs([]))
+    lights: np.ndarray = attr.ib(factory=lambda: _pairs([]))
+    point_pixels: np.ndarray = attr.ib(factory=lambda: np.zeros(0, dtype=np.int64))
+    points: np.ndarray = attr.ib(factory=lambda: np.zeros((0, 3)))
+    segment_pixels: np.ndarray = attr.ib(factory=lambda: np.zeros(0, dtype=np.int64))
+    segments: np.ndarray = attr.ib(factory=lambda: np.zeros((0, 7)))
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["PixelDependencies"]) -> "PixelDependencies":
+        if not parts:
+            return cls()
+        return cls(**{
+            field.name: np.concatenate([getattr(part, field.name) for part in parts])
+            for field in attr.fields(cls)
+        })
+
+    def without(self, pixels: np.ndarray) -> "PixelDependencies":
+        keep = {
+            "hits": ~np.isin(self.hits[:, 0], pixels),
+            "occluders": ~np.isin(self.occluders[:, 0], pixels),
+            "lights": ~np.isin(self.lights[:, 0], pixels),
+            "points": ~np.isin(self.point_pixels, pixels),
+            "segments": ~np.isin(self.segment_pixels, pixels),
+        }
+        return PixelDependencies(
+            hits=self.hits[keep["hits"]],
+            occluders=self.occluders[keep["occluders"]],
+            lights=self.lights[keep["lights"]],
+            point_pixels=self.point_pixels[keep["points"]],
+            points=self.points[keep["points"]],
+            segment_pixels=self.segment_pixels[keep["segments"]],
+            segments=self.segments[keep["segments"]],
+        )
+
+    def pixels_hitting(self, objects: Sequence[int]) -> np.ndarray:
+        return self.hits[np.isin(self.hits[:, 1], objects), 0]
+
+    def pixels_occluded_by(self, objects: Sequence[int]) -> np.ndarray:
+        return self.occluders[np.isin(self.occluders[:, 1], objects), 0]
+
+    def pixels_lit_by(self, lights: Sequence[int]) -> np.ndarray:
+        return self.lights[np.isin(self.lights[:, 1], lights), 0]
+
+    def pixels_near(self, origin: Vector, radius: float) -> np.ndarray:
+        if math.isinf(radius):
+            return self.point_pixels
+        offset = self.points - origin.to_array()
+        return self.point_pixels[(offset * offset).sum(axis=-1) < radius ** 2]
+
+    def pixels_crossing(self, lower: Vector, upper: Vector, pad: float = 1e-6) -> np.ndarray:
+        origins, directions, length = self.segments[:, 0:3], self.segments[:, 3:6], self.segments[:, 6]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1 / directions
+            near = (lower.to_array() - pad - origins) * inv
+            far = (upper.to_array() + pad - origins) * inv
+        # nan comes from a zero direction on the slab boundary, which counts as inside
+        enter = np.where(np.isnan(near), -np.inf, np.minimum(near, far)).max(axis=-1)
+        leave = np.where(np.isnan(far), np.inf, np.maximum(near, far)).min(axis=-1)
+        return self.segment_pixels[(enter <= leave) & (leave >= 0) & (enter <= length)]
+
+
+@attr.s(slots=True)
+class DependencyRecorder:
+    index_of: dict[int, int] = attr.ib()
+    pixel: int = attr.ib(default=-1)
+
+    _hits: list[tuple[int, int]] = attr.ib(factory=list, init=False)
+    _occluders: list[tuple[int, int]] = attr.ib(factory=list, init=False)
+    _lights: list[tuple[int, int]] = attr.ib(factory=list, init=False)
+    _point_pixels: list[int] = attr.ib(factory=list, init=False)
+    _points: list[tuple[float, float, float]] = attr.ib(factory=list, init=False)
+    _segment_pixels: list[int] = attr.ib(factory=list, init=False)
+    _segments: list[tuple[float, ...]] = attr.ib(factory=list, init=False)
+
+    @classmethod
+    def for_objects(cls, objects: Sequence[BaseObject]) -> "DependencyRecorder":
+        return cls({id(obj): idx for idx, obj in enumerate(objects)})
+
+    def segment(self, ray: Ray, length: float) -> None:
+        self._segment_pixels.append(self.pixel)
+        self._segments.append((*ray.origin.to_tuple(), *ray.direction.to_tuple(), length))
+
+    def trace(self, ray: Ray, intersection: Intersection | None, obj: BaseObject | None) -> None:
+        self.segment(ray, math.inf if intersection is None else intersection.distance)
+        if obj is not None:
+            self._hits.append((self.pixel, self.index_of[id(obj)]))
+
+    def occluder(self, obj: BaseObject) -> None:
+        self._occluders.append((self.pixel, self.index_of[id(obj)]))
+
+    def shading(self, point: Vector, lights: Sequence[int]) -> None:
+        self._point_pixels.append(self.pixel)
+        self._points.append(point.to_tuple())
+        self._lights.extend((self.pixel, idx) for idx in lights)
+
+    def finish(self) -> PixelDependencies:
+        return PixelDependencies(
+            hits=_pairs(self._hits),
+            occluders=_pairs(self._occluders),
+            lights=_pairs(self._lights),
+            point_pixels=np.array(self._point_pixels, dtype=np.int64),
+            points=np.array(self._points, dtype=float).reshape(-1, 3),
+            segment_pixels=np.array(self._segment_pixels, dtype=np.int64),
+            segments=np.array(self._segments, dtype=float).reshape(-1, 7),
+        )
+
+
+def _same_value(old, new) -> bool:
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        return isinstance(old, np.ndarray) and isinstance(new, np.ndarray) and np.array_equal(old, new)
+    return old == new
+
+
+def _same_geometry(old: BaseObject, new: BaseObject) -> bool:
+    if type(old) is not type(new):
+        return False
+    return all(
+        _same_value(getattr(old, field.name), getattr(new, field.name))
+        for field in attr.fields(type(old))
+        if field.name not in ("material", "material_id")
+    )
+
+
+@attr.s(slots=True, kw_only=True)
+class RenderRecord:
+    settings: "RenderSettings" = attr.ib()
+    background_color: Vector = attr.ib()
+    pixels: np.ndarray = attr.ib()
+    dependencies: PixelDependencies = attr.ib()
+
+    objects: list[BaseObject] = attr.ib(factory=list)
+    lights: list[PointLight] = attr.ib(factory=list)
+    light_options: tuple[float, int | None] = attr.ib(default=(0, None))
+
+    def snapshot(self, scene: "Scene") -> None:
+        self.objects, self.lights = copy.deepcopy((scene.objects, scene.lights))
+        self.light_options = (scene.light_threshold, scene.light_samples)
+
+    def changes(self, scene: "Scene") -> tuple[list[int], list[int], list[int]] | None:
+        if (scene.light_threshold, scene.light_samples) != self.light_options:
+            return None
+        if len(scene.objects) < len(self.objects) or len(scene.lights) < len(self.lights):
+            return None
+
+        moved, repainted, lights = [], [], []
+        for idx, obj in enumerate(scene.objects):
+            if idx >= len(self.objects) or not _same_geometry(self.objects[idx], obj):
+                moved.append(idx)
+            elif self.objects[idx].material != obj.material:
+                repainted.append(idx)
+        for idx, light in enumerate(scene.lights):
+            if idx >= len(self.lights) or self.lights[idx] != light:
+                lights.append(idx)
+        return moved, repainted, lights
+
+    def affected_pixels(self, scene: "Scene") -> np.ndarray | None:
+        changes = self.changes(scene)
+        if changes is None:
+            return None
+
+        moved, repainted, lights = changes
+        deps = self.dependencies
+        affected = [
+            deps.pixels_hitting(moved + repainted),
+            deps.pixels_occluded_by(moved),
+            deps.pixels_lit_by(lights),
+        ]
+        for idx in moved:
+            affected.append(deps.pixels_crossing(*scene.objects[idx].bounds()))
+        for idx in lights:
+            light = scene.lights[idx]
+            affected.append(deps.pixels_near(light.origin, light.influence_radius(scene.light_threshold)))
+        return np.unique(np.concatenate(affected))
+
+    def update(self,
+               scene: "Scene",
+               pixels: np.ndarray,
+               colors: np.ndarray,
+               dependencies: PixelDependencies,
+               ) -> None:
+        self.pixels.reshape(-1, 3)[pixels] = colors
+        self.dependencies = PixelDependencies.concatenate([self.dependencies.without(pixels), dependencies])
+        self.snapshot(scene)
@@ -0,0 +1,483 @@
+import attr
+import math
+import numpy as np
+from typing import TYPE_CHECKING
+
+from ..geometry import Mesh, Plane, Sphere, Triangle
+from .stats import RenderStats
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if TYPE_CHECKING:
+    from .scene import RenderSettings, Scene, TileResult
+
+
+PRIM_SPHERE = 0
+PRIM_TRIANGLE = 1
+PRIM_PLANE = 2
+
+# geometry row of a primitive: sphere center and radius, triangle vertices and vertex normals,
+# plane point and normal
+GEOMETRY_FIELDS = 18
+LEAF_SIZE = 4
+NODE_STACK = 64
+
+# the same thresholds as the scalar geometry
+EPS = 1e-8
+NONE_VALUE = -3.14
+
+
+def available() -> bool:
+    return numba is not None
+
+
+def _jit(parallel: bool = False):
+    # compiled code is cached next to the module so pool workers load it instead of compiling again
+    def wrap(func):
+        if numba is None:
+            return func
+        return numba.njit(cache=True, nogil=True, parallel=parallel, error_model="numpy")(func)
+    return wrap
+
+
+prange = numba.prange if numba is not None else range
+
+
+@attr.s(slots=True, kw_only=True)
+class FlatScene:
+    geometry: np.ndarray = attr.ib()
+    # kind, material id, has volume, smooth normals
+    prims: np.ndarray = attr.ib()
+    order: np.ndarray = attr.ib()
+    nodes: np.ndarray = attr.ib()
+    # first primitive, primitive count and right child of every node, the left child follows its parent
+    links: np.ndarray = attr.ib()
+    unbounded: np.ndarray = attr.ib()
+    materials: np.ndarray = attr.ib()
+    lights: np.ndarray = attr.ib()
+
+    @staticmethod
+    def key(scene: "Scene") -> tuple:
+        origins, intensities, attenuation = scene.light_arrays()
+        return (
+            tuple(map(id, scene.objects)),
+            tuple(obj.material_id for obj in scene.objects),
+            scene.materials.data.tobytes(),
+            origins.tobytes() + intensities.tobytes() + attenuation.tobytes(),
+        )
+
+    @classmethod
+    def build(cls, scene: "Scene") -> "FlatScene | None":
+        # the kernels only know spheres, triangles and planes, anything else stays on the scalar path
+        rows, prims = [], []
+        for obj in scene.objects:
+            if type(obj) is Sphere:
+                rows.append((*obj.center.to_tuple(), obj.radius))
+                prims.append((PRIM_SPHERE, obj.material_id, 1, 0))
+            elif type(obj) is Triangle:
+                rows.append(_triangle_row(obj))
+                prims.append((PRIM_TRIANGLE, obj.material_id, 0, obj.normals is not None))
+            elif type(obj) is Mesh:
+                for triangle in obj.triangles:
+                    rows.append(_triangle_row(triangle))
+                    prims.append((PRIM_TRIANGLE, obj.material_id, obj.closed, triangle.normals is not None))
+            elif type(obj) is Plane:
+                rows.append((*obj.point.to_tuple(), *obj.normal.to_tuple()))
+                prims.append((PRIM_PLANE, obj.material_id, 0, 0))
+            else:
+                return None
+
+        geometry = np.zeros((len(rows), GEOMETRY_FIELDS), dtype=float)
+        for idx, row in enumerate(rows):
+            geometry[idx, :len(row)] = row
+        prims = np.array(prims, dtype=np.int64).reshape(-1, 4)
+        origins, intensities, attenuation = scene.light_arrays()
+
+        bounded = prims[:, 0] != PRIM_PLANE
+        order, nodes, links = _build_bvh(geometry, prims, np.flatnonzero(bounded))
+        return cls(
+            geometry=geometry,
+            prims=prims,
+            order=order,
+            nodes=nodes,
+            links=links,
+            unbounded=np.flatnonzero(~bounded).astype(np.int64),
+            materials=scene.materials.data,
+            lights=np.column_stack([origins, intensities, attenuation]),
+        )
+
+
+def _triangle_row(triangle: Triangle) -> tuple[float, ...]:
+    vertices = tuple(coord for idx in range(3) for coord in triangle[idx].to_tuple())
+    normals = triangle.normals or ()
+    return vertices + tuple(coord for normal in normals for coord in normal.to_tuple())
+
+
+def _prim_bounds(geometry: np.ndarray, prims: np.ndarray, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    rows = geometry[ids]
+    spheres = prims[ids, 0] == PRIM_SPHERE
+    vertices = rows[:, :9].reshape(-1, 3, 3)
+    lower, upper = vertices.min(axis=1), vertices.max(axis=1)
+    radii = rows[spheres, 3:4]
+    lower[spheres] = rows[spheres, :3] - radii
+    upper[spheres] = rows[spheres, :3] + radii
+    return lower, upper
+
+
+def _build_bvh(geometry: np.ndarray,
+               prims: np.ndarray,
+               ids: np.ndarray,
+               ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lower, upper = _prim_bounds(geometry, prims, ids)
+    centers = (lower + upper) / 2
+    order, nodes, links = [], [], []
+
+    def build(items: np.ndarray) -> int:
+        node = len(nodes)
+        nodes.append((*lower[items].min(axis=0), *upper[items].max(axis=0)))
+        links.append([len(order), 0, -1])
+        if len(items) <= LEAF_SIZE:
+            order.extend(ids[items].tolist())
+            links[node][1] = len(items)
+            return node
+
+        extent = centers[items].max(axis=0) - centers[items].min(axis=0)
+        axis = int(np.argmax(extent))
+        items = items[np.argsort(centers[items, axis], kind="stable")]
+        half = len(items) // 2
+        build(items[:half])
+        links[node][2] = build(items[half:])
+        return node
+
+    if len(ids):
+        build(np.arange(len(ids)))
+    return (
+        np.array(order, dtype=np.int64),
+        np.array(nodes, dtype=float).reshape(-1, 6),
+        np.array(links, dtype=np.int64).reshape(-1, 3),
+    )
+
+
+@_jit()
+def _normalized(x: float, y: float, z: float) -> tuple[float, float, float]:
+    length = math.sqrt(x * x + y * y + z * z)
+    return x / length, y / length, z / length
+
+
+@_jit()
+def _intersect(geometry, prims, prim, ox, oy, oz, dx, dy, dz):
+    # the same arithmetic as Sphere.intersect, Triangle.moller_trumbore and Plane.intersect, -1 is a miss
+    row = geometry[prim]
+    kind = prims[prim, 0]
+    if kind == PRIM_SPHERE:
+        px, py, pz = ox - row[0], oy - row[1], oz - row[2]
+        a = dx * dx + dy * dy + dz * dz
+        b = 2 * (px * dx + py * dy + pz * dz)
+        c = px * px + py * py + pz * pz - row[3] ** 2
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            return -1.0, 0.0, 0.0, 0.0
+        root = math.sqrt(disc)
+        dist = (-b - root) / (2.0 * a)
+        if not dist > 0:
+            dist = (-b + root) / (2.0 * a)
+        if dist < 0:
+            return -1.0, 0.0, 0.0, 0.0
+        nx = (ox + dist * dx - row[0]) / row[3]
+        ny = (oy + dist * dy - row[1]) / row[3]
+        nz = (oz + dist * dz - row[2]) / row[3]
+        if c < 0:
+            nx, ny, nz = -nx, -ny, -nz
+        return dist, nx, ny, nz
+
+    if kind == PRIM_PLANE:
+        denom = row[3] * dx + row[4] * dy + row[5] * dz
+        if abs(denom) < EPS:
+            return -1.0, 0.0, 0.0, 0.0
+        dist = (row[3] * (row[0] - ox) + row[4] * (row[1] - oy) + row[5] * (row[2] - oz)) / denom
+        if dist < 0:
+            return -1.0, 0.0, 0.0, 0.0
+        if denom > 0:
+            return dist, -row[3], -row[4], -row[5]
+        return dist, row[3], row[4], row[5]
+
+    e1x, e1y, e1z = row[3] - row[0], row[4] - row[1], row[5] - row[2]
+    e2x, e2y, e2z = row[6] - row[0], row[7] - row[1], row[8] - row[2]
+    hx, hy, hz = dy * e2z - dz * e2y, dz * e2x - dx * e2z, dx * e2y - dy * e2x
+    det = e1x * hx + e1y * hy + e1z * hz
+    if abs(det) < EPS:
+        return -1.0, 0.0, 0.0, 0.0
+    inv_det = 1 / det
+    sx, sy, sz = ox - row[0], oy - row[1], oz - row[2]
+    first = inv_det * (sx * hx + sy * hy + sz * hz)
+    if not 0 <= first <= 1:
+        return -1.0, 0.0, 0.0, 0.0
+    qx, qy, qz = sy * e1z - sz * e1y, sz * e1x - sx * e1z, sx * e1y - sy * e1x
+    second = inv_det * (dx * qx + dy * qy + dz * qz)
+    if not 0 <= second <= 1 - first:
+        return -1.0, 0.0, 0.0, 0.0
+    dist = inv_det * (e2x * qx + e2y * qy + e2z * qz)
+    if dist < 0:
+        return -1.0, 0.0, 0.0, 0.0
+
+    nx, ny, nz = e1y * e2z - e1z * e2y, e1z * e2x - e1x * e2z, e1x * e2y - e1y * e2x
+    facing = dx * nx + dy * ny + dz * nz > 0
+    if prims[prim, 3]:
+        zero = 1 - first - second
+        nx = zero * row[9] + first * row[12] + second * row[15]
+        ny = zero * row[10] + first * row[13] + second * row[16]
+        nz = zero * row[11] + first * row[14] + second * row[17]
+    if facing:
+        nx, ny, nz = -nx, -ny, -nz
+    nx, ny, nz = _normalized(nx, ny, nz)
+    return dist, nx, ny, nz
+
+
+@_jit()
+def _box_entry(nodes, node, ox, oy, oz, dx, dy, dz, limit):
+    near, far = 0.0, limit
+    for axis in range(3):
+        origin = (ox, oy, oz)[axis]
+        direction = (dx, dy, dz)[axis]
+        lower, upper = nodes[node, axis], nodes[node, axis + 3]
+        if direction == 0:
+            if origin < lower or origin > upper:
+                return False
+            continue
+        t0, t1 = (lower - origin) / direction, (upper - origin) / direction
+        if t0 > t1:
+            t0, t1 = t1, t0
+        near, far = max(near, t0), min(far, t1)
+        if near > far:
+            return False
+    return True
+
+
+@_jit()
+def _closest(scene_arrays, ox, oy, oz, dx, dy, dz, stack):
+    geometry, prims, order, nodes, links, unbounded = scene_arrays
+    best, best_dist = -1, math.inf
+    bx, by, bz = 0.0, 0.0, 0.0
+    for prim in unbounded:
+        dist, nx, ny, nz = _intersect(geometry, prims, prim, ox, oy, oz, dx, dy, dz)
+        if dist >= 0 and (dist < best_dist or (dist == best_dist and prim < best)):
+            best, best_dist, bx, by, bz = prim, dist, nx, ny, nz
+
+    size = 0
+    if len(nodes):
+        stack[0] = 0
+        size = 1
+    while size:
+        size -= 1
+        node = stack[size]
+        if not _box_entry(nodes, node, ox, oy, oz, dx, dy, dz, best_dist):
+            continue
+        first, count, right = links[node, 0], links[node, 1], links[node, 2]
+        if count:
+            for idx in range(first, first + count):
+                prim = order[idx]
+                dist, nx, ny, nz = _intersect(geometry, prims, prim, ox, oy, oz, dx, dy, dz)
+                # ties go to the earlier object, like the linear scan
+                if dist >= 0 and (dist < best_dist or (dist == best_dist and prim < best)):
+                    best, best_dist, bx, by, bz = prim, dist, nx, ny, nz
+        else:
+            stack[size] = right
+            stack[size + 1] = node + 1
+            size += 2
+    return best, best_dist, bx, by, bz
+
+
+@_jit()
+def _occluded(scene_arrays, ox, oy, oz, dx, dy, dz, limit, stack):
+    geometry, prims, order, nodes, links, unbounded = scene_arrays
+    for prim in unbounded:
+        dist = _intersect(geometry, prims, prim, ox, oy, oz, dx, dy, dz)[0]
+        if 0 <= dist < limit:
+            return True
+
+    size = 0
+    if len(nodes):
+        stack[0] = 0
+        size = 1
+    while size:
+        size -= 1
+        node = stack[size]
+        if not _box_entry(nodes, node, ox, oy, oz, dx, dy, dz, limit):
+            continue
+        first, count, right = links[node, 0], links[node, 1], links[node, 2]
+        if count:
+            for idx in range(first, first + count):
+                dist = _intersect(geometry, prims, order[idx], ox, oy, oz, dx, dy, dz)[0]
+                if 0 <= dist < limit:
+                    return True
+        else:
+            stack[size] = right
+            stack[size + 1] = node + 1
+            size += 2
+    return False
+
+
+@_jit()
+def _shade(scene_arrays, materials, lights, mtl, inside, px, py, pz, nx, ny, nz, vx, vy, vz, eps, stack):
+    # Scene.get_intensity with every light a candidate
+    r, g, b = materials[mtl, 0], materials[mtl, 1], materials[mtl, 2]
+    albedo = materials[mtl, 11]
+    shadow_rays = 0
+    if inside or not albedo > eps:
+        return r, g, b, shadow_rays
+
+    sx, sy, sz = px + eps * nx, py + eps * ny, pz + eps * nz
+    # scalar accumulators, an array per hit would be allocated on the heap
+    dr, dg, db = 0.0, 0.0, 0.0
+    sr, sg, sb = 0.0, 0.0, 0.0
+    for light in range(len(lights)):
+        lx, ly, lz = lights[light, 0] - sx, lights[light, 1] - sy, lights[light, 2] - sz
+        squared = lx * lx + ly * ly + lz * lz
+        distance = math.sqrt(squared)
+        lx, ly, lz = lx / distance, ly / distance, lz / distance
+        shadow_rays += 1
+        if _occluded(scene_arrays, sx, sy, sz, lx, ly, lz, distance, stack):
+            continue
+
+        scale = 1.0
+        if lights[light, 6] != 0:
+            scale = 1 / (1 + lights[light, 6] * squared)
+        cos_light = nx * lx + ny * ly + nz * lz
+        # reflect(-light_dir, normal)
+        rx, ry, rz = -lx + 2 * cos_light * nx, -ly + 2 * cos_light * ny, -lz + 2 * cos_light * nz
+        highlight = max(0.0, vx * rx + vy * ry + vz * rz) ** materials[mtl, 9]
+        lit = max(0.0, cos_light)
+        ir, ig, ib = lights[light, 3] * scale, lights[light, 4] * scale, lights[light, 5] * scale
+        dr, dg, db = dr + lit * ir, dg + lit * ig, db + lit * ib
+        sr, sg, sb = sr + highlight * ir, sg + highlight * ig, sb + highlight * ib
+
+    r += albedo * materials[mtl, 3] * dr + albedo * materials[mtl, 6] * sr
+    g += albedo * materials[mtl, 4] * dg + albedo * materials[mtl, 7] * sg
+    b += albedo * materials[mtl, 5] * db + albedo * materials[mtl, 8] * sb
+    return r, g, b, shadow_rays
+
+
+@_jit()
+def _push(rays, inside, size, ox, oy, oz, dx, dy, dz, weight, remaining, is_inside):
+    rays[size, 0], rays[size, 1], rays[size, 2] = ox, oy, oz
+    rays[size, 3], rays[size, 4], rays[size, 5] = dx, dy, dz
+    rays[size, 6], rays[size, 7] = weight, remaining
+    inside[size] = is_inside
+    return size + 1
+
+
+@_jit(parallel=True)
+def trace_rays(geometry, prims, order, nodes, links, unbounded, materials, lights, origins, directions, depth, eps):
+    # the recursion of Scene.trace_secondary unrolled into a stack of weighted rays per pixel
+    scene_arrays = (geometry, prims, order, nodes, links, unbounded)
+    count = len(directions)
+    colors = np.empty((count, 3))
+    secondary = np.zeros(count, dtype=np.int64)
+    shadows = np.zeros(count, dtype=np.int64)
+    pending = 2 * int(depth) + 2
+    for ray in prange(count):
+        stack = np.empty(NODE_STACK, dtype=np.int64)
+        rays = np.empty((pending, 8))
+        inside = np.zeros(pending, dtype=np.bool_)
+        size = _push(
+            rays, inside, 0, origins[ray, 0], origins[ray, 1], origins[ray, 2],
+            directions[ray, 0], directions[ray, 1], directions[ray, 2], 1.0, depth, False,
+        )
+        r, g, b = 0.0, 0.0, 0.0
+        traced = 0
+        hit_any = False
+        while size:
+            size -= 1
+            ox, oy, oz = rays[size, 0], rays[size, 1], rays[size, 2]
+            dx, dy, dz = rays[size, 3], rays[size, 4], rays[size, 5]
+            weight, remaining, is_inside = rays[size, 6], rays[size, 7], inside[size]
+            prim, dist, nx, ny, nz = _closest(scene_arrays, ox, oy, oz, dx, dy, dz, stack)
+            traced += 1
+            if prim < 0:
+                continue
+            hit_any = True
+
+            mtl = prims[prim, 1]
+            px, py, pz = ox + dist * dx, oy + dist * dy, oz + dist * dz
+            lr, lg, lb, shadow_rays = _shade(
+                scene_arrays, materials, lights, mtl, is_inside, px, py, pz, nx, ny, nz, -dx, -dy, -dz, eps, stack,
+            )
+            shadows[ray] += shadow_rays
+            r, g, b = r + weight * lr, g + weight * lg, b + weight * lb
+            if remaining <= 1:
+                continue
+
+            cos_incidence = -(nx * dx + ny * dy + nz * dz)
+            refraction_weight = 1.0 if is_inside else materials[mtl, 13]
+            if is_inside or materials[mtl, 13] > eps:
+                eta = materials[mtl, 10]
+                if not is_inside:
+                    eta = 1 / eta
+                beta = 1 - eta ** 2 * (1 - cos_incidence ** 2)
+                if beta >= 0:
+                    factor = eta * cos_incidence - math.sqrt(beta)
+                    rx, ry, rz = _normalized(eta * dx + factor * nx, eta * dy + factor * ny, eta * dz + factor * nz)
+                    size = _push(
+                        rays, inside, size, px - eps * nx, py - eps * ny, pz - eps * nz, rx, ry, rz,
+                        weight * refraction_weight, remaining - 1, is_inside ^ (prims[prim, 2] != 0),
+                    )
+            if not is_inside and materials[mtl, 12] > eps:
+                twice = 2 * cos_incidence
+                rx, ry, rz = _normalized(dx + twice * nx, dy + twice * ny, dz + twice * nz)
+                size = _push(
+                    rays, inside, size, px + eps * nx, py + eps * ny, pz + eps * nz, rx, ry, rz,
+                    weight * materials[mtl, 12], remaining - 1, False,
+                )
+
+        secondary[ray] = traced - 1
+        if hit_any:
+            colors[ray, 0], colors[ray, 1], colors[ray, 2] = r, g, b
+        else:
+            colors[ray, :] = NONE_VALUE
+    return colors, secondary, shadows
+
+
+def primary_rays(settings: "RenderSettings", tile: tuple[int, int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+    # _primary_ray for a whole tile at once
+    x0, y0, x1, y1 = tile
+    cols, rows = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1))
+    x = (2 * (cols + 0.5) / settings.width - 1) * settings.aspect_ratio * settings.scale
+    y = (1 - 2 * (rows + 0.5) / settings.height) * settings.scale
+    camera = np.stack([x, y, -np.ones_like(x)], axis=-1).reshape(-1, 3)
+    directions = camera @ np.asarray(settings.cam_to_world[:3, :3])
+    directions /= np.sqrt((directions ** 2).sum(axis=1))[:, None]
+    origins = np.broadcast_to(np.array(settings.origin.to_tuple()), directions.shape)
+    return np.ascontiguousarray(origins), directions
+
+
+def supports(scene: "Scene", settings: "RenderSettings") -> bool:
+    return (
+        not settings.gbuffer
+        and math.isfinite(settings.depth)
+        and not scene.light_threshold
+        and not scene.light_samples
+        and scene.shadow_cache is None
+        and scene.kernel_scene is not None
+    )
+
+
+def trace_tile(scene: "Scene", settings: "RenderSettings", tile: tuple[int, int, int, int]) -> "TileResult":
+    from .scene import TileResult
+
+    x0, y0, x1, y1 = tile
+    flat = scene.kernel_scene
+    origins, directions = primary_rays(settings, tile)
+    colors, secondary, shadows = trace_rays(
+        flat.geometry, flat.prims, flat.order, flat.nodes, flat.links, flat.unbounded, flat.materials, flat.lights,
+        origins, directions, float(settings.depth), settings.eps,
+    )
+    stats = RenderStats(
+        primary_rays=len(directions),
+        secondary_rays=int(secondary.sum()),
+        shadow_rays=int(shadows.sum()),
+        tiles=1,
+    )
+    return TileResult(tile=tile, pixels=colors.reshape(y1 - y0, x1 - x0, 3), stats=stats)
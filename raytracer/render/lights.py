@@ -0,0 +1,99 @@
+import attr
+import math
+import numpy as np
+from typing import Sequence
+
+from ..geometry import Vector
+
+
+@attr.s(slots=True, kw_only=True)
+class PointLight:
+    origin: Vector = attr.ib()
+    intensity: Vector = attr.ib()
+    attenuation: float = attr.ib(default=0, converter=float)
+
+    def intensity_at(self, squared_distance: float) -> Vector:
+        if self.attenuation == 0:
+            return self.intensity
+        return self.intensity / (1 + self.attenuation * squared_distance)
+
+    def influence_radius(self, threshold: float) -> float:
+        peak = max(self.intensity.to_tuple())
+        if peak <= threshold:
+            return 0.0
+        if threshold <= 0 or self.attenuation == 0:
+            return math.inf
+        return math.sqrt((peak / threshold - 1) / self.attenuation)
+
+
+@attr.s(slots=True)
+class LightGrid:
+    origins: np.ndarray = attr.ib()
+    peaks: np.ndarray = attr.ib()
+    attenuation: np.ndarray = attr.ib()
+    radii: np.ndarray = attr.ib()
+    cell_size: float = attr.ib()
+
+    _unbounded: np.ndarray = attr.ib(init=False)
+    _cells: dict[tuple[int, int, int], np.ndarray] = attr.ib(factory=dict, init=False)
+
+    def __attrs_post_init__(self):
+        bounded = np.isfinite(self.radii) & (self.radii > 0)
+        self._unbounded = np.flatnonzero(np.isinf(self.radii))
+
+        cells: dict[tuple[int, int, int], list[int]] = {}
+        for idx in np.flatnonzero(bounded).tolist():
+            lower = np.floor((self.origins[idx] - self.radii[idx]) / self.cell_size).astype(int)
+            upper = np.floor((self.origins[idx] + self.radii[idx]) / self.cell_size).astype(int)
+            for x in range(lower[0], upper[0] + 1):
+                for y in range(lower[1], upper[1] + 1):
+                    for z in range(lower[2], upper[2] + 1):
+                        cells.setdefault((x, y, z), []).append(idx)
+        self._cells = {key: np.array(value, dtype=np.intp) for key, value in cells.items()}
+
+    @classmethod
+    def build(cls, lights: Sequence[PointLight], threshold: float, cell_size: float | None = None) -> "LightGrid":
+        radii = np.array([light.influence_radius(threshold) for light in lights], dtype=float)
+        if cell_size is None:
+            finite = radii[np.isfinite(radii) & (radii > 0)]
+            cell_size = float(np.median(finite)) if len(finite) else 1.0
+        return cls(
+            origins=np.array([light.origin.to_tuple() for light in lights], dtype=float).reshape(-1, 3),
+            peaks=np.array([max(light.intensity.to_tuple()) for light in lights], dtype=float),
+            attenuation=np.array([light.attenuation for light in lights], dtype=float),
+            radii=radii,
+            cell_size=cell_size,
+        )
+
+    def query(self, point: tuple[float, float, float]) -> np.ndarray:
+        key = tuple(math.floor(coord / self.cell_size) for coord in point)
+        candidates = self._cells.get(key)
+        if candidates is None:
+            return self._unbounded
+
+        offset = self.origins[candidates] - point
+        inside = (offset * offset).sum(axis=-1) < self.radii[candidates] ** 2
+        return np.union1d(self._unbounded, candidates[inside])
+
+    def estimate(self, point: tuple[float, float, float], indices: np.ndarray) -> np.ndarray:
+        offset = self.origins[indices] - point
+        squared_distance = (offset * offset).sum(axis=-1)
+        return self.peaks[indices] / (1 + self.attenuation[indices] * squared_distance)
+
+    def sample(self,
+               point: tuple[float, float, float],
+               count: int,
+               rng: np.random.Generator,
+               ) -> tuple[np.ndarray, np.ndarray]:
+        indices = self.query(point)
+        if len(indices) <= count:
+            return indices, np.ones(len(indices))
+
+        estimate = self.estimate(point, indices)
+        total = estimate.sum()
+        if total <= 0:
+            return indices[:0], np.ones(0)
+
+        probability = estimate / total
+        picks, hits = np.unique(rng.choice(len(indices), size=count, p=probability), return_counts=True)
+        return indices[picks], hits / (count * probability[picks])
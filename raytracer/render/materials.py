@@ -0,0 +1,100 @@
+import attr
+import numpy as np
+
+from ..geometry import Material, Vector
+
+
+MATERIAL_FIELDS = 14
+
+
+def pack_material(material: Material) -> tuple[float, ...]:
+    return (
+        *material.ambient_color.to_tuple(),
+        *material.diffuse_color.to_tuple(),
+        *material.specular_color.to_tuple(),
+        float(material.specular_exponent),
+        float(material.refraction_index),
+        *material.albedo.to_tuple(),
+    )
+
+
+def unpack_material(row) -> Material:
+    return Material(
+        ambient_color=Vector(*row[0:3]),
+        diffuse_color=Vector(*row[3:6]),
+        specular_color=Vector(*row[6:9]),
+        specular_exponent=row[9],
+        refraction_index=row[10],
+        albedo=Vector(*row[11:14]),
+    )
+
+
+@attr.s(slots=True)
+class MaterialTable:
+    materials: list[Material] = attr.ib(factory=list, init=False)
+
+    _ids: dict[tuple[float, ...], int] = attr.ib(factory=dict, init=False)
+    _data: np.ndarray | None = attr.ib(default=None, init=False)
+
+    def __len__(self) -> int:
+        return len(self.materials)
+
+    def __getitem__(self, material_id: int) -> Material:
+        return self.materials[material_id]
+
+    def add(self, material: Material) -> int:
+        key = pack_material(material)
+        material_id = self._ids.get(key)
+        if material_id is None:
+            material_id = self._ids[key] = len(self.materials)
+            # a copy, so that later edits of the caller's material never reach the packed rows
+            self.materials.append(unpack_material(key))
+            self._data = None
+        return material_id
+
+    def compact(self, used: set[int]) -> np.ndarray | None:
+        # drops the rows no id in used points to, returns the new id of every old one, -1 if it was dropped
+        if len(used) == len(self.materials):
+            return None
+        keep = sorted(used)
+        remap = np.full(len(self.materials), -1, dtype=np.int32)
+        remap[keep] = np.arange(len(keep))
+        self.materials = [self.materials[material_id] for material_id in keep]
+        self._ids = {
+            key: int(remap[material_id]) for key, material_id in self._ids.items() if remap[material_id] >= 0
+        }
+        self._data = None
+        return remap
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = np.array(
+                [pack_material(material) for material in self.materials],
+                dtype=float,
+            ).reshape(-1, MATERIAL_FIELDS)
+        return self._data
+
+    @property
+    def ambient_color(self) -> np.ndarray:
+        return self.data[:, 0:3]
+
+    @property
+    def diffuse_color(self) -> np.ndarray:
+        return self.data[:, 3:6]
+
+    @property
+    def specular_color(self) -> np.ndarray:
+        return self.data[:, 6:9]
+
+    @property
+    def specular_exponent(self) -> np.ndarray:
+        return self.data[:, 9]
+
+    @property
+    def refraction_index(self) -> np.ndarray:
+        return self.data[:, 10]
+
+    @property
+    def albedo(self) -> np.ndarray:
+        return self.data[:, 11:14]
@@ -1,19 +1,4 @@
-import numpy as np
-
-from ..geometry import Vector
-
-
-class Matrix:
-    def __init__(self, right: Vector, up: Vector, forward: Vector, from_: Vector):
-        self._data = np.zeros((4, 4), dtype=float)
-        self._data[0, :3] = right.to_array()
-        self._data[1, :3] = up.to_array()
-        self._data[2, :3] = forward.to_array()
-        self._data[3, :3] = from_.to_array()
-        self._data[3, 3] = 1
-
-    def __getitem__(self, slice):
-        return self._data[slice]
+from ..geometry import Matrix, Vector
 
 
 def look_at(look_from: Vector, look_to: Vector, eps: float = 1e-8) -> Matrix:
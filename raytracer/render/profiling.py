@@ -0,0 +1,96 @@
+import attr
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+
+def format_frame(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame: FrameType | None) -> str:
+    names = []
+    while frame is not None:
+        names.append(format_frame(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+@attr.s(slots=True)
+class SamplingProfiler:
+    interval: float = attr.ib(default=0.005)
+    samples: Counter[str] = attr.ib(factory=Counter, init=False)
+
+    _target: int | None = attr.ib(default=None, init=False)
+    _active: threading.Event = attr.ib(factory=threading.Event, init=False)
+    _stopped: threading.Event = attr.ib(factory=threading.Event, init=False)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+    _thread: threading.Thread | None = attr.ib(default=None, init=False)
+
+    def start(self) -> None:
+        self._target = threading.get_ident()
+        self._stopped.clear()
+        self._active.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def pause(self) -> None:
+        self._active.clear()
+
+    def stop(self) -> None:
+        self._active.clear()
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if not self._active.is_set():
+                continue
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = collapse(frame)
+                with self._lock:
+                    self.samples[stack] += 1
+
+    def take(self) -> Counter[str]:
+        with self._lock:
+            samples, self.samples = self.samples, Counter()
+        return samples
+
+    def add(self, samples: Counter[str]) -> None:
+        with self._lock:
+            self.samples.update(samples)
+
+    def write_collapsed(self, path: str | Path) -> None:
+        with open(path, "w") as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write(f"{stack} {count}\n")
+
+    def summary(self, top: int = 20) -> str:
+        total = sum(self.samples.values())
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+
+        lines = [f"{total} samples, {self.interval * 1000:g} ms interval", f"{'self':>7} {'total':>7}  function"]
+        for name, count in own.most_common(top):
+            lines.append(f"{count / total:7.1%} {inclusive[name] / total:7.1%}  {name}")
+        return "\n".join(lines)
@@ -1,24 +1,44 @@
 import attr
+import contextlib
+import itertools
 import math
+import os
 import numpy as np
-import tqdm
-import multiprocessing
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
 
-from PIL import Image
-
-from ..geometry import BaseObject, Intersection, Ray, Vector, reflect, refract
+from ..geometry import BaseObject, Intersection, Material, Ray, SphereCloud, Vector, reflect, refract
+from ..geometry.accel import ACCELERATORS, build_accelerator
+from .cache import RenderCache, content_key
+from .context import TraceContext
+from .denoise import Denoiser
+from .gbuffer import GBuffer
+from .incremental import DependencyRecorder, PixelDependencies, RenderRecord
+from .lights import LightGrid, PointLight
+from .materials import MaterialTable, unpack_material
 from .matrix import look_at, point_matrix_multiply, vector_matrix_multiply
+from .serialization import SceneData, pack_objects, unpack_objects
+from .shading import needs_lights, shade, shadow_origins
+from .shadows import ShadowCache
+from .stats import RenderStats
+from .wavefront import closest_hits, trace_wavefront
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from .kernels import FlatScene
+    from .profiling import SamplingProfiler
 
 
 EPS = 1e-8
 NONE_VECTOR = Vector(-3.14)
 NONE_ARRAY = NONE_VECTOR.to_array()
 
-
-@attr.s(slots=True, kw_only=True)
-class PointLight:
-    origin: Vector = attr.ib()
-    intensity: Vector = attr.ib()
+# "numba" compiles flat scene kernels when numba is installed and traces like "python" otherwise
+ENGINES = ("numpy", "python", "numba")
+BACKENDS = ("processes", "threads")
+Tile = tuple[int, int, int, int]
 
 
 @attr.s(slots=True, kw_only=True)
@@ -38,16 +58,238 @@ class CameraOptions:
 class Scene:
     objects: list[BaseObject] = attr.ib(factory=list, init=False)
     lights: list[PointLight] = attr.ib(factory=list, init=False)
+    materials: MaterialTable = attr.ib(factory=MaterialTable, init=False)
+
+    light_threshold: float = attr.ib(default=0)
+    light_samples: int | None = attr.ib(default=None)
+    accelerator: str | None = attr.ib(
+        default=None, validator=attr.validators.optional(attr.validators.in_(ACCELERATORS)),
+    )
+    shadow_cache: ShadowCache | None = attr.ib(default=None, init=False)
+    last_render: RenderRecord | None = attr.ib(default=None, init=False)
+    gbuffer: GBuffer | None = attr.ib(default=None, init=False)
+
+    _context: TraceContext = attr.ib(factory=TraceContext, init=False)
+    _light_grid: LightGrid | None = attr.ib(default=None, init=False)
+    _accel = attr.ib(default=None, init=False)
+    # objects the accelerator was built for, None until it is (re)built
+    _accel_objects: list[BaseObject] | None = attr.ib(default=None, init=False)
+    # flattened arrays of the numba kernels with the scene state they were built from
+    _kernel: tuple | None = attr.ib(default=None, init=False)
+
+    @property
+    def stats(self) -> RenderStats:
+        return self._context.stats
 
-    _cached_last_intersected: BaseObject | None = attr.ib(default=None, init=False)
+    @stats.setter
+    def stats(self, stats: RenderStats) -> None:
+        self._context.stats = stats
+
+    def _intern_material(self, obj: BaseObject) -> None:
+        # objects keep their own materials, only the ids point into the shared table
+        if obj.material is not None:
+            obj.material_id = self.materials.add(obj.material)
+        if isinstance(obj, SphereCloud):
+            obj.palette_ids = np.array([self.materials.add(material) for material in obj.materials], dtype=np.int32)
+
+    def sync_materials(self) -> None:
+        # materials may be edited in place, so intern them again instead of trusting a dirty flag,
+        # edited materials get new ids and the rows nothing points to any more are dropped
+        used = set()
+        for obj in self.objects:
+            self._intern_material(obj)
+            used.add(obj.material_id)
+            if isinstance(obj, SphereCloud):
+                used.update(obj.palette_ids.tolist())
+        # the gbuffer of the last render keeps the ids it was shaded with, relight still reads them
+        buffer = self.gbuffer
+        mask = None if buffer is None else buffer.hits
+        if buffer is not None:
+            used.update(buffer.material_ids[mask].tolist())
+        used.discard(-1)
+
+        remap = self.materials.compact(used)
+        if remap is None:
+            return
+        for obj in self.objects:
+            if obj.material_id >= 0:
+                obj.material_id = int(remap[obj.material_id])
+            if isinstance(obj, SphereCloud):
+                obj.palette_ids = remap[obj.palette_ids]
+        if buffer is not None:
+            buffer.material_ids[mask] = remap[buffer.material_ids[mask]]
+
+    def surface_material(self, intersection: Intersection, obj: BaseObject) -> Material:
+        if intersection.material_id >= 0:
+            return self.materials[intersection.material_id]
+        return obj.material
 
     def add_object(self, obj: BaseObject) -> None:
+        self._intern_material(obj)
         self.objects.append(obj)
+        self.shadow_cache = None
+        self._accel_objects = None
+        self._kernel = None
 
     def add_light(self, light: PointLight) -> None:
         self.lights.append(light)
+        self.invalidate_lights()
+
+    def replace_objects(self, updates: dict[int, BaseObject]) -> None:
+        for idx, obj in updates.items():
+            self._intern_material(obj)
+            self.objects[idx] = obj
+        if updates:
+            self.shadow_cache = None
+            self._kernel = None
+        self._context.last_occluder = None
+        self.sync_accelerator()
+
+    @property
+    def accel(self):
+        if self.accelerator is None:
+            return None
+        if self._accel_objects is None:
+            # "auto" may settle on the linear scan, which is kept as None
+            self._accel = build_accelerator(self.accelerator, self.objects)
+            self._accel_objects = list(self.objects)
+        return self._accel
+
+    @property
+    def kernel_scene(self) -> "FlatScene | None":
+        # checked against the scene once per frame by sync_kernel_scene, tiles only read it
+        if self._kernel is None:
+            self.sync_kernel_scene()
+        return self._kernel[1]
+
+    def sync_kernel_scene(self) -> None:
+        from .kernels import FlatScene
+
+        key = FlatScene.key(self)
+        if self._kernel is None or self._kernel[0] != key:
+            self._kernel = (key, FlatScene.build(self))
+
+    def sync_accelerator(self) -> None:
+        # objects may be swapped in place, so compare identities instead of trusting a dirty flag
+        if self._accel_objects is None:
+            return
+        if len(self._accel_objects) != len(self.objects) or any(
+            old is not new for old, new in zip(self._accel_objects, self.objects)
+        ):
+            self._accel, self._accel_objects = None, None
+
+    def prepare_shared(self, engine: str | None = None) -> None:
+        self.sync_materials()
+        self.materials.data
+        self.accel
+        if engine is not None and _uses_kernels(engine):
+            self.sync_kernel_scene()
+        if self.light_threshold or self.light_samples:
+            self.light_grid
+
+    def invalidate_lights(self) -> None:
+        self._light_grid = None
+        self.shadow_cache = None
+
+    def build_shadow_cache(self, resolution: int = 64, **kwargs) -> ShadowCache:
+        self.sync_accelerator()
+        self.shadow_cache = ShadowCache.build(self, resolution, **kwargs)
+        return self.shadow_cache
+
+    def open_pool(self,
+                  num_workers: int | None = None,
+                  *,
+                  profiler: "SamplingProfiler | None" = None,
+                  ) -> "WorkerPool":
+        import multiprocessing
+        num_workers = num_workers or max(1, multiprocessing.cpu_count() - 1)
+        interval = None if profiler is None else profiler.interval
+        initargs = (self.to_bytes(), self.shadow_cache, interval)
+        return WorkerPool(self, multiprocessing.Pool(num_workers, initializer=_init_worker, initargs=initargs))
+
+    def reseed(self, seed) -> None:
+        self._context.reseed(seed)
+
+    @property
+    def light_grid(self) -> LightGrid:
+        if self._light_grid is None:
+            self._light_grid = LightGrid.build(self.lights, self.light_threshold)
+        return self._light_grid
+
+    def light_candidates(self, point: Vector, ctx: TraceContext | None = None) -> list[tuple[int, float]]:
+        ctx = ctx or self._context
+        if not self.light_threshold and not self.light_samples:
+            candidates = [(idx, 1.0) for idx in range(len(self.lights))]
+        elif self.light_samples:
+            indices, weights = self.light_grid.sample(point.to_tuple(), self.light_samples, ctx.rng)
+            candidates = list(zip(indices.tolist(), weights.tolist()))
+        else:
+            candidates = [(idx, 1.0) for idx in self.light_grid.query(point.to_tuple()).tolist()]
+
+        if ctx.recorder is not None:
+            ctx.recorder.shading(point, [idx for idx, _ in candidates])
+        return candidates
+
+    def to_data(self) -> SceneData:
+        self.sync_materials()
+        arrays = pack_objects(self.objects)
+        arrays["materials"] = self.materials.data
+        light_origins, light_intensities, light_attenuation = self.light_arrays()
+        arrays["lights"] = np.hstack([light_origins, light_intensities, light_attenuation[:, None]])
+        arrays["light_settings"] = np.array([self.light_threshold, self.light_samples or 0], dtype=float)
+        if self.accelerator is not None:
+            arrays["accelerator"] = np.frombuffer(self.accelerator.encode(), dtype=np.uint8)
+        return SceneData(arrays)
+
+    @classmethod
+    def from_data(cls, data: SceneData) -> "Scene":
+        light_threshold, light_samples = data.arrays.get("light_settings", (0, 0))
+        accelerator = data.arrays.get("accelerator")
+        scene = cls(
+            light_threshold=float(light_threshold),
+            light_samples=int(light_samples) or None,
+            accelerator=None if accelerator is None else bytes(accelerator).decode(),
+        )
+        materials = [unpack_material(row) for row in data["materials"].tolist()]
+        # the table is filled in its saved order, so material ids agree with the process that saved it
+        for material in materials:
+            scene.materials.add(material)
+        for obj in unpack_objects(data, materials):
+            scene.add_object(obj)
+        for row in data["lights"].tolist():
+            scene.add_light(PointLight(
+                origin=Vector(*row[0:3]),
+                intensity=Vector(*row[3:6]),
+                attenuation=row[6] if len(row) > 6 else 0,
+            ))
+        return scene
+
+    def to_bytes(self) -> bytes:
+        return self.to_data().to_bytes()
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> "Scene":
+        return cls.from_data(SceneData.from_buffer(buffer))
+
+    def save(self, path: str | Path) -> None:
+        self.to_data().save(path)
+
+    @classmethod
+    def load(cls, path: str | Path, *, use_mmap: bool = True) -> "Scene":
+        return cls.from_data(SceneData.load(path, use_mmap=use_mmap))
+
+    def find_closest_intersection(self,
+                                  ray: Ray,
+                                  ctx: TraceContext | None = None,
+                                  ) -> tuple[Intersection | None, BaseObject | None]:
+        ctx = ctx or self._context
+        accel = self.accel
+        if accel is not None:
+            best_intersection, intersected_obj = accel.intersect(ray)
+            if ctx.recorder is not None:
+                ctx.recorder.trace(ray, best_intersection, intersected_obj)
+            return best_intersection, intersected_obj
 
-    def find_closest_intersection(self, ray: Ray) -> tuple[Intersection | None, BaseObject | None]:
         intersected_obj = None
         best_intersection = None
         for obj in self.objects:
@@ -58,27 +300,100 @@ class Scene:
                 best_intersection = intersection
                 intersected_obj = obj
 
+        if ctx.recorder is not None:
+            ctx.recorder.trace(ray, best_intersection, intersected_obj)
         return best_intersection, intersected_obj
 
-    def is_point_illuminated(self, point: Vector, light_dir: Vector) -> bool:
-        ray = Ray(origin=point, direction=light_dir)
+    def is_point_illuminated(self,
+                             point: Vector,
+                             light_dir: Vector,
+                             light_idx: int | None = None,
+                             ctx: TraceContext | None = None,
+                             ) -> bool:
+        ctx = ctx or self._context
+        recorder = ctx.recorder
+        if light_idx is not None and self.shadow_cache is not None and recorder is None:
+            cached = self.shadow_cache.lookup(light_idx, point, self.objects)
+            if cached is not None:
+                ctx.stats.shadow_cache_hits += 1
+                return cached
+
+        ctx.stats.shadow_rays += 1
         light_dist = light_dir.length
-        if self._cached_last_intersected is not None:
-            intersection = self._cached_last_intersected.intersect(ray)
-            if intersection is not None and intersection.distance < light_dist:
-                return False
+        ray = Ray(origin=point, direction=light_dir)
+        if recorder is not None:
+            recorder.segment(ray, light_dist)
+        last = ctx.last_occluder
+        if last is not None and last.occludes(ray, light_dist):
+            if recorder is not None:
+                recorder.occluder(last)
+            return False
+
+        accel = self.accel
+        if accel is not None:
+            obj = ctx.last_occluder = accel.occluder(ray, light_dist)
+            if obj is not None and recorder is not None:
+                recorder.occluder(obj)
+            return obj is None
 
         for obj in self.objects:
-            if obj is self._cached_last_intersected:
+            if obj is last:
                 continue
-            intersection = obj.intersect(ray)
-            if intersection is not None and intersection.distance < light_dist:
-                self._cached_last_intersected = obj
+            if obj.occludes(ray, light_dist):
+                ctx.last_occluder = obj
+                if recorder is not None:
+                    recorder.occluder(obj)
                 return False
 
-        self._cached_last_intersected = None
+        ctx.last_occluder = None
         return True
 
+    def light_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        data = np.array(
+            [(*light.origin.to_tuple(), *light.intensity.to_tuple(), light.attenuation) for light in self.lights],
+            dtype=float,
+        ).reshape(-1, 7)
+        return data[:, :3], data[:, 3:6], data[:, 6]
+
+    def shade_hits(self,
+                   rays: Sequence[Ray],
+                   intersections: Sequence[Intersection],
+                   objects: Sequence[BaseObject],
+                   *,
+                   inside: bool = False,
+                   eps: float = EPS,
+                   ctx: TraceContext | None = None,
+                   ) -> np.ndarray:
+        return self.shade_points(*hit_arrays(rays, intersections, objects), inside=inside, eps=eps, ctx=ctx)
+
+    def shade_points(self,
+                     positions: np.ndarray,
+                     normals: np.ndarray,
+                     view_dirs: np.ndarray,
+                     material_ids: np.ndarray,
+                     *,
+                     inside: bool = False,
+                     eps: float = EPS,
+                     ctx: TraceContext | None = None,
+                     ) -> np.ndarray:
+        ctx = ctx or self._context
+        light_origins, light_intensities, light_attenuation = self.light_arrays()
+
+        weighted = bool(self.light_samples)
+        visible = np.zeros((len(material_ids), len(self.lights)), dtype=float if weighted else bool)
+        origins = shadow_origins(positions, normals, eps=eps)
+        for idx in np.flatnonzero(needs_lights(material_ids, self.materials, inside, eps=eps)):
+            new_pos = Vector.from_array(origins[idx])
+            for light_idx, weight in self.light_candidates(new_pos, ctx):
+                if self.is_point_illuminated(new_pos, self.lights[light_idx].origin - new_pos, light_idx, ctx):
+                    visible[idx, light_idx] = weight
+
+        return shade(
+            positions, normals, view_dirs, material_ids, self.materials,
+            light_origins, light_intensities, visible,
+            light_attenuation=light_attenuation, inside=inside, eps=eps,
+        )
+
     def get_intensity(self,
                       ray: Ray,
                       intersection: Intersection,
@@ -86,8 +401,10 @@ class Scene:
                       *,
                       inside: bool = False,
                       eps: float = EPS,
+                      ctx: TraceContext | None = None,
                       ) -> Vector:
-        material = obj.material
+        ctx = ctx or self._context
+        material = self.surface_material(intersection, obj)
 
         # ambient shading
         intensity = Vector()
@@ -103,41 +420,69 @@ class Scene:
             diffuse_total = Vector()
             specular_total = Vector()
 
-            for light in self.lights:
+            for light_idx, weight in self.light_candidates(new_pos, ctx):
+                light = self.lights[light_idx]
                 light_dir = light.origin - new_pos
-                if not self.is_point_illuminated(new_pos, light_dir):
+                # measured first, the shadow ray normalizes light_dir in place
+                squared_distance = light_dir.dot(light_dir)
+                if not self.is_point_illuminated(new_pos, light_dir, light_idx, ctx):
                     continue
+                light_intensity = light.intensity_at(squared_distance)
+                if weight != 1:
+                    light_intensity = weight * light_intensity
                 light_dir.normalize()
 
                 # diffuse shading
-                diffuse_total += max(0, norm.dot(light_dir)) * light.intensity
+                diffuse_total += max(0, norm.dot(light_dir)) * light_intensity
 
                 # specular shading
                 specular_dot = view_dir.dot(reflect(-light_dir, norm))
-                specular_total += max(0, specular_dot) ** material.specular_exponent * light.intensity
+                specular_total += max(0, specular_dot) ** material.specular_exponent * light_intensity
 
             intensity += material.albedo.x * material.diffuse_color.hadamard(diffuse_total)
             intensity += material.albedo.x * material.specular_color.hadamard(specular_total)
 
         return intensity
 
-    def trace_ray(self, ray: Ray, *, depth: float, inside: bool = False, eps: float = EPS) -> Vector:
-        intersection, obj = self.find_closest_intersection(ray)
+    def trace_ray(self,
+                  ray: Ray,
+                  *,
+                  depth: float,
+                  inside: bool = False,
+                  eps: float = EPS,
+                  ctx: TraceContext | None = None,
+                  ) -> Vector:
+        ctx = ctx or self._context
+        ctx.stats.secondary_rays += 1
+        intersection, obj = self.find_closest_intersection(ray, ctx)
         if intersection is None:
             return None
 
-        intensity = self.get_intensity(ray, intersection, obj, inside=inside, eps=eps)
+        intensity = self.get_intensity(ray, intersection, obj, inside=inside, eps=eps, ctx=ctx)
+        return self.trace_secondary(ray, intersection, obj, intensity, depth=depth, inside=inside, eps=eps, ctx=ctx)
+
+    def trace_secondary(self,
+                        ray: Ray,
+                        intersection: Intersection,
+                        obj: BaseObject,
+                        intensity: Vector,
+                        *,
+                        depth: float,
+                        inside: bool = False,
+                        eps: float = EPS,
+                        ctx: TraceContext | None = None,
+                        ) -> Vector:
         if depth <= 1:
             return intensity
 
-        material = obj.material
+        material = self.surface_material(intersection, obj)
 
         # reflection
         if not inside and material.albedo.y > eps:
             new_dir = reflect(ray.direction, intersection.normal)
             new_pos = intersection.position + eps * intersection.normal
             new_ray = Ray(origin=new_pos, direction=new_dir)
-            reflected = self.trace_ray(new_ray, depth=depth - 1, inside=False, eps=eps)
+            reflected = self.trace_ray(new_ray, depth=depth - 1, inside=False, eps=eps, ctx=ctx)
             if reflected is not None:
                 intensity += material.albedo.y * reflected
 
@@ -150,7 +495,9 @@ class Scene:
             if new_dir is not None:
                 new_pos = intersection.position - eps * intersection.normal
                 new_ray = Ray(origin=new_pos, direction=new_dir)
-                refracted = self.trace_ray(new_ray, depth=depth - 1, inside=inside ^ obj.has_volume(), eps=eps)
+                refracted = self.trace_ray(
+                    new_ray, depth=depth - 1, inside=inside ^ obj.has_volume(), eps=eps, ctx=ctx,
+                )
                 if refracted is not None:
                     intensity += (1 if inside else material.albedo.z) * refracted
 
@@ -185,38 +532,222 @@ class Scene:
                eps: float = EPS,
                parallel: bool = False,
                num_workers: int | None = None,
-               ) -> Image.Image:
+               tile_size: int | None = None,
+               profiler: "SamplingProfiler | None" = None,
+               engine: str = "numpy",
+               pool: "WorkerPool | None" = None,
+               record: bool = False,
+               gbuffer: bool = False,
+               backend: str = "processes",
+               cache: RenderCache | None = None,
+               region: Tile | None = None,
+               denoiser: Denoiser | None = None,
+               ) -> "Image.Image":
+        import tqdm
+
         if background_color is None:
             background_color = Vector(0, 0, 0)
+        # the denoiser is guided by the normals, depths and object ids of the gbuffer
+        guided = gbuffer or denoiser is not None
+        if record and guided:
+            raise ValueError("record cannot be combined with gbuffer or denoiser")
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+        threads = backend == "threads"
+        if threads and pool is not None:
+            raise ValueError("a worker pool cannot be used with the threads backend")
+        if (record or guided) and (cache is not None or region is not None):
+            raise ValueError("record, gbuffer and denoiser need a full uncached render")
 
-        global _RENDER_SETTINGS, _SCENE
-        _SCENE = self
-        _RENDER_SETTINGS = RenderSettings(cam_options, eps, depth)
-        width, height = _RENDER_SETTINGS.width, _RENDER_SETTINGS.height
+        self.sync_materials()
+        settings = RenderSettings(cam_options, eps, depth, engine, record, guided)
+        width, height = settings.width, settings.height
 
         pixels = np.empty((height, width, 3), dtype=float)
-        if parallel:
+        tiles = make_tiles(width, height, tile_size)
+        if region is not None:
+            tiles = crop_tiles(tiles, region)
+        stats = RenderStats()
+        frame_key = frame = None
+        if cache is not None:
+            shadows = b"" if self.shadow_cache is None else self.shadow_cache.digest()
+            frame_key = content_key(self.to_bytes(), settings.digest(), shadows)
+            frame = cache.get(frame_key)
+            tiles = self._cached_tiles(cache, frame_key, frame, pixels, tiles, stats)
+        # after the cache lookup, a cached frame needs no accelerator
+        if tiles:
+            self.sync_accelerator()
+            if _uses_kernels(engine):
+                self.sync_kernel_scene()
+        dependencies = []
+        buffer = None
+        if guided:
+            buffer = GBuffer.empty(width, height, settings=settings, background_color=background_color)
+
+        def collect(result: TileResult) -> None:
+            x0, y0, x1, y1 = result.tile
+            pixels[y0:y1, x0:x1] = result.pixels
+            stats.merge(result.stats)
+            if result.dependencies is not None:
+                dependencies.append(result.dependencies)
+            if result.gbuffer is not None:
+                buffer.paste(result.tile, result.gbuffer)
+            if profiler is not None:
+                profiler.add(result.samples)
+            if frame_key is not None and region is not None:
+                cache.put(content_key(frame_key, tile_bytes(result.tile)), result.pixels)
+
+        if threads:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # lazily built shared structures are built once here instead of racing in the workers
+            self.prepare_shared()
+            interval = None if profiler is None else profiler.interval
+            with ThreadPoolExecutor(num_workers or os.cpu_count(), thread_name_prefix="raytracer") as executor:
+                futures = [executor.submit(_thread_tile, self, settings, tile, interval) for tile in tiles]
+                for future in tqdm.tqdm(futures, desc="Ray tracing", disable=not verbose):
+                    collect(future.result())
+        elif tiles and (parallel or pool is not None):
             results = []
-            num_workers = num_workers or multiprocessing.cpu_count() - 1
-            with multiprocessing.Pool(num_workers) as pool:
-                for j in tqdm.tqdm(range(height), desc="Pool preparation", disable=not verbose):
-                    results.append(pool.apply_async(_process_line, (j,)))
+            workers = pool or self.open_pool(num_workers, profiler=profiler)
+            with workers if pool is None else contextlib.nullcontext(workers):
+                job = FrameJob(next(_FRAME_KEYS), settings, workers.updates())
+                for tile in tqdm.tqdm(tiles, desc="Pool preparation", disable=not verbose):
+                    results.append(workers.pool.apply_async(_process_tile, (tile, job)))
 
                 for res in tqdm.tqdm(results, total=len(results), desc="Ray tracing", disable=not verbose):
-                    j, line = res.get()
-                    pixels[j] = line
+                    collect(res.get())
         else:
-            for j in tqdm.tqdm(range(height), desc="Ray tracing", disable=not verbose):
-                pixels[j] = _process_line(j)[-1]
+            for tile in tqdm.tqdm(tiles, desc="Ray tracing", disable=not verbose):
+                collect(_profiled_tile(self, settings, tile, profiler))
+            if profiler is not None:
+                profiler.stop()
+        self.stats = stats
 
-        self.postprocess(pixels, background_color, eps=eps)
+        if record:
+            self.last_render = RenderRecord(
+                settings=settings,
+                background_color=background_color,
+                pixels=pixels.copy(),
+                dependencies=PixelDependencies.concatenate([deps for deps in dependencies if deps is not None]),
+            )
+            self.last_render.snapshot(self)
+        if gbuffer:
+            buffer.snapshot_lights(self.lights)
+            self.gbuffer = buffer
+        if denoiser is not None:
+            pixels = denoiser.apply(pixels, buffer)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            pixels = pixels[y0:y1, x0:x1].copy()
+        elif frame_key is not None and frame is None:
+            cache.put(frame_key, pixels)
+        return self.to_image(pixels, background_color, eps=eps)
+
+    def _cached_tiles(self,
+                      cache: RenderCache,
+                      frame_key: str,
+                      frame: np.ndarray | None,
+                      pixels: np.ndarray,
+                      tiles: list[Tile],
+                      stats: RenderStats,
+                      ) -> list[Tile]:
+        # whole frames are stored once, single tiles only by region renders
+        missing = []
+        for tile in tiles:
+            x0, y0, x1, y1 = tile
+            if frame is not None:
+                cached = frame[y0:y1, x0:x1]
+            else:
+                cached = cache.get(content_key(frame_key, tile_bytes(tile)))
+            if cached is None:
+                missing.append(tile)
+            else:
+                pixels[y0:y1, x0:x1] = cached
+                stats.cached_tiles += 1
+        return missing
+
+    def rerender(self, *, verbose: bool = True) -> "Image.Image":
+        record = self.last_render
+        if record is None:
+            raise ValueError("rerender needs a previous render(..., record=True)")
+
+        settings = record.settings
+        affected = record.affected_pixels(self)
+        if affected is None:
+            return self.render(
+                settings.cam_options,
+                background_color=record.background_color,
+                depth=settings.depth,
+                verbose=verbose,
+                eps=settings.eps,
+                engine=settings.engine,
+                record=True,
+            )
+
+        moved, repainted, lights = record.changes(self)
+        for idx in moved + repainted:
+            self._intern_material(self.objects[idx])
+        if moved:
+            self.shadow_cache = None
+            self.sync_accelerator()
+        if lights:
+            self.invalidate_lights()
+
+        colors, dependencies, self.stats = _trace_pixels(self, settings, affected.tolist(), verbose=verbose)
+        record.update(self, affected, colors, dependencies)
+        return self.to_image(record.pixels.copy(), record.background_color, eps=settings.eps)
 
-        img = Image.fromarray(np.uint8(np.clip(0, 255, 256 * pixels)))
-        return img
+    def relight(self, *, verbose: bool = True) -> "Image.Image":
+        import tqdm
 
+        buffer = self.gbuffer
+        if buffer is None:
+            raise ValueError("relight needs a previous render(..., gbuffer=True)")
+        self.sync_materials()
+        self.sync_accelerator()
+        if buffer.lights != self.lights:
+            self.invalidate_lights()
+            buffer.snapshot_lights(self.lights)
 
-_SCENE: 'Scene' = None                     # type: ignore
-_RENDER_SETTINGS: 'RenderSettings' = None  # type: ignore
+        settings = buffer.settings
+        depth, eps = settings.depth, settings.eps
+        mask = buffer.hits
+        material_ids = buffer.material_ids[mask].astype(np.intp)
+        self.stats = RenderStats()
+        local = self.shade_points(
+            buffer.positions[mask], buffer.normals[mask], buffer.view_dirs[mask], material_ids, eps=eps,
+        )
+
+        # only reflective and refractive hits need rays beyond the cached primary hit
+        albedo = self.materials.albedo[material_ids]
+        secondary = np.flatnonzero((albedo[:, 1] > eps) | (albedo[:, 2] > eps)) if depth > 1 else []
+        hits = list(tqdm.tqdm(buffer.primary_hits(self.objects, secondary), desc="Relighting", disable=not verbose))
+        if hits:
+            local[secondary] = trace_wavefront(
+                self, *zip(*hits), local[secondary], depth=depth, eps=eps, ctx=self._context,
+            )
+
+        pixels = np.empty(mask.shape + (3,), dtype=float)
+        pixels[:] = NONE_ARRAY
+        pixels[mask] = local
+        return self.to_image(pixels, buffer.background_color, eps=eps)
+
+    def to_image(self, pixels: np.ndarray, background_color: Vector, *, eps: float = EPS) -> "Image.Image":
+        from PIL import Image
+
+        self.postprocess(pixels, background_color, eps=eps)
+        return Image.fromarray(np.uint8(np.clip(0, 255, 256 * pixels)))
+
+
+# per-process state of pool workers; threads and the serial path pass the scene explicitly
+_WORKER_SCENE: 'Scene' = None               # type: ignore
+_WORKER_SETTINGS: 'RenderSettings' = None    # type: ignore
+_WORKER_PROFILER: "SamplingProfiler | None" = None
+_BASE_OBJECTS: list[BaseObject] = []
+_BASE_SHADOW_CACHE: ShadowCache | None = None
+_FRAME_KEY: int | None = None
+_FRAME_KEYS = itertools.count()
 
 
 @attr.s(slots=True)
@@ -224,6 +755,9 @@ class RenderSettings:
     cam_options: CameraOptions = attr.ib()
     eps: float = attr.ib()
     depth = attr.ib()
+    engine: str = attr.ib(default="numpy", validator=attr.validators.in_(ENGINES))
+    record: bool = attr.ib(default=False)
+    gbuffer: bool = attr.ib(default=False)
 
     width = attr.ib(default=None)
     height = attr.ib(default=None)
@@ -241,23 +775,267 @@ class RenderSettings:
         self.cam_to_world = look_at(self.cam_options.look_from, self.cam_options.look_to, eps=self.eps)
         self.origin = point_matrix_multiply(self.cam_to_world, Vector())
 
+    def digest(self) -> bytes:
+        # everything that changes traced pixels, record and gbuffer only add side outputs
+        cam = self.cam_options
+        values = np.array([
+            cam.screen_width, cam.screen_height, cam.fov,
+            *cam.look_from.to_tuple(), *cam.look_to.to_tuple(), self.depth, self.eps,
+        ], dtype=float)
+        return values.tobytes() + self.engine.encode()
+
+
+@attr.s(slots=True)
+class FrameJob:
+    key: int = attr.ib()
+    settings: RenderSettings = attr.ib()
+    updates: dict[int, BaseObject] = attr.ib(factory=dict)
+
+
+@attr.s(slots=True)
+class WorkerPool:
+    scene: Scene = attr.ib()
+    pool = attr.ib()
+
+    _base_objects: list[BaseObject] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self._base_objects = list(self.scene.objects)
+
+    def updates(self) -> dict[int, BaseObject]:
+        if len(self.scene.objects) != len(self._base_objects):
+            raise ValueError("objects were added or removed after the worker pool was started")
+        return {
+            idx: obj
+            for idx, (obj, base) in enumerate(zip(self.scene.objects, self._base_objects))
+            if obj is not base
+        }
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.pool.terminate()
+
+
+def hit_arrays(rays: Sequence[Ray],
+               intersections: Sequence[Intersection],
+               objects: Sequence[BaseObject],
+               ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    positions = np.array([hit.position.to_tuple() for hit in intersections], dtype=float).reshape(-1, 3)
+    normals = np.array([hit.normal.to_tuple() for hit in intersections], dtype=float).reshape(-1, 3)
+    view_dirs = -np.array([ray.direction.to_tuple() for ray in rays], dtype=float).reshape(-1, 3)
+    material_ids = np.array([
+        hit.material_id if hit.material_id >= 0 else obj.material_id for hit, obj in zip(intersections, objects)
+    ], dtype=np.intp)
+    return positions, normals, view_dirs, material_ids
+
+
+def _init_worker(scene_bytes: bytes,
+                 shadow_cache: ShadowCache | None,
+                 profile_interval: float | None = None,
+                 ) -> None:
+    from .profiling import SamplingProfiler
+
+    global _BASE_OBJECTS, _BASE_SHADOW_CACHE, _FRAME_KEY, _WORKER_PROFILER, _WORKER_SCENE
+    _WORKER_SCENE = Scene.from_bytes(scene_bytes)
+    _WORKER_SCENE.shadow_cache = _BASE_SHADOW_CACHE = shadow_cache
+    _BASE_OBJECTS = list(_WORKER_SCENE.objects)
+    _FRAME_KEY = None
+    _WORKER_PROFILER = None if profile_interval is None else SamplingProfiler(profile_interval)
+
+
+def _start_frame(job: FrameJob) -> None:
+    global _FRAME_KEY, _WORKER_SETTINGS
+    if job.key == _FRAME_KEY:
+        return
+
+    # moved objects are relative to the scene shipped at pool start
+    _WORKER_SCENE.objects[:] = _BASE_OBJECTS
+    _WORKER_SCENE.replace_objects(job.updates)
+    if not job.updates:
+        _WORKER_SCENE.shadow_cache = _BASE_SHADOW_CACHE
+    _WORKER_SETTINGS = job.settings
+    _FRAME_KEY = job.key
+    if _uses_kernels(job.settings.engine):
+        _WORKER_SCENE.sync_kernel_scene()
+
+
+def _uses_kernels(engine: str) -> bool:
+    if engine != "numba":
+        return False
+    # imported here, numba itself is slow to import and starts multiprocessing machinery
+    from . import kernels
+
+    return kernels.available()
+
+
+def make_tiles(width: int, height: int, tile_size: int | None = None) -> list[Tile]:
+    if tile_size is None:
+        return [(0, j, width, j + 1) for j in range(height)]
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+
+def crop_tiles(tiles: list[Tile], region: Tile) -> list[Tile]:
+    # whole tiles are kept so that they stay interchangeable with those of a full frame
+    x0, y0, x1, y1 = region
+    if not (x0 < x1 and y0 < y1):
+        raise ValueError(f"empty region {region}")
+    return [tile for tile in tiles if tile[0] < x1 and x0 < tile[2] and tile[1] < y1 and y0 < tile[3]]
+
+
+def tile_bytes(tile: Tile) -> bytes:
+    return np.array(tile, dtype=np.int64).tobytes()
+
+
+@attr.s(slots=True, kw_only=True)
+class TileResult:
+    tile: Tile = attr.ib()
+    pixels: np.ndarray = attr.ib()
+    stats: RenderStats = attr.ib()
+    samples: Counter[str] = attr.ib(factory=Counter)
+    dependencies: PixelDependencies | None = attr.ib(default=None)
+    gbuffer: GBuffer | None = attr.ib(default=None)
+
+
+def _process_tile(tile: Tile, job: FrameJob | None = None) -> TileResult:
+    if job is not None:
+        _start_frame(job)
+    return _profiled_tile(_WORKER_SCENE, _WORKER_SETTINGS, tile, _WORKER_PROFILER)
+
+
+def _thread_tile(scene: Scene, settings: RenderSettings, tile: Tile, profile_interval: float | None) -> TileResult:
+    if profile_interval is None:
+        return _trace_tile(scene, settings, tile)
+
+    from .profiling import SamplingProfiler
+
+    # a sampling profiler follows one thread, so each tile gets its own
+    with SamplingProfiler(profile_interval) as profiler:
+        result = _trace_tile(scene, settings, tile)
+    result.samples = profiler.take()
+    return result
+
+
+def _profiled_tile(scene: Scene,
+                   settings: RenderSettings,
+                   tile: Tile,
+                   profiler: "SamplingProfiler | None",
+                   ) -> TileResult:
+    if profiler is None:
+        return _trace_tile(scene, settings, tile)
+
+    profiler.start()
+    try:
+        result = _trace_tile(scene, settings, tile)
+    finally:
+        profiler.pause()
+    result.samples = profiler.take()
+    return result
+
+
+def render_tile(scene: Scene, settings: RenderSettings, tile: Tile) -> TileResult:
+    # entry point for schedulers outside this module, e.g. the render service
+    return _trace_tile(scene, settings, tile)
+
+
+def _trace_tile(scene: Scene, settings: RenderSettings, tile: Tile) -> TileResult:
+    x0, y0, x1, y1 = tile
+    depth, eps = settings.depth, settings.eps
+    if settings.record:
+        width = settings.width
+        pixel_ids = [j * width + i for j in range(y0, y1) for i in range(x0, x1)]
+        colors, dependencies, stats = _trace_pixels(scene, settings, pixel_ids)
+        stats.tiles = 1
+        pixels = colors.reshape(y1 - y0, x1 - x0, 3)
+        return TileResult(tile=tile, pixels=pixels, stats=stats, dependencies=dependencies)
+
+    if _uses_kernels(settings.engine):
+        from . import kernels
+
+        if kernels.supports(scene, settings):
+            return kernels.trace_tile(scene, settings, tile)
+
+    ctx = TraceContext(stats=RenderStats(primary_rays=(x1 - x0) * (y1 - y0), tiles=1))
+    ctx.reseed(tile)
+
+    pixels = np.empty((y1 - y0, x1 - x0, 3), dtype=float)
+    pixels[:] = NONE_ARRAY
+
+    coords = [(j, i) for j in range(y0, y1) for i in range(x0, x1)]
+    primary = [_primary_ray(settings, i, j) for j, i in coords]
+    if settings.engine == "numpy":
+        found = closest_hits(scene, primary, ctx)
+    else:
+        found = [scene.find_closest_intersection(ray, ctx) for ray in primary]
+    hits = [
+        (j - y0, i - x0, ray, intersection, obj)
+        for (j, i), ray, (intersection, obj) in zip(coords, primary, found)
+        if intersection is not None
+    ]
+    result = TileResult(tile=tile, pixels=pixels, stats=ctx.stats)
+    if not hits:
+        return result
+
+    rows, cols, rays, intersections, objects = zip(*hits)
+    arrays = hit_arrays(rays, intersections, objects)
+    if settings.gbuffer:
+        index_of = {id(obj): idx for idx, obj in enumerate(scene.objects)}
+        object_ids = [index_of[id(obj)] for obj in objects]
+        result.gbuffer = GBuffer.from_hits(x1 - x0, y1 - y0, rows, cols, *arrays[:3], object_ids, arrays[3])
+
+    if settings.engine != "numpy":
+        for row, col, ray, intersection, obj in hits:
+            intensity = scene.get_intensity(ray, intersection, obj, eps=eps, ctx=ctx)
+            pixel = scene.trace_secondary(ray, intersection, obj, intensity, depth=depth, eps=eps, ctx=ctx)
+            pixels[row, col] = pixel.to_array()
+    else:
+        local = scene.shade_points(*arrays, eps=eps, ctx=ctx)
+        pixels[rows, cols] = trace_wavefront(
+            scene, rays, intersections, objects, local, depth=depth, eps=eps, ctx=ctx,
+        )
+
+    return result
 
-def _process_line(j):
-    line = np.empty((_RENDER_SETTINGS.width, 3), dtype=float)
-    for i in range(_RENDER_SETTINGS.width):
-        line[i] = _process_pixel(i, j)
 
-    return j, line
+def _trace_pixels(scene: Scene,
+                  settings: RenderSettings,
+                  pixel_ids: list[int],
+                  *,
+                  verbose: bool = False,
+                  ) -> tuple[np.ndarray, PixelDependencies, RenderStats]:
+    import tqdm
 
+    width, depth, eps = settings.width, settings.depth, settings.eps
+    recorder = DependencyRecorder.for_objects(scene.objects)
+    ctx = TraceContext(stats=RenderStats(primary_rays=len(pixel_ids)), recorder=recorder)
 
-def _process_pixel(i, j):
-    x = (2 * (i + 0.5) / _RENDER_SETTINGS.width - 1) * _RENDER_SETTINGS.aspect_ratio * _RENDER_SETTINGS.scale
-    y = (1 - 2 * (j + 0.5) / _RENDER_SETTINGS.height) * _RENDER_SETTINGS.scale
-    direction = vector_matrix_multiply(_RENDER_SETTINGS.cam_to_world, Vector(x, y, -1))
-    ray = Ray(origin=_RENDER_SETTINGS.origin, direction=direction)
+    colors = np.empty((len(pixel_ids), 3), dtype=float)
+    colors[:] = NONE_ARRAY
+    # scalar shading per pixel, so every dependency is attributed to the pixel that caused it
+    for idx, pixel_id in enumerate(tqdm.tqdm(pixel_ids, desc="Ray tracing", disable=not verbose)):
+        j, i = divmod(pixel_id, width)
+        recorder.pixel = pixel_id
+        ctx.reseed((i, j))
+        ray = _primary_ray(settings, i, j)
+        intersection, obj = scene.find_closest_intersection(ray, ctx)
+        if intersection is not None:
+            intensity = scene.get_intensity(ray, intersection, obj, eps=eps, ctx=ctx)
+            color = scene.trace_secondary(ray, intersection, obj, intensity, depth=depth, eps=eps, ctx=ctx)
+            colors[idx] = color.to_array()
+    return colors, recorder.finish(), ctx.stats
 
-    pixel = _SCENE.trace_ray(ray, depth=_RENDER_SETTINGS.depth, eps=_RENDER_SETTINGS.eps)
-    if pixel is None:
-        pixel = NONE_VECTOR
 
-    return pixel.to_array()
+def _primary_ray(settings: RenderSettings, i: int, j: int) -> Ray:
+    x = (2 * (i + 0.5) / settings.width - 1) * settings.aspect_ratio * settings.scale
+    y = (1 - 2 * (j + 0.5) / settings.height) * settings.scale
+    direction = vector_matrix_multiply(settings.cam_to_world, Vector(x, y, -1))
+    return Ray(origin=settings.origin, direction=direction)
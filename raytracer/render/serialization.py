@@ -0,0 +1,321 @@
+import attr
+import itertools
+import math
+import mmap
+import numpy as np
+import struct
+from pathlib import Path
+
+from ..geometry import (
+    BaseObject, Box, Instance, Material, Matrix, Mesh, Plane, Rectangle, Sphere, SphereCloud, Triangle, Vector,
+)
+
+
+MAGIC = b"RTSCENE\0"
+VERSION = 5
+ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<16s4sI3QQ")
+
+OBJECT_SPHERE = 0
+OBJECT_TRIANGLE = 1
+OBJECT_MESH = 2
+OBJECT_INSTANCE = 3
+OBJECT_PLANE = 4
+OBJECT_RECTANGLE = 5
+OBJECT_BOX = 6
+OBJECT_CLOUD = 7
+
+
+class SceneFormatError(ValueError):
+    pass
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _section_name(raw: bytes) -> str:
+    try:
+        return raw.rstrip(b"\0").decode()
+    except UnicodeDecodeError:
+        raise SceneFormatError(f"invalid section name {raw!r}") from None
+
+
+def _section_dtype(raw: bytes) -> np.dtype:
+    try:
+        dtype = np.dtype(raw.rstrip(b"\0").decode())
+    except (UnicodeDecodeError, TypeError):
+        raise SceneFormatError(f"invalid section dtype {raw!r}") from None
+    # only plain numbers can be viewed straight from the file
+    if dtype.kind not in "biuf":
+        raise SceneFormatError(f"unsupported section dtype {dtype}")
+    return dtype
+
+
+@attr.s(slots=True)
+class SceneData:
+    arrays: dict[str, np.ndarray] = attr.ib(factory=dict)
+    version: int = attr.ib(default=VERSION)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def to_bytes(self) -> bytes:
+        directory = []
+        offset = _align(_HEADER.size + _SECTION.size * len(self.arrays))
+        for name, array in self.arrays.items():
+            if array.ndim > 3:
+                raise SceneFormatError(f"section {name!r} has more than 3 dimensions")
+            if len(name.encode()) > 16:
+                raise SceneFormatError(f"section name {name!r} is longer than 16 bytes")
+            shape = array.shape + (0,) * (3 - array.ndim)
+            dtype = array.dtype.newbyteorder("<").str.encode()
+            directory.append(_SECTION.pack(name.encode(), dtype, array.ndim, *shape, offset))
+            offset = _align(offset + array.nbytes)
+
+        buffer = bytearray(offset)
+        _HEADER.pack_into(buffer, 0, MAGIC, self.version, len(self.arrays))
+        buffer[_HEADER.size:_HEADER.size + len(directory) * _SECTION.size] = b"".join(directory)
+        for entry, array in zip(directory, self.arrays.values()):
+            start = _SECTION.unpack(entry)[-1]
+            data = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")).tobytes()
+            buffer[start:start + len(data)] = data
+        return bytes(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "SceneData":
+        size = len(buffer)
+        if size < _HEADER.size:
+            raise SceneFormatError(f"truncated scene file, {size} bytes is shorter than the header")
+        magic, version, num_sections = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise SceneFormatError("not a raytracer scene file")
+        if version > VERSION:
+            raise SceneFormatError(f"unsupported scene format version {version}")
+        if _HEADER.size + num_sections * _SECTION.size > size:
+            raise SceneFormatError(f"truncated scene file, the directory of {num_sections} sections does not fit")
+
+        arrays = {}
+        for idx in range(num_sections):
+            name, dtype, ndim, *shape, offset = _SECTION.unpack_from(buffer, _HEADER.size + idx * _SECTION.size)
+            name, dtype = _section_name(name), _section_dtype(dtype)
+            if ndim > 3:
+                raise SceneFormatError(f"section {name!r} has {ndim} dimensions")
+            shape = tuple(shape[:ndim])
+            nbytes = math.prod(shape) * dtype.itemsize
+            if offset % ALIGNMENT:
+                raise SceneFormatError(f"section {name!r} starts at unaligned offset {offset}")
+            if offset + nbytes > size:
+                raise SceneFormatError(f"section {name!r} reaches past the end of the file")
+            array = np.frombuffer(buffer, dtype=dtype, count=math.prod(shape), offset=offset)
+            arrays[name] = array.reshape(shape)
+        return cls(arrays, version)
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str | Path, *, use_mmap: bool = True) -> "SceneData":
+        with open(path, "rb") as file:
+            if not use_mmap:
+                return cls.from_buffer(file.read())
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer)
+
+
+def pack_objects(objects: list[BaseObject]) -> dict[str, np.ndarray]:
+    order = []
+    spheres, sphere_mtl = [], []
+    triangles, triangle_mtl, triangle_normals = [], [], []
+    planes, plane_mtl = [], []
+    rectangles, rectangle_mtl = [], []
+    boxes, box_mtl = [], []
+    meshes, mesh_vertices, mesh_faces = [], [], []
+    mesh_normals, mesh_normal_start = [], []
+    instances, instance_mesh, instance_mtl = [], [], []
+    clouds, cloud_centers, cloud_radii, cloud_mtl, cloud_palette = [], [], [], [], []
+    mesh_index: dict[int, int] = {}
+
+    def add_mesh(mesh: Mesh) -> int:
+        # instanced meshes are stored once no matter how many instances share them
+        if id(mesh) not in mesh_index:
+            mesh_index[id(mesh)] = len(meshes)
+            meshes.append((len(mesh_vertices), len(mesh.vertices), len(mesh_faces), len(mesh.faces),
+                           mesh.material_id, mesh.closed))
+            mesh_normal_start.append(len(mesh_normals) if mesh.normals is not None else -1)
+            mesh_normals.extend(normal.to_tuple() for normal in mesh.normals or ())
+            mesh_vertices.extend(vertex.to_tuple() for vertex in mesh.vertices)
+            mesh_faces.extend(mesh.faces)
+        return mesh_index[id(mesh)]
+
+    for obj in objects:
+        material_id = obj.material_id
+        if isinstance(obj, Sphere):
+            order.append((OBJECT_SPHERE, len(spheres)))
+            spheres.append((*obj.center.to_tuple(), obj.radius))
+            sphere_mtl.append(material_id)
+        elif isinstance(obj, Triangle):
+            order.append((OBJECT_TRIANGLE, len(triangles)))
+            triangles.append(tuple(coord for vertex in obj for coord in vertex.to_tuple()))
+            triangle_mtl.append(material_id)
+            # flat triangles keep a row of nans so the rows stay aligned with the triangles
+            normals = obj.normals or [Vector(math.nan)] * 3
+            triangle_normals.append(tuple(coord for normal in normals for coord in normal.to_tuple()))
+        elif isinstance(obj, Plane):
+            order.append((OBJECT_PLANE, len(planes)))
+            planes.append((*obj.point.to_tuple(), *obj.normal.to_tuple()))
+            plane_mtl.append(material_id)
+        elif isinstance(obj, Rectangle):
+            order.append((OBJECT_RECTANGLE, len(rectangles)))
+            rectangles.append((*obj.origin.to_tuple(), *obj.edge_u.to_tuple(), *obj.edge_v.to_tuple()))
+            rectangle_mtl.append(material_id)
+        elif isinstance(obj, Box):
+            order.append((OBJECT_BOX, len(boxes)))
+            boxes.append((*obj.lower.to_tuple(), *obj.upper.to_tuple()))
+            box_mtl.append(material_id)
+        elif isinstance(obj, SphereCloud):
+            order.append((OBJECT_CLOUD, len(clouds)))
+            palette = obj.palette_ids if obj.palette_ids is not None else [material_id] * len(obj.materials)
+            spheres_before = sum(len(centers) for centers in cloud_centers)
+            clouds.append((spheres_before, len(obj), len(cloud_palette), len(palette), material_id))
+            cloud_centers.append(obj.centers)
+            cloud_radii.append(obj.radii)
+            cloud_mtl.append(obj.material_ids)
+            cloud_palette.extend(int(idx) for idx in palette)
+        elif isinstance(obj, Mesh):
+            order.append((OBJECT_MESH, add_mesh(obj)))
+        elif isinstance(obj, Instance):
+            if not isinstance(obj.geometry, Mesh):
+                raise SceneFormatError(f"cannot serialize instances of {type(obj.geometry).__name__}")
+            order.append((OBJECT_INSTANCE, len(instances)))
+            instances.append(tuple(coord for row in obj.transform.rows for coord in row))
+            instance_mesh.append(add_mesh(obj.geometry))
+            instance_mtl.append(material_id)
+        else:
+            raise SceneFormatError(f"cannot serialize object of type {type(obj).__name__}")
+
+    return {
+        "objects": np.array(order, dtype=np.int32).reshape(-1, 2),
+        "spheres": np.array(spheres, dtype=float).reshape(-1, 4),
+        "sphere_mtl": np.array(sphere_mtl, dtype=np.int32),
+        "triangles": np.array(triangles, dtype=float).reshape(-1, 9),
+        "triangle_mtl": np.array(triangle_mtl, dtype=np.int32),
+        "triangle_normals": np.array(triangle_normals, dtype=float).reshape(-1, 9),
+        "planes": np.array(planes, dtype=float).reshape(-1, 6),
+        "plane_mtl": np.array(plane_mtl, dtype=np.int32),
+        "rectangles": np.array(rectangles, dtype=float).reshape(-1, 9),
+        "rectangle_mtl": np.array(rectangle_mtl, dtype=np.int32),
+        "boxes": np.array(boxes, dtype=float).reshape(-1, 6),
+        "box_mtl": np.array(box_mtl, dtype=np.int32),
+        "meshes": np.array(meshes, dtype=np.int64).reshape(-1, 6),
+        "mesh_vertices": np.array(mesh_vertices, dtype=float).reshape(-1, 3),
+        "mesh_faces": np.array(mesh_faces, dtype=np.int32).reshape(-1, 3),
+        "mesh_normals": np.array(mesh_normals, dtype=float).reshape(-1, 3),
+        "mesh_normal_idx": np.array(mesh_normal_start, dtype=np.int64),
+        "instances": np.array(instances, dtype=float).reshape(-1, 12),
+        "instance_mesh": np.array(instance_mesh, dtype=np.int32),
+        "instance_mtl": np.array(instance_mtl, dtype=np.int32),
+        # clouds keep their float32 arrays, so a loaded cloud can view the mapped file directly
+        "clouds": np.array(clouds, dtype=np.int64).reshape(-1, 5),
+        "cloud_centers": np.concatenate(cloud_centers or [np.zeros((0, 3), dtype=np.float32)]),
+        "cloud_radii": np.concatenate(cloud_radii or [np.zeros(0, dtype=np.float32)]),
+        "cloud_mtl": np.concatenate(cloud_mtl or [np.zeros(0, dtype=np.uint16)]),
+        "cloud_palette": np.array(cloud_palette, dtype=np.int32),
+    }
+
+
+def unpack_objects(data: SceneData, materials: list[Material]) -> list[BaseObject]:
+    def material(idx: int) -> Material | None:
+        return materials[idx] if idx >= 0 else None
+
+    spheres = [
+        Sphere(center=Vector(x, y, z), radius=radius, material=material(mtl))
+        for (x, y, z, radius), mtl in zip(data["spheres"].tolist(), data["sphere_mtl"].tolist())
+    ]
+
+    def rows(name: str, width: int) -> list:
+        # sections added after version 2 may be missing from older files
+        return data.arrays.get(name, np.zeros((0, width))).tolist()
+
+    def ids(name: str) -> list[int]:
+        return data.arrays.get(name, np.zeros(0, dtype=np.int32)).tolist()
+
+    def vectors(coords: list[float]) -> list[Vector] | None:
+        if not coords or math.isnan(coords[0]):
+            return None
+        return [Vector(*coords[idx:idx + 3]) for idx in range(0, len(coords), 3)]
+
+    triangle_normals = rows("triangle_normals", 9)
+    triangles = [
+        Triangle(
+            vectors(coords),
+            vectors(triangle_normals[idx] if idx < len(triangle_normals) else []),
+            material=material(mtl),
+        )
+        for idx, (coords, mtl) in enumerate(zip(data["triangles"].tolist(), data["triangle_mtl"].tolist()))
+    ]
+
+    planes = [
+        Plane(point=Vector(*coords[0:3]), normal=Vector(*coords[3:6]), material=material(idx))
+        for coords, idx in zip(rows("planes", 6), ids("plane_mtl"))
+    ]
+    rectangles = [
+        Rectangle(
+            origin=Vector(*coords[0:3]),
+            edge_u=Vector(*coords[3:6]),
+            edge_v=Vector(*coords[6:9]),
+            material=material(idx),
+        )
+        for coords, idx in zip(rows("rectangles", 9), ids("rectangle_mtl"))
+    ]
+    boxes = [
+        Box(lower=Vector(*coords[0:3]), upper=Vector(*coords[3:6]), material=material(idx))
+        for coords, idx in zip(rows("boxes", 6), ids("box_mtl"))
+    ]
+
+    vertices, faces = data.arrays.get("mesh_vertices"), data.arrays.get("mesh_faces")
+    normals, normal_start = data.arrays.get("mesh_normals"), ids("mesh_normal_idx")
+    mesh_rows = itertools.zip_longest(rows("meshes", 6), normal_start, fillvalue=-1)
+    meshes = [
+        Mesh(
+            vertices=[Vector(*coords) for coords in vertices[v0:v0 + vn].tolist()],
+            faces=faces[f0:f0 + fn].tolist(),
+            closed=bool(closed),
+            normals=vectors(normals[n0:n0 + vn].reshape(-1).tolist()) if n0 >= 0 else None,
+            material=material(mtl_id),
+        )
+        for (v0, vn, f0, fn, mtl_id, closed), n0 in mesh_rows
+    ]
+    instances = [
+        Instance(
+            geometry=meshes[mesh],
+            transform=Matrix.from_rows([coords[0:3], coords[3:6], coords[6:9], coords[9:12]]),
+            material=material(idx),
+        )
+        for coords, mesh, idx in zip(rows("instances", 12), ids("instance_mesh"), ids("instance_mtl"))
+    ]
+
+    clouds = []
+    for s0, sn, p0, pn, mtl_id in rows("clouds", 5):
+        palette = data["cloud_palette"][p0:p0 + pn].tolist()
+        clouds.append(SphereCloud(
+            centers=data["cloud_centers"][s0:s0 + sn],
+            radii=data["cloud_radii"][s0:s0 + sn],
+            material_ids=data["cloud_mtl"][s0:s0 + sn],
+            materials=[materials[idx] for idx in palette if idx >= 0],
+            material=material(mtl_id),
+        ))
+
+    by_kind = {
+        OBJECT_SPHERE: spheres,
+        OBJECT_TRIANGLE: triangles,
+        OBJECT_MESH: meshes,
+        OBJECT_INSTANCE: instances,
+        OBJECT_PLANE: planes,
+        OBJECT_RECTANGLE: rectangles,
+        OBJECT_BOX: boxes,
+        OBJECT_CLOUD: clouds,
+    }
+    return [by_kind[kind][idx] for kind, idx in data["objects"].tolist()]
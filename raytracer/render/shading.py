@@ -0,0 +1,80 @@
+import numpy as np
+
+from .materials import MaterialTable
+
+
+EPS = 1e-8
+
+
+def _dot(lhs: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    return lhs[..., 0] * rhs[..., 0] + lhs[..., 1] * rhs[..., 1] + lhs[..., 2] * rhs[..., 2]
+
+
+def needs_lights(material_ids: np.ndarray,
+                 materials: MaterialTable,
+                 inside: np.ndarray | bool = False,
+                 *,
+                 eps: float = EPS,
+                 ) -> np.ndarray:
+    return ~np.asarray(inside, dtype=bool) & (materials.albedo[material_ids, 0] > eps)
+
+
+def shadow_origins(positions: np.ndarray, normals: np.ndarray, *, eps: float = EPS) -> np.ndarray:
+    return positions + eps * normals
+
+
+def shade(positions: np.ndarray,
+          normals: np.ndarray,
+          view_dirs: np.ndarray,
+          material_ids: np.ndarray,
+          materials: MaterialTable,
+          light_origins: np.ndarray,
+          light_intensities: np.ndarray,
+          visible: np.ndarray,
+          *,
+          light_attenuation: np.ndarray | None = None,
+          inside: np.ndarray | bool = False,
+          eps: float = EPS,
+          ) -> np.ndarray:
+    intensity = 0.0 + materials.ambient_color[material_ids]
+
+    lit = needs_lights(material_ids, materials, inside, eps=eps)
+    if not lit.any() or not len(light_origins):
+        return intensity
+
+    norm = normals[lit]
+    view_dir = view_dirs[lit]
+    new_pos = shadow_origins(positions[lit], norm, eps=eps)
+    exponent = materials.specular_exponent[material_ids[lit]]
+
+    diffuse_total = np.zeros_like(new_pos)
+    specular_total = np.zeros_like(new_pos)
+    for light_idx in range(len(light_origins)):
+        weight = visible[lit, light_idx][:, None]
+        mask = weight != 0
+
+        light_dir = light_origins[light_idx] - new_pos
+        squared_distance = _dot(light_dir, light_dir)
+        light_dir /= np.sqrt(squared_distance)[:, None]
+
+        light_intensity = light_intensities[light_idx]
+        if light_attenuation is not None and light_attenuation[light_idx] != 0:
+            light_intensity = light_intensity / (1 + light_attenuation[light_idx] * squared_distance)[:, None]
+        if visible.dtype != bool:
+            light_intensity = weight * light_intensity
+
+        # diffuse shading
+        diffuse = np.maximum(0, _dot(norm, light_dir))[:, None] * light_intensity
+        diffuse_total += np.where(mask, diffuse, 0)
+
+        # specular shading
+        reflected = -light_dir + norm * (2 * -_dot(norm, -light_dir))[:, None]
+        specular_dot = _dot(view_dir, reflected)
+        specular = (np.maximum(0, specular_dot) ** exponent)[:, None] * light_intensity
+        specular_total += np.where(mask, specular, 0)
+
+    material_ids = material_ids[lit]
+    albedo = materials.albedo[material_ids, 0][:, None]
+    intensity[lit] += albedo * (materials.diffuse_color[material_ids] * diffuse_total)
+    intensity[lit] += albedo * (materials.specular_color[material_ids] * specular_total)
+    return intensity
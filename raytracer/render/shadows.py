@@ -0,0 +1,113 @@
+import attr
+import numpy as np
+from typing import TYPE_CHECKING, Sequence
+
+from ..geometry import BaseObject, Ray, Vector
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+FACES = tuple((axis, sign) for axis in range(3) for sign in (1, -1))
+
+NO_OCCLUDER = -1
+MIXED = -2
+
+
+def _face_direction(axis: int, sign: int, u: float, v: float) -> Vector:
+    coords = [u, v]
+    coords.insert(axis, sign)
+    return Vector(*coords)
+
+
+def _merge_ids(lhs: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    return np.where(lhs == rhs, lhs, MIXED)
+
+
+def _dilate(texels: np.ndarray) -> np.ndarray:
+    # occluder silhouettes may fall between samples, so widen every texel to its neighbours
+    padded = np.pad(texels, ((0, 0), (1, 1), (1, 1)), mode="edge")
+    size = texels.shape[-1]
+    result = texels.copy()
+    for dy in range(3):
+        for dx in range(3):
+            result = _merge_ids(result, padded[:, dy:dy + size, dx:dx + size])
+    return result
+
+
+@attr.s(slots=True)
+class ShadowMap:
+    origin: Vector = attr.ib()
+    occluders: np.ndarray = attr.ib()
+    tolerance: float = attr.ib(default=1e-12)
+
+    @property
+    def resolution(self) -> int:
+        return self.occluders.shape[-1]
+
+    @classmethod
+    def build(cls, scene: "Scene", origin: Vector, resolution: int = 64, **kwargs) -> "ShadowMap":
+        object_ids = {id(obj): idx for idx, obj in enumerate(scene.objects)}
+        ticks = np.linspace(-1, 1, 2 * resolution + 1).tolist()
+        samples = np.full((len(FACES), len(ticks), len(ticks)), MIXED, dtype=np.int32)
+        for face, (axis, sign) in enumerate(FACES):
+            for row, v in enumerate(ticks):
+                for col, u in enumerate(ticks):
+                    if row % 2 != col % 2:
+                        continue
+                    ray = Ray(origin=origin, direction=_face_direction(axis, sign, u, v))
+                    _, obj = scene.find_closest_intersection(ray)
+                    samples[face, row, col] = NO_OCCLUDER if obj is None else object_ids[id(obj)]
+
+        # each texel is covered by its four corners and its center
+        occluders = samples[:, 1::2, 1::2]
+        for corner in (samples[:, 0:-1:2, 0:-1:2], samples[:, 0:-1:2, 2::2],
+                       samples[:, 2::2, 0:-1:2], samples[:, 2::2, 2::2]):
+            occluders = _merge_ids(occluders, corner)
+        return cls(Vector(*origin.to_tuple()), _dilate(occluders), **kwargs)
+
+    def lookup(self, point: Vector, objects: Sequence[BaseObject]) -> bool | None:
+        offset = point - self.origin
+        coords = offset.to_tuple()
+        axis = max(range(3), key=lambda idx: abs(coords[idx]))
+        major = abs(coords[axis])
+        if major == 0:
+            return None
+
+        u, v = (coords[idx] / major for idx in range(3) if idx != axis)
+        face = 2 * axis + (coords[axis] < 0)
+        resolution = self.resolution
+        col = min(int((u + 1) / 2 * resolution), resolution - 1)
+        row = min(int((v + 1) / 2 * resolution), resolution - 1)
+
+        occluder = self.occluders[face, row, col]
+        if occluder == NO_OCCLUDER:
+            return True
+        if occluder == MIXED:
+            return None
+
+        # the whole texel sees a single object first, so only it can shadow the point
+        distance = offset.length
+        intersection = objects[occluder].intersect(Ray(origin=self.origin, direction=offset))
+        if intersection is None:
+            return None
+        if abs(intersection.distance - distance) <= self.tolerance * distance:
+            return None
+        return intersection.distance > distance
+
+
+@attr.s(slots=True)
+class ShadowCache:
+    maps: list[ShadowMap] = attr.ib(factory=list)
+
+    @classmethod
+    def build(cls, scene: "Scene", resolution: int = 64, **kwargs) -> "ShadowCache":
+        return cls([ShadowMap.build(scene, light.origin, resolution, **kwargs) for light in scene.lights])
+
+    def lookup(self, light_idx: int, point: Vector, objects: Sequence[BaseObject]) -> bool | None:
+        return self.maps[light_idx].lookup(point, objects)
+
+    def digest(self) -> bytes:
+        # the maps only approximate visibility, so cached pixels depend on how they were built
+        settings = [(shadow_map.resolution, shadow_map.tolerance) for shadow_map in self.maps]
+        return np.array(settings, dtype=float).tobytes()
@@ -0,0 +1,32 @@
+import attr
+
+
+@attr.s(slots=True)
+class RenderStats:
+    primary_rays: int = attr.ib(default=0)
+    secondary_rays: int = attr.ib(default=0)
+    shadow_rays: int = attr.ib(default=0)
+    shadow_cache_hits: int = attr.ib(default=0)
+    tiles: int = attr.ib(default=0)
+    cached_tiles: int = attr.ib(default=0)
+    # secondary rays hitting the same object in the same octant as the ray traced before them
+    coherent_rays: int = attr.ib(default=0)
+
+    @property
+    def rays(self) -> int:
+        return self.primary_rays + self.secondary_rays + self.shadow_rays
+
+    @property
+    def coherence(self) -> float:
+        return self.coherent_rays / self.secondary_rays if self.secondary_rays else 0.0
+
+    def merge(self, other: "RenderStats") -> "RenderStats":
+        for field in attr.fields(type(self)):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+        return self
+
+    def as_dict(self) -> dict[str, int | float]:
+        result = attr.asdict(self)
+        result["rays"] = self.rays
+        result["coherence"] = round(self.coherence, 3)
+        return result
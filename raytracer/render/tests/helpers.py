@@ -0,0 +1,26 @@
+from ...geometry import Material, Sphere, Triangle, Vector
+from .. import CameraOptions, PointLight, Scene
+
+CAM_OPTIONS = CameraOptions(screen_width=24, screen_height=16)
+
+
+# a reflective floor with a diffuse and a glass sphere, shared by the render tests
+def make_scene() -> Scene:
+    scene = Scene()
+    scene.add_object(Triangle(
+        [Vector(-4, -1, 2), Vector(4, -1, 2), Vector(0, -1, -8)],
+        material=Material(diffuse_color=Vector(0.8), albedo=Vector(0.7, 0.3, 0)),
+    ))
+    scene.add_object(Sphere(
+        center=Vector(-0.8, 0, -3),
+        radius=0.5,
+        material=Material(diffuse_color=Vector(1, 0.2, 0.2), specular_color=Vector(0.5), specular_exponent=20),
+    ))
+    scene.add_object(Sphere(
+        center=Vector(0.8, 0, -3),
+        radius=0.5,
+        material=Material(albedo=Vector(0, 0.1, 0.9), refraction_index=1.5),
+    ))
+    scene.add_light(PointLight(origin=Vector(2, 4, 0), intensity=Vector(1)))
+    scene.add_light(PointLight(origin=Vector(-3, 1, -3), intensity=Vector(0.5), attenuation=4))
+    return scene
@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+from PIL import Image
+
+from ...geometry import Material, Sphere, Triangle, Vector
+from .. import Animation, CameraKey, CameraOptions, ObjectKey, PointLight, Scene, render_animation
+
+
+def make_scene(offset: Vector = Vector(0)) -> Scene:
+    scene = Scene()
+    scene.add_object(Triangle(
+        [Vector(-4, -1, 2), Vector(4, -1, 2), Vector(0, -1, -8)],
+        material=Material(diffuse_color=Vector(0.8), albedo=Vector(0.7, 0.3, 0)),
+    ))
+    scene.add_object(Sphere(
+        center=Vector(0, 0, -3) + offset,
+        radius=0.8,
+        material=Material(diffuse_color=Vector(1, 0.2, 0.2), specular_color=Vector(0.5), specular_exponent=20),
+    ))
+    scene.add_light(PointLight(origin=Vector(2, 4, 0), intensity=Vector(1)))
+    return scene
+
+
+def make_animation() -> Animation:
+    return Animation(
+        camera=[
+            CameraKey(time=1, look_from=Vector(1, 1, 1), look_to=Vector(0, 0, -3), fov=math.pi / 3),
+            CameraKey(time=0, look_from=Vector(0, 0, 1), look_to=Vector(0, 0, -3)),
+        ],
+        objects={1: [ObjectKey(time=0, offset=Vector(0)), ObjectKey(time=1, offset=Vector(1, 0, 0))]},
+    )
+
+
+class TestAnimation:
+    def test_interpolation(self):
+        animation = make_animation()
+        assert animation.duration == 1
+        assert animation.frame_times(3) == [0, 0.5, 1]
+
+        cam_options = animation.camera_at(0.5, CameraOptions(screen_width=4, screen_height=4))
+        assert cam_options.look_from == Vector(0.5, 0.5, 1)
+        assert math.isclose(cam_options.fov, (math.pi / 2 + math.pi / 3) / 2)
+        assert animation.offsets_at(2) == {1: Vector(1, 0, 0)}
+        assert animation.offsets_at(-1) == {1: Vector(0)}
+
+    def test_frames_match_independent_renders(self, tmp_path):
+        animation = make_animation()
+        cam_options = CameraOptions(screen_width=24, screen_height=16)
+
+        frames = {}
+        for num_workers in (1, 2):
+            scene = make_scene()
+            objects = list(scene.objects)
+            pattern = str(tmp_path / f"w{num_workers}_{{index:03d}}.png")
+            rendered = list(render_animation(scene, animation, cam_options, pattern, frame_count=3,
+                                             num_workers=num_workers, depth=2))
+            assert [frame.path.name for frame in rendered] == [f"w{num_workers}_{idx:03d}.png" for idx in range(3)]
+            assert all(frame.stats.primary_rays == 24 * 16 for frame in rendered)
+            assert all(lhs is rhs for lhs, rhs in zip(scene.objects, objects))
+            frames[num_workers] = [np.asarray(Image.open(frame.path)) for frame in rendered]
+
+        for idx, frame_time in enumerate(animation.frame_times(3)):
+            expected = make_scene(animation.offsets_at(frame_time)[1]).render(
+                animation.camera_at(frame_time, cam_options), depth=2, verbose=False,
+            )
+            assert np.array_equal(frames[1][idx], np.asarray(expected))
+            assert np.array_equal(frames[2][idx], np.asarray(expected))
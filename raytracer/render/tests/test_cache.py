@@ -0,0 +1,76 @@
+import numpy as np
+
+from ...geometry import Material, Sphere, Vector
+from .. import CameraOptions, PointLight, RenderCache, Scene
+
+
+def make_scene() -> Scene:
+    scene = Scene()
+    scene.add_object(Sphere(
+        center=Vector(0, 0, -2),
+        radius=1,
+        material=Material(diffuse_color=Vector(1), albedo=Vector(1, 0.5, 0)),
+    ))
+    scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1)))
+    return scene
+
+
+class TestRenderCache:
+    def test_frame_hit(self, tmp_path):
+        cache = RenderCache(root=tmp_path)
+        scene = make_scene()
+        cam_options = CameraOptions(screen_width=16, screen_height=12)
+
+        image = scene.render(cam_options, depth=2, verbose=False, tile_size=8, cache=cache)
+        assert scene.stats.cached_tiles == 0
+
+        copy = make_scene()
+        hit = copy.render(cam_options, depth=2, verbose=False, tile_size=5, cache=cache)
+        assert hit.tobytes() == image.tobytes()
+        assert copy.stats.rays == 0 and copy.stats.cached_tiles == 12
+
+        scene.replace_objects({0: scene.objects[0].translated(Vector(0.1, 0, 0))})
+        scene.render(cam_options, depth=2, verbose=False, tile_size=8, cache=cache)
+        assert scene.stats.cached_tiles == 0
+
+    def test_shadow_cache_is_part_of_the_key(self, tmp_path):
+        cache = RenderCache(root=tmp_path)
+        scene = make_scene()
+        cam_options = CameraOptions(screen_width=16, screen_height=12)
+        scene.render(cam_options, depth=2, verbose=False, cache=cache)
+
+        scene.build_shadow_cache(resolution=8)
+        scene.render(cam_options, depth=2, verbose=False, cache=cache)
+        assert scene.stats.cached_tiles == 0
+        scene.render(cam_options, depth=2, verbose=False, cache=cache)
+        assert scene.stats.rays == 0
+
+        scene.build_shadow_cache(resolution=16)
+        scene.render(cam_options, depth=2, verbose=False, cache=cache)
+        assert scene.stats.cached_tiles == 0
+
+    def test_region_tiles_are_reused(self, tmp_path):
+        cache = RenderCache(root=tmp_path)
+        scene = make_scene()
+        cam_options = CameraOptions(screen_width=16, screen_height=12)
+        expected = scene.render(cam_options, depth=2, verbose=False, tile_size=4)
+
+        crop = scene.render(cam_options, depth=2, verbose=False, tile_size=4, cache=cache, region=(2, 2, 7, 5))
+        assert crop.size == (5, 3)
+        assert scene.stats.tiles == 4
+
+        image = scene.render(cam_options, depth=2, verbose=False, tile_size=4, cache=cache)
+        assert scene.stats.cached_tiles == 4 and scene.stats.tiles == 12 - 4
+        assert image.tobytes() == expected.tobytes()
+
+    def test_lru_eviction(self, tmp_path):
+        tile = np.zeros((8, 8, 3))
+        cache = RenderCache(root=tmp_path, max_bytes=3 * tile.nbytes + 500)
+        for key in "abc":
+            cache.put(key, tile)
+        assert cache.get("a") is not None
+        cache.put("d", tile)
+
+        assert cache.get("b") is None
+        assert all(cache.get(key) is not None for key in "acd")
+        assert cache.size <= cache.max_bytes
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from ...geometry import Vector
+from .. import Denoiser, GBuffer, PointLight
+from ..scene import RenderSettings
+from .helpers import CAM_OPTIONS, make_scene
+
+
+def flat_buffer() -> GBuffer:
+    # a wall facing the camera, split between two objects down the middle
+    settings = RenderSettings(CAM_OPTIONS, 1e-8, 1)
+    buffer = GBuffer.empty(24, 16, settings=settings)
+    buffer.positions[:] = (0, 0, -5)
+    buffer.normals[:] = (0, 0, 1)
+    buffer.object_ids[:, :12] = 0
+    buffer.object_ids[:, 12:] = 1
+    return buffer
+
+
+class TestDenoiser:
+    def test_smooths_within_objects(self):
+        rng = np.random.default_rng(0)
+        buffer = flat_buffer()
+        clean = np.where(buffer.object_ids[..., None] == 0, 1.0, 4.0) * np.ones(3)
+        noisy = clean * rng.uniform(0.7, 1.3, clean.shape)
+
+        denoised = Denoiser().apply(noisy, buffer)
+        assert np.abs(denoised - clean).mean() < 0.5 * np.abs(noisy - clean).mean()
+        # nothing bleeds across the object edge
+        assert denoised[:, :12].max() <= noisy[:, :12].max()
+        assert denoised[:, 12:].min() >= noisy[:, 12:].min()
+
+    def test_keeps_background(self):
+        buffer = flat_buffer()
+        buffer.object_ids[:8] = -1
+        pixels = np.random.default_rng(1).uniform(0, 1, (16, 24, 3))
+        denoised = Denoiser().apply(pixels, buffer)
+        assert np.array_equal(denoised[:8], pixels[:8])
+        assert not np.array_equal(denoised[8:], pixels[8:])
+
+    def test_render(self):
+        scene = make_scene()
+        scene.lights.clear()
+        for angle in np.linspace(0, 2 * np.pi, 8, endpoint=False):
+            origin = Vector(4 * np.cos(angle), 3, 4 * np.sin(angle) - 3)
+            scene.add_light(PointLight(origin=origin, intensity=Vector(0.3)))
+        reference = np.asarray(scene.render(CAM_OPTIONS, depth=1, verbose=False), dtype=float)
+
+        scene.light_samples = 1
+        noisy = np.asarray(scene.render(CAM_OPTIONS, depth=1, verbose=False), dtype=float)
+        denoised = np.asarray(scene.render(CAM_OPTIONS, depth=1, verbose=False, denoiser=Denoiser()), dtype=float)
+        assert np.abs(denoised - reference).mean() < np.abs(noisy - reference).mean()
+        assert scene.gbuffer is None
+
+        with pytest.raises(ValueError):
+            scene.render(CAM_OPTIONS, verbose=False, record=True, denoiser=Denoiser())
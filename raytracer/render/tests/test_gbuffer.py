@@ -0,0 +1,56 @@
+import copy
+
+import numpy as np
+import pytest
+
+from ...geometry import Material, SphereCloud, Vector
+from .. import Scene
+from .helpers import CAM_OPTIONS, make_scene
+
+
+def full_render(scene: Scene) -> np.ndarray:
+    scene = copy.deepcopy(scene)
+    scene.gbuffer = None
+    return np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False))
+
+
+class TestGBuffer:
+    def test_buffers(self):
+        scene = make_scene()
+        scene.render(CAM_OPTIONS, depth=3, verbose=False, gbuffer=True, tile_size=5)
+        serial = scene.gbuffer
+        assert serial.positions.shape == (16, 24, 3)
+        assert set(np.unique(serial.object_ids).tolist()) == {-1, 0, 1, 2}
+        assert np.allclose(np.linalg.norm(serial.view_dirs[serial.hits], axis=-1), 1)
+
+        scene.render(CAM_OPTIONS, depth=3, verbose=False, gbuffer=True, parallel=True, num_workers=2)
+        assert np.array_equal(scene.gbuffer.object_ids, serial.object_ids)
+        assert np.array_equal(scene.gbuffer.positions, serial.positions)
+
+    def test_relight_matches_full_render(self):
+        scene = make_scene()
+        scene.render(CAM_OPTIONS, depth=3, verbose=False, gbuffer=True)
+
+        scene.lights[0].intensity = Vector(0.4, 0.6, 1)
+        scene.lights[1].origin = Vector(-2, 2, -2)
+        assert np.array_equal(np.asarray(scene.relight(verbose=False)), full_render(scene))
+        assert scene.stats.primary_rays == 0
+        assert scene.stats.shadow_rays > 0
+
+    def test_relight_sphere_cloud(self):
+        scene = make_scene()
+        rng = np.random.default_rng(2)
+        scene.add_object(SphereCloud(
+            centers=rng.uniform((-2, -1, -6), (2, 1, -4), (40, 3)),
+            radii=0.3,
+            material_ids=rng.integers(0, 2, 40),
+            materials=[Material(diffuse_color=Vector(0.2, 0.8, 0.2)), Material(albedo=Vector(0.1, 0.9, 0))],
+        ))
+        rendered = np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False, gbuffer=True))
+        assert np.array_equal(np.asarray(scene.relight(verbose=False)), rendered)
+
+    def test_requires_gbuffer(self):
+        with pytest.raises(ValueError):
+            make_scene().relight()
+        with pytest.raises(ValueError):
+            make_scene().render(CAM_OPTIONS, verbose=False, record=True, gbuffer=True)
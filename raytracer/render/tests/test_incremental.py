@@ -0,0 +1,55 @@
+import copy
+
+import numpy as np
+import pytest
+
+from ...geometry import Material, Ray, Sphere, Vector
+from .. import Scene
+from ..incremental import DependencyRecorder
+from .helpers import CAM_OPTIONS, make_scene
+
+
+def full_render(scene: Scene) -> np.ndarray:
+    scene = copy.deepcopy(scene)
+    return np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False, engine="python"))
+
+
+class TestPixelDependencies:
+    def test_segments_crossing_bounds(self):
+        recorder = DependencyRecorder.for_objects([])
+        segments = [(Vector(0, 0, 0), 10), (Vector(0, 0, 0), 1), (Vector(0, 3, 0), 10)]
+        for pixel, (origin, length) in enumerate(segments):
+            recorder.pixel = pixel
+            recorder.segment(Ray(origin=origin, direction=Vector(1, 0, 0)), length)
+        deps = recorder.finish()
+        assert deps.pixels_crossing(Vector(4, -1, -1), Vector(5, 1, 1)).tolist() == [0]
+        assert deps.without(np.array([0])).pixels_crossing(Vector(4, -1, -1), Vector(5, 1, 1)).tolist() == []
+
+
+class TestRerender:
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_edits_match_full_render(self, parallel):
+        scene = make_scene()
+        recorded = np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False, record=True,
+                                           parallel=parallel, num_workers=2))
+        assert np.array_equal(recorded, full_render(scene))
+
+        scene.rerender(verbose=False)
+        assert scene.stats.primary_rays == 0
+
+        edits = [
+            lambda: setattr(scene.objects[1], "material", Material(diffuse_color=Vector(0.1, 0.9, 0.1))),
+            lambda: setattr(scene.objects[2].material, "refraction_index", 1.2),
+            lambda: scene.replace_objects({1: scene.objects[1].translated(Vector(0, 0.3, 0))}),
+            lambda: setattr(scene.lights[1], "origin", Vector(-2, 1, -2)),
+            lambda: scene.add_object(Sphere(center=Vector(0, 1, -4), radius=0.3, material=Material())),
+        ]
+        for edit in edits:
+            edit()
+            image = np.asarray(scene.rerender(verbose=False))
+            assert 0 < scene.stats.primary_rays < CAM_OPTIONS.screen_width * CAM_OPTIONS.screen_height
+            assert np.array_equal(image, full_render(scene))
+
+    def test_requires_record(self):
+        with pytest.raises(ValueError):
+            make_scene().rerender()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from ...geometry import Box, Material, Mesh, Plane, Vector
+from .. import kernels
+from ..scene import RenderSettings, make_tiles
+from .helpers import CAM_OPTIONS, make_scene
+
+
+def kernel_render(scene, depth: int) -> np.ndarray:
+    # the kernels run as plain python when numba is missing, so they are checked either way
+    settings = RenderSettings(CAM_OPTIONS, 1e-8, depth, "numba")
+    pixels = np.empty((settings.height, settings.width, 3))
+    stats = []
+    for tile in make_tiles(settings.width, settings.height, 8):
+        result = kernels.trace_tile(scene, settings, tile)
+        x0, y0, x1, y1 = tile
+        pixels[y0:y1, x0:x1] = result.pixels
+        stats.append(result.stats)
+    return np.asarray(scene.to_image(pixels, Vector(0, 0, 0))), stats
+
+
+class TestKernels:
+    def test_match_python_engine(self):
+        scene = make_scene()
+        floor = Material(diffuse_color=Vector(0.5))
+        scene.add_object(Plane(point=Vector(0, -2, 0), normal=Vector(0, 1, 0), material=floor))
+        corners = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+        vertices = [Vector(x, y, z - 5) for x, y, z in corners]
+        faces = [(0, 2, 4), (2, 1, 4), (1, 3, 4), (3, 0, 4), (2, 0, 5), (1, 2, 5), (3, 1, 5), (0, 3, 5)]
+        mesh = Mesh(vertices=vertices, faces=faces, closed=True, material=scene.objects[2].material)
+        scene.add_object(mesh.smoothed())
+
+        for depth in (1, 4):
+            expected = np.asarray(scene.render(CAM_OPTIONS, depth=depth, verbose=False, engine="python"))
+            pixels, stats = kernel_render(scene, depth)
+            assert np.array_equal(pixels, expected)
+            assert sum(tile.secondary_rays for tile in stats) == scene.stats.secondary_rays
+            assert sum(tile.shadow_rays for tile in stats) == scene.stats.shadow_rays
+
+    def test_unsupported_scene_falls_back(self):
+        scene = make_scene()
+        assert scene.kernel_scene is not None
+        scene.add_object(Box(lower=Vector(-1, -1, -6), upper=Vector(1, 1, -5), material=Material()))
+        assert scene.kernel_scene is None
+
+        settings = RenderSettings(CAM_OPTIONS, 1e-8, 3, "numba")
+        assert not kernels.supports(scene, settings)
+        expected = np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False, engine="python"))
+        rendered = np.asarray(scene.render(CAM_OPTIONS, depth=3, verbose=False, engine="numba"))
+        assert np.array_equal(rendered, expected)
+
+    def test_flat_scene_rebuilt_once_per_change(self):
+        scene = make_scene()
+        flat = scene.kernel_scene
+        scene.sync_kernel_scene()
+        assert scene.kernel_scene is flat
+
+        scene.lights[0].intensity = Vector(0.5)
+        assert scene.kernel_scene is flat
+        scene.sync_kernel_scene()
+        assert scene.kernel_scene is not flat
+        assert scene.kernel_scene.lights[0, 3] == 0.5
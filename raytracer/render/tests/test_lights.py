@@ -0,0 +1,88 @@
+import math
+import numpy as np
+
+from ...geometry import Material, Ray, Triangle, Vector
+from .. import LightGrid, PointLight, Scene
+from ..scene import hit_arrays
+
+
+def make_lights() -> list[PointLight]:
+    return [
+        PointLight(origin=Vector(0, 1, 0), intensity=Vector(1), attenuation=1),
+        PointLight(origin=Vector(10, 1, 0), intensity=Vector(1), attenuation=1),
+        PointLight(origin=Vector(5, 50, 0), intensity=Vector(0.5)),
+        PointLight(origin=Vector(-3, 1, 0), intensity=Vector(0.001), attenuation=1),
+    ]
+
+
+class TestLightGrid:
+    def test_influence_radius(self):
+        light = PointLight(origin=Vector(), intensity=Vector(1), attenuation=1)
+        assert np.allclose(light.influence_radius(0.01), math.sqrt(99))
+        assert light.influence_radius(0) == math.inf
+        assert light.influence_radius(2) == 0
+        assert PointLight(origin=Vector(), intensity=Vector(1)).influence_radius(0.01) == math.inf
+
+    def test_query(self):
+        grid = LightGrid.build(make_lights(), threshold=0.01)
+        assert grid.query((0, 0, 0)).tolist() == [0, 2]
+        assert grid.query((10, 0, 1)).tolist() == [1, 2]
+        assert grid.query((100, 0, 0)).tolist() == [2]
+
+    def test_sample(self):
+        grid = LightGrid.build(make_lights(), threshold=0)
+        rng = np.random.default_rng(0)
+        point = (0, 0, 0)
+
+        indices, weights = grid.sample(point, 8, rng)
+        assert set(indices.tolist()) <= {0, 1, 2, 3}
+
+        estimate = grid.estimate(point, np.arange(4))
+        probability = estimate / estimate.sum()
+        picks = np.zeros(4)
+        for _ in range(2000):
+            indices, weights = grid.sample(point, 1, rng)
+            assert np.allclose(weights, 1 / probability[indices])
+            picks[indices] += 1
+        assert np.allclose(picks / 2000, probability, atol=0.05)
+
+
+class TestLightCulling:
+    def make_scene(self, **kwargs) -> Scene:
+        scene = Scene(**kwargs)
+        scene.add_object(Triangle([
+                Vector(-20, 0, 20),
+                Vector(20, 0, 20),
+                Vector(0, 0, -20),
+            ],
+            material=Material(diffuse_color=Vector(1), specular_color=Vector(0.5), specular_exponent=10),
+        ))
+        for light in make_lights():
+            scene.add_light(light)
+        return scene
+
+    def shade(self, scene: Scene, x: float) -> Vector:
+        ray = Ray(origin=Vector(x, 1, 1), direction=Vector(0, -1, -1))
+        intersection, obj = scene.find_closest_intersection(ray)
+        return scene.get_intensity(ray, intersection, obj)
+
+    def test_threshold_matches_full_shading(self):
+        full = self.make_scene()
+        culled = self.make_scene(light_threshold=1e-4)
+        for x in (0, 3, 8):
+            assert np.allclose(self.shade(full, x).to_array(), self.shade(culled, x).to_array(), atol=1e-3)
+
+    def test_sampled_shading_is_unbiased(self):
+        full = self.make_scene()
+        sampled = self.make_scene(light_samples=1)
+        sampled.reseed(0)
+        estimate = np.mean([self.shade(sampled, 0).to_array() for _ in range(2000)], axis=0)
+        assert np.allclose(estimate, self.shade(full, 0).to_array(), rtol=0.1)
+
+    def test_engines_match_with_attenuation(self):
+        scene = self.make_scene()
+        for x in (0, 3, 8):
+            ray = Ray(origin=Vector(x, 1, 1), direction=Vector(0, -1, -1))
+            intersection, obj = scene.find_closest_intersection(ray)
+            expected = scene.shade_points(*hit_arrays([ray], [intersection], [obj]))[0]
+            assert np.allclose(scene.get_intensity(ray, intersection, obj).to_array(), expected)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from ...geometry import Material, Sphere, Vector
+from .. import CameraOptions, PointLight, Scene
+
+
+class TestMaterialTable:
+    def test_deduplication(self):
+        scene = Scene()
+        for _ in range(3):
+            scene.add_object(Sphere(
+                center=Vector(0, 0, -1),
+                radius=0.5,
+                material=Material(specular_color=Vector(0.95), albedo=Vector(10, 0.5, 0)),
+            ))
+        scene.add_object(Sphere(center=Vector(0, 0, -1), radius=0.5, material=Material()))
+        scene.add_object(Sphere(center=Vector(0, 0, -1), radius=0.5))
+
+        assert len(scene.materials) == 2
+        assert [obj.material_id for obj in scene.objects] == [0, 0, 0, 1, -1]
+        assert scene.objects[0].material is not scene.objects[2].material
+        assert np.allclose(scene.materials.albedo, [[10, 0.5, 0], [1, 0, 0]])
+        assert np.allclose(scene.materials.specular_color[0], 0.95)
+
+    def test_edit_in_place(self):
+        scene = Scene()
+        for x in (-0.6, 0.6):
+            material = Material(diffuse_color=Vector(0.5))
+            scene.add_object(Sphere(center=Vector(x, 0, -2), radius=0.5, material=material))
+        scene.add_light(PointLight(origin=Vector(0, 2, 0), intensity=Vector(1)))
+        cam_options = CameraOptions(screen_width=16, screen_height=8)
+        scene.render(cam_options, verbose=False)
+
+        scene.objects[0].material.diffuse_color = Vector(1, 0, 0)
+        assert scene.objects[1].material.diffuse_color == Vector(0.5)
+        numpy = np.asarray(scene.render(cam_options, verbose=False))
+        python = np.asarray(scene.render(cam_options, verbose=False, engine="python"))
+        assert np.array_equal(numpy, python)
+        assert scene.materials[scene.objects[0].material_id].diffuse_color == Vector(1, 0, 0)
+        assert scene.materials[scene.objects[1].material_id].diffuse_color == Vector(0.5)
+
+    def test_edits_release_rows(self):
+        scene = Scene()
+        for x in (-0.6, 0.6):
+            material = Material(diffuse_color=Vector(0.5 + x / 2))
+            scene.add_object(Sphere(center=Vector(x, 0, -2), radius=0.5, material=material))
+        scene.add_light(PointLight(origin=Vector(0, 2, 0), intensity=Vector(1)))
+        cam_options = CameraOptions(screen_width=16, screen_height=8)
+        scene.render(cam_options, verbose=False, gbuffer=True)
+        buffer = scene.gbuffer
+        shaded = scene.materials.data[buffer.material_ids[buffer.hits]]
+
+        for step in range(10):
+            scene.objects[0].material.diffuse_color = Vector(step / 10)
+            scene.render(cam_options, verbose=False)
+        # the two current materials and the one the gbuffer was shaded with
+        assert len(scene.materials) == 3
+        assert scene.materials[scene.objects[0].material_id].diffuse_color == Vector(0.9)
+        assert np.array_equal(scene.materials.data[buffer.material_ids[buffer.hits]], shaded)
+
+        scene.render(cam_options, verbose=False, gbuffer=True)
+        scene.sync_materials()
+        assert len(scene.materials) == 2
@@ -0,0 +1,39 @@
+from ...geometry import Material, Sphere, Vector
+from .. import CameraOptions, PointLight, SamplingProfiler, Scene
+
+
+def _scene() -> Scene:
+    scene = Scene()
+    scene.add_object(Sphere(
+        center=Vector(0, 0, -2),
+        radius=1,
+        material=Material(diffuse_color=Vector(1), albedo=Vector(1, 0.5, 0)),
+    ))
+    scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1)))
+    return scene
+
+
+class TestSamplingProfiler:
+    def test_collapsed_stacks(self, tmp_path):
+        profiler = SamplingProfiler(0.001)
+        with profiler:
+            while sum(profiler.samples.values()) < 5:
+                sum(range(1000))
+
+        path = tmp_path / "profile.txt"
+        profiler.write_collapsed(path)
+        for line in path.read_text().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+            assert "test_collapsed_stacks (test_profiling.py:" in stack
+        assert "test_collapsed_stacks" in profiler.summary()
+
+    def test_render_aggregates_workers(self):
+        cam_options = CameraOptions(screen_width=32, screen_height=24)
+        for parallel in (False, True):
+            profiler = SamplingProfiler(0.001)
+            _scene().render(
+                cam_options, depth=2, verbose=False, parallel=parallel, num_workers=2, profiler=profiler,
+            )
+            assert profiler.samples
+            assert all("_trace_tile" in stack for stack in profiler.samples)
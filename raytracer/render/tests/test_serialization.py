@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+from ...geometry import (
+    Box, Instance, Material, Matrix, Mesh, Plane, Rectangle, Sphere, SphereCloud, Triangle, Vector,
+)
+from .. import PointLight, Scene, SceneData, SceneFormatError
+from ..serialization import ALIGNMENT
+from .helpers import CAM_OPTIONS
+
+
+def make_scene() -> Scene:
+    shared = Material(diffuse_color=Vector(0.1, 0.2, 0.3), specular_exponent=10)
+    glass = Material(albedo=Vector(0, 0.3, 0.7), refraction_index=1.8)
+
+    scene = Scene()
+    scene.add_object(Triangle([Vector(0, 0, 0), Vector(1, 0, 0), Vector(0, 1, 0)], material=shared))
+    scene.add_object(Sphere(center=Vector(1, 2, 3), radius=0.5, material=glass))
+    scene.add_object(Triangle([Vector(0, 0, 1), Vector(1, 0, 1), Vector(0, 1, 1)], material=shared))
+    scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1, 0.5, 0.25)))
+    return scene
+
+
+def section_offsets(data: bytes) -> dict[str, tuple[int, np.ndarray]]:
+    base = np.frombuffer(data, dtype=np.uint8).ctypes.data
+    return {name: (array.ctypes.data - base, array) for name, array in SceneData.from_buffer(data).arrays.items()}
+
+
+class TestSerialization:
+    def test_roundtrip(self, tmp_path):
+        scene = make_scene()
+        path = tmp_path / "scene.rtscene"
+        scene.save(path)
+
+        for use_mmap in (True, False):
+            loaded = Scene.load(path, use_mmap=use_mmap)
+            assert [type(obj) for obj in loaded.objects] == [Triangle, Sphere, Triangle]
+            assert loaded.objects[0][1] == Vector(1, 0, 0)
+            assert loaded.objects[1].center == Vector(1, 2, 3)
+            assert loaded.objects[1].radius == 0.5
+            assert loaded.objects[1].material.refraction_index == 1.8
+            assert loaded.objects[0].material is loaded.objects[2].material
+            assert loaded.lights[0].intensity == Vector(1, 0.5, 0.25)
+
+    def test_sections_are_aligned(self):
+        buffer = make_scene().to_bytes()
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        for offset, array in section_offsets(buffer).values():
+            assert offset % ALIGNMENT == 0
+            # views straight into the buffer, nothing is copied
+            assert not array.size or np.shares_memory(array, raw)
+
+        data = SceneData.from_buffer(buffer)
+        assert data["materials"].shape == (2, 14)
+        assert data["triangles"].shape == (2, 9)
+        assert np.array_equal(data["objects"], [[1, 0], [0, 0], [1, 1]])
+
+    def test_instances_share_mesh(self):
+        mesh = Mesh(
+            vertices=[Vector(0, 0, 0), Vector(1, 0, 0), Vector(0, 1, 0), Vector(1, 1, 0)],
+            faces=[(0, 1, 2), (1, 3, 2)],
+        )
+        scene = Scene(accelerator="bvh")
+        for idx in range(3):
+            scene.add_object(Instance(
+                geometry=mesh,
+                transform=Matrix.translation(Vector(idx, 0, 0)),
+                material=Material(diffuse_color=Vector(idx / 3)),
+            ))
+
+        data = SceneData.from_buffer(scene.to_bytes())
+        assert data["meshes"].shape == (1, 6)
+        assert data["mesh_faces"].shape == (2, 3)
+
+        loaded = Scene.from_data(data)
+        assert loaded.accelerator == "bvh"
+        assert [obj.transform for obj in loaded.objects] == [obj.transform for obj in scene.objects]
+        assert len({id(obj.geometry) for obj in loaded.objects}) == 1
+        assert loaded.objects[2].material.diffuse_color == Vector(2 / 3)
+
+    def test_smooth_normals(self):
+        mesh = Mesh(
+            vertices=[Vector(0, 0, 0), Vector(1, 0, 0), Vector(0, 1, 0), Vector(1, 1, 0.5)],
+            faces=[(0, 1, 2), (1, 3, 2)],
+        )
+        scene = Scene()
+        scene.add_object(mesh)
+        scene.add_object(mesh.smoothed())
+        scene.add_object(Triangle([Vector(0), Vector(1, 0, 0), Vector(0, 1, 0)], [Vector(0, 0, 1)] * 3))
+
+        loaded = Scene.from_bytes(scene.to_bytes())
+        assert loaded.objects[0].normals is None
+        assert loaded.objects[1].normals == scene.objects[1].normals
+        assert loaded.objects[2].normals == (Vector(0, 0, 1),) * 3
+
+    def test_analytic_primitives(self):
+        scene = Scene()
+        scene.add_object(Plane(point=Vector(0, -1, 0), normal=Vector(0, 1, 0)))
+        scene.add_object(Rectangle(origin=Vector(0), edge_u=Vector(1, 0, 0), edge_v=Vector(0, 1, 0)))
+        scene.add_object(Box(lower=Vector(-1), upper=Vector(1), material=Material(refraction_index=1.5)))
+
+        loaded = Scene.from_bytes(scene.to_bytes())
+        assert [type(obj) for obj in loaded.objects] == [Plane, Rectangle, Box]
+        assert loaded.objects[0].normal == Vector(0, 1, 0)
+        assert loaded.objects[1].edge_v == Vector(0, 1, 0)
+        assert loaded.objects[2].upper == Vector(1)
+        assert loaded.objects[2].material.refraction_index == 1.5
+
+    def test_sphere_cloud(self, tmp_path):
+        rng = np.random.default_rng(2)
+        materials = [
+            Material(diffuse_color=Vector(1, 0, 0)),
+            Material(albedo=Vector(0.5, 0, 0.5), refraction_index=1.3),
+        ]
+        centers = np.column_stack([rng.uniform(-3, 3, 40), rng.uniform(-2, 2, 40), rng.uniform(-12, -6, 40)])
+        cloud = SphereCloud(
+            centers=centers,
+            radii=rng.uniform(0.2, 0.6, 40),
+            material_ids=rng.integers(0, 2, 40),
+            materials=materials,
+        )
+        spheres = make_scene()
+        spheres.objects.clear()
+        for center, radius, idx in zip(cloud.centers, cloud.radii, cloud.material_ids):
+            sphere = Sphere(center=Vector(*center.tolist()), radius=float(radius), material=materials[idx])
+            spheres.add_object(sphere)
+        scene = make_scene()
+        scene.objects.clear()
+        scene.add_object(cloud)
+        path = tmp_path / "cloud.rtscene"
+        scene.save(path)
+
+        loaded = Scene.load(path)
+        assert loaded.objects[0].centers.dtype == np.float32
+        assert loaded.objects[0].materials == materials
+        expected = np.asarray(spheres.render(CAM_OPTIONS, depth=3, verbose=False))
+        for engine in ("numpy", "python"):
+            rendered = np.asarray(loaded.render(CAM_OPTIONS, depth=3, verbose=False, engine=engine))
+            assert np.array_equal(rendered, expected)
+
+    def test_bad_magic(self):
+        with pytest.raises(SceneFormatError):
+            SceneData.from_buffer(b"\0" * 64)
+
+    def test_truncated(self):
+        data = make_scene().to_bytes()
+        end = max(offset + array.nbytes for offset, array in section_offsets(data).values())
+        # inside the header, inside the directory and inside the last section
+        for size in (0, 3, 20, end - 1):
+            with pytest.raises(SceneFormatError):
+                SceneData.from_buffer(data[:size])
+
+    def test_corrupt_directory(self):
+        data = bytearray(make_scene().to_bytes())
+        # the offset of the first section, the last field of its directory entry
+        offset = 16 + 56 - 8
+        data[offset:offset + 8] = (65).to_bytes(8, "little")
+        with pytest.raises(SceneFormatError, match="unaligned"):
+            SceneData.from_buffer(bytes(data))
+        data[offset:offset + 8] = (2 ** 40).to_bytes(8, "little")
+        with pytest.raises(SceneFormatError, match="past the end"):
+            SceneData.from_buffer(bytes(data))
+
+        data = bytearray(make_scene().to_bytes())
+        data[16 + 16:16 + 20] = b"O\0\0\0"
+        with pytest.raises(SceneFormatError):
+            SceneData.from_buffer(bytes(data))
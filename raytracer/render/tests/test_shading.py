@@ -0,0 +1,47 @@
+import numpy as np
+
+from ...geometry import Material, Ray, Sphere, Triangle, Vector
+from .. import PointLight, Scene
+
+
+class TestShading:
+    def test_matches_scalar_shading(self):
+        scene = Scene()
+        scene.add_object(Sphere(
+            center=Vector(0, 0, -2),
+            radius=0.5,
+            material=Material(
+                ambient_color=Vector(0.05, 0, 0),
+                diffuse_color=Vector(0.4, 0.2, 0.1),
+                specular_color=Vector(0.5),
+                specular_exponent=20,
+            ),
+        ))
+        scene.add_object(Triangle([
+                Vector(-5, -1, 5),
+                Vector(5, -1, 5),
+                Vector(0, -1, -10),
+            ],
+            material=Material(diffuse_color=Vector(0.3), albedo=Vector(0.8, 0.2, 0)),
+        ))
+        scene.add_light(PointLight(origin=Vector(2, 2, 0), intensity=Vector(1)))
+        scene.add_light(PointLight(origin=Vector(-1, 3, -2), intensity=Vector(0.2, 0.4, 0.6)))
+
+        rays, intersections, objects = [], [], []
+        for x in np.linspace(-0.6, 0.6, 7):
+            for y in np.linspace(-0.6, 0.2, 5):
+                ray = Ray(origin=Vector(0, 0, 0), direction=Vector(x, y, -1))
+                intersection, obj = scene.find_closest_intersection(ray)
+                if intersection is not None:
+                    rays.append(ray)
+                    intersections.append(intersection)
+                    objects.append(obj)
+        assert len(set(map(id, objects))) == 2
+
+        batched = scene.shade_hits(rays, intersections, objects)
+        for idx, (ray, intersection, obj) in enumerate(zip(rays, intersections, objects)):
+            scalar = scene.get_intensity(ray, intersection, obj)
+            assert np.allclose(batched[idx], scalar.to_array(), rtol=1e-12, atol=0)
+
+        inside = scene.shade_hits(rays, intersections, objects, inside=True)
+        assert np.allclose(inside, scene.materials.ambient_color[[obj.material_id for obj in objects]])
@@ -0,0 +1,62 @@
+import numpy as np
+
+from ...geometry import Material, Ray, Sphere, Triangle, Vector
+from .. import CameraOptions, PointLight, Scene
+
+
+def make_scene() -> Scene:
+    scene = Scene()
+    scene.add_object(Triangle([
+            Vector(-4, 0, 4),
+            Vector(4, 0, 4),
+            Vector(0, 0, -4),
+        ],
+        material=Material(diffuse_color=Vector(0.8)),
+    ))
+    scene.add_object(Sphere(center=Vector(0, 0.6, 0), radius=0.5, material=Material(diffuse_color=Vector(0.5))))
+    scene.add_object(Sphere(center=Vector(1, 0.3, 1), radius=0.3, material=Material(diffuse_color=Vector(0.5))))
+    scene.add_light(PointLight(origin=Vector(0.5, 3, 0.5), intensity=Vector(1)))
+    scene.add_light(PointLight(origin=Vector(-2, 1, 2), intensity=Vector(0.5)))
+    return scene
+
+
+class TestShadowCache:
+    def test_lookup_agrees_with_shadow_rays(self):
+        scene = make_scene()
+        cache = scene.build_shadow_cache(resolution=32)
+        assert scene.shadow_cache is cache
+
+        rng = np.random.default_rng(0)
+        answered = 0
+        for _ in range(500):
+            x, z = rng.uniform(-2, 2, 2)
+            ray = Ray(origin=Vector(x, 5, z), direction=Vector(rng.uniform(-0.3, 0.3), -1, rng.uniform(-0.3, 0.3)))
+            intersection, _ = scene.find_closest_intersection(ray)
+            if intersection is None:
+                continue
+            point = intersection.position + 1e-8 * intersection.normal
+            for light_idx, light in enumerate(scene.lights):
+                cached = cache.lookup(light_idx, point, scene.objects)
+                if cached is not None:
+                    answered += 1
+                    assert cached == scene.is_point_illuminated(point, light.origin - point)
+        assert answered > 300
+
+    def test_render_matches(self):
+        scene = make_scene()
+        cam_options = CameraOptions(
+            screen_width=48,
+            screen_height=32,
+            look_from=Vector(0, 3, 4),
+            look_to=Vector(0, 0, 0),
+        )
+        reference = np.asarray(scene.render(cam_options, depth=1, verbose=False))
+        scene.build_shadow_cache(resolution=32)
+        cached = np.asarray(scene.render(cam_options, depth=1, verbose=False))
+        assert np.array_equal(reference, cached)
+
+    def test_invalidated_by_edits(self):
+        scene = make_scene()
+        scene.build_shadow_cache(resolution=4)
+        scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1)))
+        assert scene.shadow_cache is None
@@ -0,0 +1,34 @@
+from ...geometry import Material, Sphere, Vector
+from .. import CameraOptions, PointLight, RenderStats, Scene
+
+
+class TestRenderStats:
+    def test_merge(self):
+        stats = RenderStats(primary_rays=1, shadow_rays=2).merge(RenderStats(primary_rays=3, secondary_rays=4))
+        assert stats == RenderStats(primary_rays=4, secondary_rays=4, shadow_rays=2)
+        assert stats.rays == 10
+        assert stats.as_dict()["rays"] == 10
+
+    def test_render_counts_rays(self):
+        scene = Scene()
+        scene.add_object(Sphere(
+            center=Vector(0, 0, -2),
+            radius=1,
+            material=Material(diffuse_color=Vector(1), albedo=Vector(1, 0.5, 0)),
+        ))
+        scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1)))
+        cam_options = CameraOptions(screen_width=16, screen_height=12)
+
+        image = scene.render(cam_options, depth=2, verbose=False, tile_size=5)
+        serial = scene.stats
+        assert serial.primary_rays == 16 * 12
+        assert serial.tiles == 4 * 3
+        assert 0 < serial.secondary_rays < serial.primary_rays
+        assert 0 < serial.shadow_rays
+
+        scene.render(cam_options, depth=2, verbose=False, parallel=True, num_workers=2)
+        assert scene.stats.rays == serial.rays
+
+        threaded = scene.render(cam_options, depth=2, verbose=False, tile_size=5, backend="threads", num_workers=3)
+        assert scene.stats == serial
+        assert threaded.tobytes() == image.tobytes()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from ...geometry import Box, Ray, Vector
+from ...scenes import mirrors
+from ..context import TraceContext
+from ..wavefront import closest_hits, coherent_order, direction_octants
+from .helpers import CAM_OPTIONS, make_scene
+
+
+class TestWavefront:
+    def test_order_groups_octants(self):
+        rng = np.random.default_rng(0)
+        origins = rng.uniform(-1, 1, (200, 3))
+        directions = rng.normal(size=(200, 3))
+        order = coherent_order(origins, directions)
+
+        octants = direction_octants(directions)[order]
+        assert sorted(order.tolist()) == list(range(200))
+        assert np.all(np.diff(octants) >= 0)
+
+    def test_matches_recursive_tracer(self):
+        scene = make_scene()
+        recursive = np.asarray(scene.render(CAM_OPTIONS, depth=4, verbose=False, engine="python"), dtype=int)
+        expected = scene.stats
+
+        wavefront = np.asarray(scene.render(CAM_OPTIONS, depth=4, verbose=False, tile_size=8), dtype=int)
+        assert np.array_equal(wavefront, recursive)
+        assert scene.stats.secondary_rays == expected.secondary_rays
+        assert scene.stats.shadow_rays == expected.shadow_rays
+        assert 0 < scene.stats.coherence <= 1
+
+    def test_closest_hits_match_scalar_scan(self):
+        scene = mirrors().scene
+        # a type without a batched distance goes through its own intersect
+        scene.add_object(Box(lower=Vector(1, 1, -2), upper=Vector(2, 2, -1), material=scene.objects[0].material))
+        rng = np.random.default_rng(0)
+        rays = [
+            Ray(origin=Vector(*origin), direction=Vector(*direction))
+            for origin, direction in zip(rng.uniform(0, 3, (500, 3)).tolist(), rng.normal(size=(500, 3)).tolist())
+        ]
+
+        found = closest_hits(scene, rays, TraceContext())
+        assert sum(obj is not None for _, obj in found) > 50
+        for ray, (intersection, obj) in zip(rays, found):
+            expected, expected_obj = scene.find_closest_intersection(ray)
+            assert obj is expected_obj
+            assert intersection is None or intersection.distance == expected.distance
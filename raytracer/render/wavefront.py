@@ -0,0 +1,235 @@
+import numpy as np
+from typing import TYPE_CHECKING, Sequence
+
+from ..geometry import BaseObject, Intersection, Plane, Ray, Sphere, Triangle, reflect, refract
+from .context import TraceContext
+
+if TYPE_CHECKING:
+    from .scene import Scene
+
+
+MORTON_BITS = 10
+# without an accelerator every ray scans every object, a generation scans each object once for all its rays
+BATCH_OBJECTS = 64
+# the tolerance of Triangle and Plane
+EPS = 1e-8
+
+REFLECTED = 0
+REFRACTED = 1
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    # moves bit k of a 10 bit integer to bit 3k
+    values = values.astype(np.int64) & 0x3FF
+    values = (values | (values << 16)) & 0x030000FF
+    values = (values | (values << 8)) & 0x0300F00F
+    values = (values | (values << 4)) & 0x030C30C3
+    values = (values | (values << 2)) & 0x09249249
+    return values
+
+
+def direction_octants(directions: np.ndarray) -> np.ndarray:
+    negative = directions < 0
+    return negative[:, 0] | (negative[:, 1] << 1) | (negative[:, 2] << 2)
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    extent = np.where(upper > lower, upper - lower, 1)
+    cells = ((points - lower) / extent * ((1 << MORTON_BITS) - 1)).astype(np.int64)
+    return _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << 1) | (_spread_bits(cells[:, 2]) << 2)
+
+
+def coherent_order(origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    # rays leaving the same region in the same octant end up next to each other
+    keys = (direction_octants(directions).astype(np.int64) << (3 * MORTON_BITS)) | morton_codes(origins)
+    return np.argsort(keys, kind="stable")
+
+
+def _sphere_distances(spheres: Sequence[Sphere], origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    # the same arithmetic as Sphere.intersect and solve_quadratic for every ray and sphere, inf is a miss
+    centers = np.array([sphere.center.to_tuple() for sphere in spheres], dtype=float)
+    radii = np.array([sphere.radius ** 2 for sphere in spheres], dtype=float)
+    dx, dy, dz = directions[:, 0, None], directions[:, 1, None], directions[:, 2, None]
+    px, py, pz = (origins[:, axis, None] - centers[:, axis] for axis in range(3))
+    a = dx * dx + dy * dy + dz * dz
+    b = 2 * (px * dx + py * dy + pz * dz)
+    c = px * px + py * py + pz * pz - radii
+    disc = b * b - 4 * a * c
+    root = np.sqrt(np.maximum(disc, 0))
+    near = (-b - root) / (2.0 * a)
+    dist = np.where(near > 0, near, (-b + root) / (2.0 * a))
+    return np.where((disc >= 0) & (dist >= 0), dist, np.inf)
+
+
+def _triangle_distances(triangles: Sequence[Triangle], origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    # the same arithmetic as Triangle.moller_trumbore
+    corners = np.array([[triangle[idx].to_tuple() for idx in range(3)] for triangle in triangles], dtype=float)
+    e1x, e1y, e1z = (corners[:, 1] - corners[:, 0]).T
+    e2x, e2y, e2z = (corners[:, 2] - corners[:, 0]).T
+    dx, dy, dz = directions[:, 0, None], directions[:, 1, None], directions[:, 2, None]
+    hx, hy, hz = dy * e2z - dz * e2y, dz * e2x - dx * e2z, dx * e2y - dy * e2x
+    det = e1x * hx + e1y * hy + e1z * hz
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_det = 1 / det
+        sx, sy, sz = (origins[:, axis, None] - corners[:, 0, axis] for axis in range(3))
+        first = inv_det * (sx * hx + sy * hy + sz * hz)
+        qx, qy, qz = sy * e1z - sz * e1y, sz * e1x - sx * e1z, sx * e1y - sy * e1x
+        second = inv_det * (dx * qx + dy * qy + dz * qz)
+        dist = inv_det * (e2x * qx + e2y * qy + e2z * qz)
+    hit = (np.abs(det) >= EPS) & (0 <= first) & (first <= 1) & (0 <= second) & (second <= 1 - first) & (dist >= 0)
+    return np.where(hit, dist, np.inf)
+
+
+def _plane_distances(planes: Sequence[Plane], origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    # the same arithmetic as Plane._distance
+    points = np.array([plane.point.to_tuple() for plane in planes], dtype=float)
+    nx, ny, nz = np.array([plane.normal.to_tuple() for plane in planes], dtype=float).T
+    denom = nx * directions[:, 0, None] + ny * directions[:, 1, None] + nz * directions[:, 2, None]
+    offsets = [points[:, axis] - origins[:, axis, None] for axis in range(3)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dist = (nx * offsets[0] + ny * offsets[1] + nz * offsets[2]) / denom
+    return np.where((np.abs(denom) >= EPS) & (dist >= 0), dist, np.inf)
+
+
+BATCHED = {
+    Sphere: _sphere_distances,
+    Triangle: _triangle_distances,
+    Plane: _plane_distances,
+}
+
+
+def closest_hits(scene: "Scene",
+                 rays: Sequence[Ray],
+                 ctx: TraceContext,
+                 ) -> list[tuple[Intersection | None, BaseObject | None]]:
+    # Scene.find_closest_intersection for a batch of rays, only the winning object builds an Intersection
+    objects = scene.objects
+    if scene.accel is not None or ctx.recorder is not None or len(objects) > BATCH_OBJECTS:
+        return [scene.find_closest_intersection(ray, ctx) for ray in rays]
+
+    origins = np.array([ray.origin.to_tuple() for ray in rays], dtype=float).reshape(-1, 3)
+    directions = np.array([ray.direction.to_tuple() for ray in rays], dtype=float).reshape(-1, 3)
+    distances = np.full((len(rays), len(objects)), np.inf)
+    found = {}
+    for kind, batch in BATCHED.items():
+        columns = [col for col, obj in enumerate(objects) if type(obj) is kind]
+        if columns:
+            distances[:, columns] = batch([objects[col] for col in columns], origins, directions)
+    for col, obj in enumerate(objects):
+        if type(obj) in BATCHED:
+            continue
+        for row, ray in enumerate(rays):
+            intersection = obj.intersect(ray)
+            if intersection is not None:
+                distances[row, col] = intersection.distance
+                found[row, col] = intersection
+
+    # argmin keeps the first of equally close objects, like the strict comparison of the scalar scan
+    results = []
+    for row, col in enumerate(distances.argmin(axis=1).tolist()):
+        if distances[row, col] == np.inf:
+            results.append((None, None))
+            continue
+        intersection = found.get((row, col)) or objects[col].intersect(rays[row])
+        results.append((intersection, objects[col]))
+    return results
+
+
+def _spawn(scene: "Scene",
+           hits: list[tuple[Ray, Intersection, BaseObject, bool]],
+           eps: float,
+           ) -> list[tuple[int, int, float, Ray, bool]]:
+    # the same children, weights and offsets as Scene.trace_secondary
+    children = []
+    for parent, (ray, intersection, obj, inside) in enumerate(hits):
+        material = scene.surface_material(intersection, obj)
+        if not inside and material.albedo.y > eps:
+            new_ray = Ray(
+                origin=intersection.position + eps * intersection.normal,
+                direction=reflect(ray.direction, intersection.normal),
+            )
+            children.append((parent, REFLECTED, material.albedo.y, new_ray, False))
+
+        if inside or material.albedo.z > eps:
+            eta = material.refraction_index
+            if not inside:
+                eta = 1 / eta
+            new_dir = refract(ray.direction, intersection.normal, eta)
+            if new_dir is not None:
+                new_ray = Ray(origin=intersection.position - eps * intersection.normal, direction=new_dir)
+                weight = 1 if inside else material.albedo.z
+                children.append((parent, REFRACTED, weight, new_ray, inside ^ obj.has_volume()))
+    return children
+
+
+def trace_wavefront(scene: "Scene",
+                    rays: Sequence[Ray],
+                    intersections: Sequence[Intersection],
+                    objects: Sequence[BaseObject],
+                    intensities: np.ndarray,
+                    *,
+                    depth: float,
+                    eps: float,
+                    ctx: TraceContext,
+                    ) -> np.ndarray:
+    from .scene import hit_arrays
+
+    values = np.array(intensities, dtype=float).reshape(-1, 3)
+    hits = [(ray, intersection, obj, False) for ray, intersection, obj in zip(rays, intersections, objects)]
+
+    # every bounce generation is traced as one batch, parents are resolved after the deepest one
+    generations = []
+    while depth > 1 and hits:
+        children = _spawn(scene, hits, eps)
+        if not children:
+            break
+
+        origins = np.array([child[3].origin.to_tuple() for child in children], dtype=float)
+        directions = np.array([child[3].direction.to_tuple() for child in children], dtype=float)
+        order = coherent_order(origins, directions)
+        octants = direction_octants(directions)
+
+        rays = [children[idx][3] for idx in order.tolist()]
+        found = closest_hits(scene, rays, ctx)
+
+        traced = []
+        previous = None
+        for idx, ray, (intersection, obj) in zip(order.tolist(), rays, found):
+            inside = children[idx][4]
+            if intersection is None:
+                previous = None
+                continue
+            key = (octants[idx], id(obj))
+            if key == previous:
+                ctx.stats.coherent_rays += 1
+            previous = key
+            traced.append((idx, ray, intersection, obj, inside))
+        ctx.stats.secondary_rays += len(children)
+
+        # restore spawn order, so parents add reflections before refractions like the recursive tracer
+        traced.sort(key=lambda item: item[0])
+        hits = [(ray, intersection, obj, inside) for _, ray, intersection, obj, inside in traced]
+        local = np.empty((len(hits), 3), dtype=float)
+        if hits:
+            arrays = hit_arrays(*zip(*((ray, intersection, obj) for ray, intersection, obj, _ in hits)))
+            inside = np.array([hit[3] for hit in hits], dtype=bool)
+            for flag in (False, True):
+                group = np.flatnonzero(inside == flag)
+                if len(group):
+                    local[group] = scene.shade_points(
+                        *(array[group] for array in arrays), inside=flag, eps=eps, ctx=ctx,
+                    )
+
+        links = np.array([children[idx][:3] for idx, *_ in traced], dtype=float).reshape(-1, 3)
+        generations.append((values, links, local))
+        values = local
+        depth -= 1
+
+    for parent_values, links, child_values in reversed(generations):
+        parents, kinds, weights = links[:, 0].astype(np.intp), links[:, 1], links[:, 2]
+        for kind in (REFLECTED, REFRACTED):
+            mask = kinds == kind
+            parent_values[parents[mask]] += weights[mask, None] * child_values[mask]
+        values = parent_values
+    return values
@@ -0,0 +1,479 @@
+import attr
+import math
+import numpy as np
+from pathlib import Path
+
+from .geometry import Material, Sphere, Triangle, Vector
+from .render import CameraOptions, PointLight, Scene, SceneData
+
+
+@attr.s(slots=True, kw_only=True)
+class SceneSetup:
+    scene: Scene = attr.ib()
+    cam_options: CameraOptions = attr.ib(factory=lambda: CameraOptions(screen_width=640, screen_height=480))
+    depth: int = attr.ib(default=3)
+
+    def to_data(self) -> SceneData:
+        data = self.scene.to_data()
+        cam = self.cam_options
+        data.arrays["camera"] = np.array([
+            cam.screen_width, cam.screen_height, cam.fov,
+            *cam.look_from.to_tuple(), *cam.look_to.to_tuple(), self.depth,
+        ], dtype=float)
+        return data
+
+    @classmethod
+    def from_data(cls, data: SceneData) -> "SceneSetup":
+        scene = Scene.from_data(data)
+        if "camera" not in data.arrays:
+            return cls(scene=scene)
+
+        width, height, fov, *look, depth = data["camera"].tolist()
+        cam_options = CameraOptions(
+            screen_width=int(width),
+            screen_height=int(height),
+            fov=fov,
+            look_from=Vector(*look[0:3]),
+            look_to=Vector(*look[3:6]),
+        )
+        return cls(scene=scene, cam_options=cam_options, depth=int(depth))
+
+    def save(self, path: str | Path) -> None:
+        self.to_data().save(path)
+
+    @classmethod
+    def load(cls, path: str | Path, *, use_mmap: bool = True) -> "SceneSetup":
+        return cls.from_data(SceneData.load(path, use_mmap=use_mmap))
+
+
+def spheres() -> SceneSetup:
+    ambient = Material(
+        ambient_color=Vector(0.5, 0, 0),
+    )
+    diffuse = Material(
+        diffuse_color=Vector(0.5, 0, 0),
+    )
+    specular = Material(
+        ambient_color=Vector(0.05, 0, 0),
+        specular_color=Vector(0.5, 0, 0),
+        specular_exponent=500,
+    )
+
+    scene = Scene()
+    scene.add_object(Sphere(
+        center=Vector(-0.35, 0, -0.5),
+        radius=0.15,
+        material=ambient,
+    ))
+    scene.add_object(Sphere(
+        center=Vector(0, 0, -0.5),
+        radius=0.15,
+        material=diffuse,
+    ))
+    scene.add_object(Sphere(
+        center=Vector(0.4, 0, -0.5),
+        radius=0.15,
+        material=specular,
+    ))
+
+    scene.add_light(PointLight(
+        origin=Vector(-0.2, 0, 0),
+        intensity=Vector(0.5),
+    ))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+    )
+
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=1)
+
+
+def triangle() -> SceneSetup:
+    material = Material(
+        diffuse_color=Vector(0, 0, 1),
+    )
+
+    scene = Scene()
+    scene.add_object(Triangle([
+            Vector(-1, 0, 0),
+            Vector(0, 0, -1),
+            Vector(1, 0, 0),
+        ],
+        material=material,
+    ))
+
+    scene.add_light(PointLight(
+        origin=Vector(0, 2, 0),
+        intensity=Vector(1),
+    ))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        look_from=Vector(0, 2, 0),
+        look_to=Vector(0, 0, 0),
+    )
+
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=1)
+
+
+def invisible_triangle() -> SceneSetup:
+    material = Material(
+        diffuse_color=Vector(0, 0, 1),
+    )
+
+    scene = Scene()
+    scene.add_object(Triangle([
+            Vector(-1, 0, 0),
+            Vector(0, 0, -1),
+            Vector(1, 0, 0),
+        ],
+        material=material,
+    ))
+
+    scene.add_light(PointLight(
+        origin=Vector(0, 2, 0),
+        intensity=Vector(1),
+    ))
+
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        look_from=Vector(0, -2, 0),
+        look_to=Vector(0, 0, 0),
+    )
+
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=1)
+
+
+def mirrors() -> SceneSetup:
+    scene = Scene()
+
+    # materials
+    back_mtl = Material(
+        specular_color=Vector(0.95),
+        albedo=Vector(10, 0.5, 0),
+        specular_exponent=1024,
+        refraction_index=1,
+    )
+    front_mtl = Material(
+        specular_color=Vector(0.95),
+        albedo=Vector(10, 0.5, 0),
+        specular_exponent=1024,
+        refraction_index=1,
+    )
+    left_mtl = Material(
+        specular_color=Vector(0.95),
+        albedo=Vector(10, 0.5, 0),
+        specular_exponent=1024,
+        refraction_index=1,
+    )
+    right_mtl = Material(
+        specular_color=Vector(0.95),
+        albedo=Vector(10, 0.5, 0),
+        specular_exponent=1024,
+        refraction_index=1,
+    )
+    floor_mtl = Material(
+        diffuse_color=Vector(0.1),
+    )
+    ceil_mtl = Material(
+        diffuse_color=Vector(0.4),
+    )
+
+    sphere_mtl = Material(
+        ambient_color=Vector(0.01, 0.03, 0.03),
+        diffuse_color=Vector(0.1, 0.3, 0.3),
+    )
+
+    # objects
+    vertices = [
+        Vector(),
+        Vector(0, 0, 0),
+        Vector(0, 0, -3),
+        Vector(3, 0, -3),
+        Vector(3, 0, 0),
+        Vector(0, 3, 0),
+        Vector(0, 3, -3),
+        Vector(3, 3, -3),
+        Vector(3, 3, 0),
+    ]
+
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[5],
+            vertices[8],
+        ],
+        material=back_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[8],
+            vertices[4],
+        ],
+        material=back_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[5],
+            vertices[6],
+        ],
+        material=left_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[6],
+            vertices[2],
+        ],
+        material=left_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            vertices[4],
+            vertices[3],
+            vertices[7],
+        ],
+        material=right_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[4],
+            vertices[7],
+            vertices[8],
+        ],
+        material=right_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            vertices[2],
+            vertices[3],
+            vertices[7],
+        ],
+        material=front_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[2],
+            vertices[7],
+            vertices[6],
+        ],
+        material=front_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[2],
+            vertices[3],
+        ],
+        material=floor_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[1],
+            vertices[3],
+            vertices[4],
+        ],
+        material=floor_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            vertices[5],
+            vertices[8],
+            vertices[7],
+        ],
+        material=ceil_mtl,
+    ))
+    scene.add_object(Triangle([
+            vertices[5],
+            vertices[7],
+            vertices[6],
+        ],
+        material=ceil_mtl,
+    ))
+
+    scene.add_object(Sphere(
+        center=Vector(1, 0.5, -2),
+        radius=0.5,
+        material=sphere_mtl,
+    ))
+
+    # light
+    scene.add_light(PointLight(
+        origin=Vector(2.8, 2.8, -2.8),
+        intensity=Vector(1),
+    ))
+
+    # render options
+    cam_options = CameraOptions(
+        screen_width=800,
+        screen_height=600,
+        look_from=Vector(2, 1.5, -0.1),
+        look_to=Vector(1, 1.2, -2.8),
+    )
+
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=9)
+
+
+def box() -> SceneSetup:
+    scene = Scene()
+
+    # materials
+    left_sphere_mtl = Material(
+        albedo=Vector(0, 0.8, 0),
+        specular_exponent=1024,
+    )
+    right_sphere_mtl = Material(
+        albedo=Vector(0, 0.3, 0.7),
+        specular_exponent=1024,
+        refraction_index=1.8,
+    )
+
+    floor_mtl = Material(
+        diffuse_color=Vector(0.725, 0.91, 0.88),
+        specular_color=Vector(1.5, 1.5, 1.5),
+        albedo=Vector(0.5, 0, 0),
+        specular_exponent=10,
+        refraction_index=1.5,
+    )
+    ceiling_mtl = Material(
+        diffuse_color=Vector(0.2, 0.2, 0.5),
+        specular_color=Vector(0.3, 0.3, 0.3),
+        specular_exponent=1024,
+        refraction_index=1.5,
+    )
+
+    back_wall_mtl = Material(
+        diffuse_color=Vector(0.725, 0.91, 0.88),
+        specular_color=Vector(1.5, 1.5, 1.5),
+        albedo=Vector(0.5, 0, 0),
+        specular_exponent=10,
+        refraction_index=1.5,
+    )
+    right_wall_mtl = Material(
+        diffuse_color=Vector(0.161, 0.133, 0.427),
+        albedo=Vector(0.8, 0, 0),
+        specular_exponent=10,
+    )
+    left_wall_mtl = Material(
+        diffuse_color=Vector(0.33, 0.065, 0.05),
+        specular_color=Vector(0, 0, 0),
+        albedo=Vector(0.8, 0, 0),
+        specular_exponent=10,
+    )
+
+    # spheres
+    scene.add_object(Sphere(
+        center=Vector(-0.4, 0.3, -0.4),
+        radius=0.3,
+        material=left_sphere_mtl,
+    ))
+    scene.add_object(Sphere(
+        center=Vector(0.3, 0.3, 0),
+        radius=0.3,
+        material=right_sphere_mtl,
+    ))
+
+    # walls
+    scene.add_object(Triangle([
+            Vector(1, 0, -1.04),
+            Vector(-0.99, 0, -1.04),
+            Vector(-1.01, 0, 0.99),
+        ],
+        material=floor_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(-1.01, 0, 0.99),
+            Vector(1, 0, 0.99),
+            Vector(1, 0, -1.04),
+        ],
+        material=floor_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            Vector(1, 1.59, -1.04),
+            Vector(1, 1.59, 0.99),
+            Vector(-1.02, 1.59, 0.99),
+        ],
+        material=ceiling_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(-1.02, 1.59, 0.99),
+            Vector(-1.02, 1.59, -1.04),
+            Vector(1, 1.59, -1.04),
+        ],
+        material=ceiling_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            Vector(1, 1.59, -1.04),
+            Vector(-1.02, 1.59, -1.04),
+            Vector(-0.99, 0, -1.04),
+        ],
+        material=back_wall_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(-0.99, 0, -1.04),
+            Vector(1, 0, -1.04),
+            Vector(1, 1.59, -1.04),
+        ],
+        material=back_wall_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            Vector(1, 1.59, 0.99),
+            Vector(1, 1.59, -1.04),
+            Vector(1, 0, -1.04),
+        ],
+        material=right_wall_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(1, 0, -1.04),
+            Vector(1, 0, 0.99),
+            Vector(1, 1.59, 0.99),
+        ],
+        material=right_wall_mtl,
+    ))
+
+    scene.add_object(Triangle([
+            Vector(-1.02, 1.59, -1.04),
+            Vector(-1.02, 1.59, 0.99),
+            Vector(-1.01, 0, 0.99),
+        ],
+        material=left_wall_mtl,
+    ))
+    scene.add_object(Triangle([
+            Vector(-1.01, 0, 0.99),
+            Vector(-0.99, 0, -1.04),
+            Vector(-1.02, 1.59, -1.04),
+        ],
+        material=left_wall_mtl,
+    ))
+
+    # light
+    scene.add_light(PointLight(
+        origin=Vector(0, 1.5899, 0),
+        intensity=Vector(1, 1, 1),
+    ))
+    scene.add_light(PointLight(
+        origin=Vector(0, 0.7, 1.98),
+        intensity=Vector(0.5, 0.5, 0.5),
+    ))
+
+    # render options
+    cam_options = CameraOptions(
+        screen_width=640,
+        screen_height=480,
+        fov=math.pi / 3,
+        look_from=Vector(0, 0.7, 1.75),
+        look_to=Vector(0, 0.7, 0),
+    )
+
+    return SceneSetup(scene=scene, cam_options=cam_options, depth=4)
+
+
+BUILTIN_SCENES = {
+    'spheres': spheres,
+    'triangle': triangle,
+    'invisible_triangle': invisible_triangle,
+    'mirrors': mirrors,
+    'box': box,
+}
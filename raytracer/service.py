@@ -0,0 +1,510 @@
+import argparse
+import asyncio
+import collections
+import io
+import itertools
+import json
+import os
+import struct
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+import attr
+import numpy as np
+
+from .geometry import Vector
+from .render import RenderStats, SceneData, SceneFormatError
+from .render.scene import BACKENDS, ENGINES, RenderSettings, Tile, TileResult, make_tiles, render_tile
+from .scenes import SceneSetup
+
+
+DEFAULT_PORT = 8765
+
+_FRAME = struct.Struct("!II")
+_TERMINAL = ("done", "cancelled", "error")
+
+# scenes decoded by process workers, keyed by the job file they were loaded from
+_WORKER_SCENES: "collections.OrderedDict[str, object]" = collections.OrderedDict()
+_WORKER_CACHE_SIZE = 8
+
+
+async def write_message(writer: asyncio.StreamWriter, header: dict, payload: bytes = b"") -> None:
+    data = json.dumps(header).encode()
+    writer.write(_FRAME.pack(len(data), len(payload)) + data + payload)
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[dict, bytes] | None:
+    try:
+        header_size, payload_size = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+        header = json.loads(await reader.readexactly(header_size))
+        payload = await reader.readexactly(payload_size)
+    except asyncio.IncompleteReadError:
+        return None
+    return header, payload
+
+
+def _warm_worker() -> None:
+    pass
+
+
+def _render_file_tile(path: str, settings: RenderSettings, tile: Tile) -> TileResult:
+    scene = _WORKER_SCENES.get(path)
+    if scene is None:
+        scene = _WORKER_SCENES[path] = SceneSetup.load(path).scene
+        if len(_WORKER_SCENES) > _WORKER_CACHE_SIZE:
+            _WORKER_SCENES.popitem(last=False)
+    return render_tile(scene, settings, tile)
+
+
+@attr.s(slots=True, kw_only=True)
+class JobEvent:
+    type: str = attr.ib()
+    job: int = attr.ib()
+    done: int = attr.ib(default=0)
+    total: int = attr.ib(default=0)
+    tile: Tile | None = attr.ib(default=None)
+    pixels: np.ndarray | None = attr.ib(default=None, repr=False)
+    image: bytes | None = attr.ib(default=None, repr=False)
+    stats: dict | None = attr.ib(default=None)
+    message: str | None = attr.ib(default=None)
+
+    def to_message(self) -> tuple[dict, bytes]:
+        header = {"type": self.type, "job": self.job, "done": self.done, "total": self.total}
+        payload = b""
+        if self.tile is not None:
+            header["tile"] = list(self.tile)
+            payload = np.ascontiguousarray(self.pixels, dtype="<f4").tobytes()
+        if self.image is not None:
+            payload = self.image
+        if self.stats is not None:
+            header["stats"] = self.stats
+        if self.message is not None:
+            header["message"] = self.message
+        return header, payload
+
+    @classmethod
+    def from_message(cls, header: dict, payload: bytes) -> "JobEvent":
+        event = cls(
+            type=header["type"],
+            job=header["job"],
+            done=header.get("done", 0),
+            total=header.get("total", 0),
+            stats=header.get("stats"),
+            message=header.get("message"),
+        )
+        if "tile" in header:
+            x0, y0, x1, y1 = event.tile = tuple(header["tile"])
+            event.pixels = np.frombuffer(payload, dtype="<f4").reshape(y1 - y0, x1 - x0, 3)
+        elif event.type == "done":
+            event.image = payload
+        return event
+
+
+@attr.s(slots=True, kw_only=True, eq=False)
+class RenderJob:
+    id: int = attr.ib()
+    setup: SceneSetup = attr.ib()
+    settings: RenderSettings = attr.ib()
+    tiles: list[Tile] = attr.ib()
+    priority: int = attr.ib(default=0)
+    background_color: Vector = attr.ib(factory=lambda: Vector(0, 0, 0))
+    path: Path | None = attr.ib(default=None)
+
+    state: str = attr.ib(default="queued", init=False)
+    pixels: np.ndarray = attr.ib(init=False, repr=False)
+    stats: RenderStats = attr.ib(factory=RenderStats, init=False)
+    submitted_ts: float = attr.ib(factory=time.perf_counter, init=False)
+    first_tile_ts: float | None = attr.ib(default=None, init=False)
+    finished_ts: float | None = attr.ib(default=None, init=False)
+
+    _next_tile: int = attr.ib(default=0, init=False)
+    _done: int = attr.ib(default=0, init=False)
+    _in_flight: int = attr.ib(default=0, init=False)
+    _events: asyncio.Queue = attr.ib(factory=asyncio.Queue, init=False, repr=False)
+    _on_finish: Callable[["RenderJob"], None] | None = attr.ib(default=None, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self.pixels = np.empty((self.settings.height, self.settings.width, 3), dtype=float)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "cancelled", "failed")
+
+    @property
+    def has_pending_tiles(self) -> bool:
+        return not self.finished and self._next_tile < len(self.tiles)
+
+    @property
+    def first_tile_latency(self) -> float | None:
+        return None if self.first_tile_ts is None else self.first_tile_ts - self.submitted_ts
+
+    @property
+    def latency(self) -> float | None:
+        return None if self.finished_ts is None else self.finished_ts - self.submitted_ts
+
+    def _emit(self, type: str, **kwargs) -> None:
+        self._events.put_nowait(JobEvent(type=type, job=self.id, done=self._done, total=len(self.tiles), **kwargs))
+
+    def _take_tile(self) -> Tile:
+        if self.state == "queued":
+            self.state = "running"
+            self._emit("started")
+        tile = self.tiles[self._next_tile]
+        self._next_tile += 1
+        self._in_flight += 1
+        return tile
+
+    def _add_tile(self, result: TileResult) -> None:
+        x0, y0, x1, y1 = result.tile
+        self.pixels[y0:y1, x0:x1] = result.pixels
+        self.stats.merge(result.stats)
+        self._done += 1
+        if self.first_tile_ts is None:
+            self.first_tile_ts = time.perf_counter()
+        self._emit("tile", tile=result.tile, pixels=result.pixels)
+
+    def _finish(self, state: str, event: str, **kwargs) -> None:
+        self.state = state
+        self.finished_ts = time.perf_counter()
+        self._emit(event, **kwargs)
+        if self._on_finish is not None:
+            self._on_finish(self)
+
+    def cancel(self) -> bool:
+        if self.finished:
+            return False
+        self._finish("cancelled", "cancelled")
+        return True
+
+    async def events(self) -> AsyncIterator[JobEvent]:
+        while True:
+            event = await self._events.get()
+            yield event
+            if event.type in _TERMINAL:
+                return
+
+    async def result(self) -> JobEvent:
+        async for event in self.events():
+            if event.type in _TERMINAL:
+                return event
+
+
+@attr.s(slots=True, kw_only=True, eq=False)
+class RenderService:
+    num_workers: int | None = attr.ib(default=None)
+    backend: str = attr.ib(default="processes", validator=attr.validators.in_(BACKENDS))
+    max_in_flight: int | None = attr.ib(default=None)
+    tile_size: int = attr.ib(default=32)
+
+    jobs: dict[int, RenderJob] = attr.ib(factory=dict, init=False)
+
+    _executor: Executor | None = attr.ib(default=None, init=False)
+    _workdir: tempfile.TemporaryDirectory | None = attr.ib(default=None, init=False)
+    _slots: asyncio.Semaphore | None = attr.ib(default=None, init=False)
+    _wakeup: asyncio.Event | None = attr.ib(default=None, init=False)
+    _dispatcher: asyncio.Task | None = attr.ib(default=None, init=False)
+    _tasks: set[asyncio.Task] = attr.ib(factory=set, init=False)
+    _ids = attr.ib(factory=itertools.count, init=False)
+
+    async def start(self) -> "RenderService":
+        num_workers = self.num_workers or os.cpu_count() or 1
+        if self.backend == "threads":
+            self._executor = ThreadPoolExecutor(num_workers, thread_name_prefix="raytracer-service")
+        else:
+            self._executor = ProcessPoolExecutor(num_workers)
+            self._workdir = tempfile.TemporaryDirectory(prefix="raytracer-service-")
+            # keep the pool warm so the first job does not pay for process start-up
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_worker) for _ in range(num_workers)))
+
+        self._slots = asyncio.Semaphore(self.max_in_flight or 2 * num_workers)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        return self
+
+    async def close(self) -> None:
+        for job in list(self.jobs.values()):
+            job.cancel()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+        if self._workdir is not None:
+            self._workdir.cleanup()
+
+    async def __aenter__(self) -> "RenderService":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def submit(self,
+               source: SceneSetup | bytes,
+               *,
+               priority: int = 0,
+               tile_size: int | None = None,
+               engine: str = ENGINES[0],
+               ) -> RenderJob:
+        if isinstance(source, SceneSetup):
+            setup, data = source, None
+        else:
+            data = bytes(source)
+            setup = _decode_setup(data)
+
+        settings = RenderSettings(setup.cam_options, 1e-8, setup.depth, engine)
+        job = RenderJob(
+            id=next(self._ids),
+            setup=setup,
+            settings=settings,
+            tiles=make_tiles(settings.width, settings.height, tile_size or self.tile_size),
+            priority=priority,
+        )
+        if self.backend == "threads":
+            setup.scene.sync_accelerator()
+            setup.scene.prepare_shared(engine)
+        else:
+            job.path = Path(self._workdir.name) / f"{job.id}.rtscene"
+            job.path.write_bytes(data if data is not None else setup.to_data().to_bytes())
+
+        job._on_finish = self._release
+        self.jobs[job.id] = job
+        self._wakeup.set()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        job = self.jobs.get(job_id)
+        return job is not None and job.cancel()
+
+    def _task(self, job: RenderJob, tile: Tile) -> tuple[Callable, ...]:
+        if job.path is None:
+            return render_tile, job.setup.scene, job.settings, tile
+        return _render_file_tile, str(job.path), job.settings, tile
+
+    async def _next_job(self) -> RenderJob:
+        while True:
+            ready = [job for job in self.jobs.values() if job.has_pending_tiles]
+            if ready:
+                # higher priority first, then submission order
+                return min(ready, key=lambda job: (-job.priority, job.id))
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            job = await self._next_job()
+            tile = job._take_tile()
+            future = loop.run_in_executor(self._executor, *self._task(job, tile))
+            task = loop.create_task(self._collect(job, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _collect(self, job: RenderJob, future: asyncio.Future) -> None:
+        try:
+            result = await future
+        except Exception as exc:
+            if not job.finished:
+                job._finish("failed", "error", message=f"{type(exc).__name__}: {exc}")
+            return
+        finally:
+            self._slots.release()
+            job._in_flight -= 1
+            self._release(job)
+
+        if job.finished:
+            return
+        job._add_tile(result)
+        if job._done == len(job.tiles):
+            image = job.setup.scene.to_image(job.pixels.copy(), job.background_color)
+            job._finish("done", "done", image=_png_bytes(image), stats=job.stats.as_dict())
+
+    def _release(self, job: RenderJob) -> None:
+        if job.finished and job._in_flight == 0:
+            self.jobs.pop(job.id, None)
+            if job.path is not None:
+                job.path.unlink(missing_ok=True)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        owned: set[int] = set()
+        forwarders: set[asyncio.Task] = set()
+
+        async def send(header: dict, payload: bytes = b"") -> None:
+            async with lock:
+                await write_message(writer, header, payload)
+
+        async def forward(job: RenderJob) -> None:
+            async for event in job.events():
+                await send(*event.to_message())
+            owned.discard(job.id)
+
+        try:
+            while (message := await read_message(reader)) is not None:
+                header, payload = message
+                kind = header.get("type")
+                if kind == "submit":
+                    try:
+                        job = self.submit(
+                            payload,
+                            priority=int(header.get("priority", 0)),
+                            tile_size=header.get("tile_size"),
+                            engine=header.get("engine", ENGINES[0]),
+                        )
+                    except (SceneFormatError, ValueError, KeyError, TypeError) as exc:
+                        await send({"type": "rejected", "ref": header.get("ref"), "message": str(exc)})
+                        continue
+                    owned.add(job.id)
+                    await send({
+                        "type": "accepted",
+                        "ref": header.get("ref"),
+                        "job": job.id,
+                        "total": len(job.tiles),
+                        "width": job.settings.width,
+                        "height": job.settings.height,
+                    })
+                    task = asyncio.get_running_loop().create_task(forward(job))
+                    forwarders.add(task)
+                    task.add_done_callback(forwarders.discard)
+                elif kind == "cancel":
+                    self.cancel(int(header["job"]))
+                else:
+                    message = f"unknown message {kind!r}"
+                    await send({"type": "error", "job": header.get("job", -1), "message": message})
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            # jobs die with the connection that submitted them
+            for job_id in list(owned):
+                self.cancel(job_id)
+            for task in forwarders:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+def _png_bytes(image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@attr.s(slots=True, kw_only=True, eq=False)
+class RenderClient:
+    reader: asyncio.StreamReader = attr.ib()
+    writer: asyncio.StreamWriter = attr.ib()
+
+    _queues: dict[int, asyncio.Queue] = attr.ib(factory=dict, init=False)
+    _pending: dict[int, asyncio.Future] = attr.ib(factory=dict, init=False)
+    _refs = attr.ib(factory=itertools.count, init=False)
+    _receiver: asyncio.Task | None = attr.ib(default=None, init=False)
+
+    def __attrs_post_init__(self):
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> "RenderClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader=reader, writer=writer)
+
+    async def close(self) -> None:
+        self.writer.close()
+        self._receiver.cancel()
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def __aenter__(self) -> "RenderClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def submit(self,
+                     source: SceneSetup | bytes,
+                     *,
+                     priority: int = 0,
+                     tile_size: int | None = None,
+                     engine: str = ENGINES[0],
+                     ) -> int:
+        if isinstance(source, SceneSetup):
+            source = source.to_data().to_bytes()
+        ref = next(self._refs)
+        accepted = self._pending[ref] = asyncio.get_running_loop().create_future()
+        header = {"type": "submit", "ref": ref, "priority": priority, "tile_size": tile_size, "engine": engine}
+        await write_message(self.writer, header, source)
+        return await accepted
+
+    async def cancel(self, job_id: int) -> None:
+        await write_message(self.writer, {"type": "cancel", "job": job_id})
+
+    async def events(self, job_id: int) -> AsyncIterator[JobEvent]:
+        queue = self._queues.setdefault(job_id, asyncio.Queue())
+        while True:
+            event = await queue.get()
+            yield event
+            if event.type in _TERMINAL:
+                self._queues.pop(job_id, None)
+                return
+
+    async def _receive(self) -> None:
+        while (message := await read_message(self.reader)) is not None:
+            header, payload = message
+            kind = header["type"]
+            if kind == "accepted":
+                self._queues.setdefault(header["job"], asyncio.Queue())
+                self._pending.pop(header["ref"]).set_result(header["job"])
+            elif kind == "rejected":
+                self._pending.pop(header["ref"]).set_exception(SceneFormatError(header["message"]))
+            else:
+                event = JobEvent.from_message(header, payload)
+                self._queues.setdefault(event.job, asyncio.Queue()).put_nowait(event)
+
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("render service closed the connection"))
+
+
+def _decode_setup(data: bytes) -> SceneSetup:
+    try:
+        return SceneSetup.from_data(SceneData.from_buffer(data))
+    except SceneFormatError:
+        raise
+    except (KeyError, IndexError, TypeError, ValueError, struct.error) as exc:
+        # well formed sections with inconsistent contents fail while unpacking the objects
+        raise SceneFormatError(f"invalid scene payload: {exc!r}") from exc
+
+
+async def _serve_forever(args: argparse.Namespace) -> None:
+    async with RenderService(num_workers=args.workers, backend=args.backend, tile_size=args.tile_size) as service:
+        server = await service.serve(args.host, args.port)
+        names = (sock.getsockname() for sock in server.sockets)
+        addresses = ", ".join(f"{host}:{port}" for host, port, *_ in names)
+        print(f"render service listening on {addresses} ({service.backend})")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve render jobs over a local socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="size of the warm worker pool (defaults to the CPU count)")
+    parser.add_argument("--backend", choices=BACKENDS, default="processes")
+    parser.add_argument("--tile-size", type=int, default=32, help="default tile size for jobs that do not set one")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from ..cli import main
+from ..scenes import SceneSetup, triangle
+
+
+class TestCli:
+    def test_builtin_batch(self, tmp_path, capsys):
+        pattern = str(tmp_path / "{index}_{name}.png")
+        main(["spheres", "triangle", "-o", pattern, "--width", "16", "--height", "12", "-q", "--stats"])
+
+        for path in (tmp_path / "0_spheres.png", tmp_path / "1_triangle.png"):
+            assert Image.open(path).size == (16, 12)
+        output = capsys.readouterr().out
+        assert "total: 2 frames" in output
+        assert "primary_rays=192" in output
+
+    def test_scene_file(self, tmp_path):
+        path = tmp_path / "triangle.rtscene"
+        main(["triangle", "--export", "-o", str(path), "--width", "20", "--height", "15"])
+        loaded = SceneSetup.load(path)
+        assert (loaded.cam_options.screen_width, loaded.cam_options.screen_height) == (20, 15)
+        assert loaded.depth == triangle().depth
+
+        expected = tmp_path / "expected.png"
+        main(["triangle", "-o", str(expected), "--width", "20", "--height", "15", "-q"])
+        for engine, workers in (("numpy", "2"), ("python", "1")):
+            main([str(path), "-o", str(tmp_path / "{name}.png"), "-q", "--engine", engine, "--workers", workers])
+            rendered = np.asarray(Image.open(tmp_path / "triangle.png"))
+            assert np.array_equal(rendered, np.asarray(Image.open(expected)))
+
+    def test_output_pattern_required(self):
+        with pytest.raises(SystemExit):
+            main(["spheres", "triangle", "-o", "image.png"])
@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("numpy", "PIL", "tqdm", "multiprocessing", "raytracer.render.profiling")
+
+
+def imported_modules(statement: str) -> set[str]:
+    code = f"import json, sys\n{statement}\nprint(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return set(json.loads(output))
+
+
+class TestImports:
+    @pytest.mark.parametrize("statement", [
+        "import raytracer",
+        "from raytracer import Sphere, Triangle, Vector",
+        "import raytracer.geometry",
+    ])
+    def test_geometry_only(self, statement):
+        assert not imported_modules(statement) & {*HEAVY, "raytracer.render"}
+
+    @pytest.mark.parametrize("statement", [
+        "from raytracer import Scene",
+        "import raytracer.render.scene",
+        "import raytracer.cli",
+    ])
+    def test_render_defers_output_modules(self, statement):
+        modules = imported_modules(statement)
+        assert "numpy" in modules
+        assert not modules & set(HEAVY[1:])
+
+    def test_lazy_attributes(self):
+        import raytracer
+        import raytracer.render
+
+        assert raytracer.Scene is raytracer.render.Scene
+        assert "Scene" in dir(raytracer)
+        assert raytracer.render.SamplingProfiler.__module__ == "raytracer.render.profiling"
+        with pytest.raises(AttributeError):
+            raytracer.Missing
@@ -0,0 +1,86 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from ..geometry import Material, Sphere, Vector
+from ..render import CameraOptions, PointLight, Scene, SceneFormatError
+from ..scenes import SceneSetup
+from ..service import RenderClient, RenderService
+
+
+def small_setup() -> SceneSetup:
+    scene = Scene()
+    scene.add_object(Sphere(
+        center=Vector(0, 0, -2),
+        radius=1,
+        material=Material(diffuse_color=Vector(1), albedo=Vector(1, 0.5, 0)),
+    ))
+    scene.add_light(PointLight(origin=Vector(0, 5, 0), intensity=Vector(1)))
+    return SceneSetup(scene=scene, cam_options=CameraOptions(screen_width=16, screen_height=12), depth=2)
+
+
+def expected_png() -> bytes:
+    setup = small_setup()
+    image = setup.scene.render(setup.cam_options, depth=setup.depth, verbose=False, tile_size=8)
+    return image.tobytes()
+
+
+class TestRenderService:
+    def test_priority_and_cancel(self):
+        async def run():
+            async with RenderService(num_workers=1, backend="threads", max_in_flight=1, tile_size=8) as service:
+                low = service.submit(small_setup())
+                cancelled = service.submit(small_setup(), priority=1)
+                high = service.submit(small_setup(), priority=2)
+                assert cancelled.cancel()
+
+                events = [event async for event in low.events()]
+                assert [event.type for event in events] == ["started"] + ["tile"] * 4 + ["done"]
+                assert events[-1].stats["tiles"] == 4
+                assert (await cancelled.result()).type == "cancelled"
+                assert (await high.result()).type == "done"
+                assert high.finished_ts < low.finished_ts
+                assert not service.jobs
+                return events[-1].image
+
+        image = Image.open(io.BytesIO(asyncio.run(run())))
+        assert image.tobytes() == expected_png()
+
+    def test_socket_roundtrip(self):
+        async def run():
+            async with RenderService(num_workers=2, tile_size=8) as service:
+                server = await service.serve(port=0)
+                port = server.sockets[0].getsockname()[1]
+                client = await RenderClient.connect(port=port)
+                async with server, client:
+                    job_id = await client.submit(small_setup())
+                    events = [event async for event in client.events(job_id)]
+            return events
+
+        events = asyncio.run(run())
+        tiles = [event for event in events if event.type == "tile"]
+        assert {event.tile for event in tiles} == {(0, 0, 8, 8), (8, 0, 16, 8), (0, 8, 8, 12), (8, 8, 16, 12)}
+        assert tiles[-1].done == tiles[-1].total == 4
+        assert events[-1].type == "done"
+        assert Image.open(io.BytesIO(events[-1].image)).tobytes() == expected_png()
+
+    def test_rejects_bad_payloads(self):
+        valid = small_setup().to_data().to_bytes()
+        garbage = [b"abc", valid[:len(valid) // 2], b"RTSCENE\0" + bytes(range(200))]
+
+        async def run():
+            async with RenderService(num_workers=1, backend="threads") as service:
+                server = await service.serve(port=0)
+                port = server.sockets[0].getsockname()[1]
+                client = await RenderClient.connect(port=port)
+                async with server, client:
+                    for payload in garbage:
+                        with pytest.raises(SceneFormatError):
+                            await client.submit(payload)
+                    # the connection survives the rejections
+                    job_id = await client.submit(small_setup())
+                    return [event async for event in client.events(job_id)][-1].type
+
+        assert asyncio.run(run()) == "done"